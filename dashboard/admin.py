@@ -1,9 +1,83 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.exceptions import ValidationError
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.html import format_html
 from django.urls import reverse
+from .bulk import OPERATIONS, apply_operation
 from .models import ClientPlatformProgress, ContentLink
 
 
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Foreign key filter that searches with the admin's select2 autocomplete
+    instead of listing every related object in the sidebar. The related
+    model's admin needs search_fields; use it as ('brand', AutocompleteFilter).
+    """
+    template = 'admin/autocomplete_filter.html'
+    
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        super().__init__(field, request, params, model, model_admin, field_path)
+        value = self.used_parameters.get(self.lookup_kwarg)
+        self.lookup_val = value[-1] if isinstance(value, list) else value
+        form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site, attrs={'data-width': '100%'}),
+            required=False,
+        )
+        self.widget = form_field.widget
+    
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+    
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': 'All',
+        }
+    
+    def rendered_widget(self):
+        return self.widget.render(f'autocomplete_filter_{self.lookup_kwarg}', self.lookup_val)
+    
+    def get_facet_counts(self, pk_attname, filtered_qs):
+        return {}
+
+
+class AutocompleteFilterMixin:
+    """Adds the select2 assets AutocompleteFilter needs to the changelist"""
+    
+    @property
+    def media(self):
+        return super().media + AutocompleteSelect(None, self.admin_site).media
+
+
+class BulkActionForm(ActionForm):
+    """Action bar with a value for bulk actions that need one (e.g. Set committed)"""
+    value = forms.IntegerField(required=False, min_value=0, label='Value')
+
+
+def bulk_operation_action(name):
+    """Admin action applying a dashboard.bulk operation to the selected rows in one UPDATE"""
+    operation = OPERATIONS[name]
+    
+    def action(modeladmin, request, queryset):
+        try:
+            value = BulkActionForm.base_fields['value'].clean(request.POST.get('value'))
+            count = apply_operation(queryset, name, value)
+        except (ValidationError, ValueError) as e:
+            modeladmin.message_user(request, str(e), messages.ERROR)
+            return
+        modeladmin.message_user(request, f'{operation.label}: updated {count} platform records')
+    
+    action.__name__ = f'bulk_{name}'
+    return admin.action(description=f'{operation.label} for selected platforms')(action)
+
+
 class ContentLinkInline(admin.TabularInline):
     """Inline to add multiple content links per platform"""
     model = ContentLink
@@ -14,11 +88,12 @@ class ContentLinkInline(admin.TabularInline):
 
 
 @admin.register(ClientPlatformProgress)
-class ClientPlatformProgressAdmin(admin.ModelAdmin):
+class ClientPlatformProgressAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     """Super simple admin interface for updating platform progress"""
     
     list_display = ['brand_link', 'platform_display', 'committed', 'drafted', 'published', 'progress_bar', 'links_count']
-    list_filter = ['platform', 'brand']
+    list_filter = ['platform', ('brand', AutocompleteFilter)]
+    list_select_related = ['brand']
     search_fields = ['brand__brand_name', 'brand__user__username', 'brand__user__email']
     inlines = [ContentLinkInline]
     
@@ -36,10 +111,20 @@ class ClientPlatformProgressAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        # Counted per displayed row (after pagination) rather than grouping the whole table
+        link_count = (
+            ContentLink.objects.filter(platform_progress=OuterRef('pk'))
+            .order_by().values('platform_progress').annotate(count=Count('pk')).values('count')
+        )
+        return super().get_queryset(request).annotate(
+            link_count=Coalesce(Subquery(link_count, output_field=IntegerField()), 0)
+        )
+    
     def brand_link(self, obj):
         """Link to brand admin page"""
         return format_html('<a href="{}">{}</a>', 
-                          reverse('admin:profiles_brandprofile_change', args=[obj.brand.pk]), 
+                          reverse('admin:profiles_brandprofile_change', args=[obj.brand_id]), 
                           obj.brand.brand_name)
     brand_link.short_description = 'Brand'
     
@@ -68,40 +153,36 @@ class ClientPlatformProgressAdmin(admin.ModelAdmin):
     
     def links_count(self, obj):
         """Show number of content links"""
-        count = obj.content_links.count()
+        count = obj.link_count
         if count > 0:
             return format_html('<span class="badge" style="background: #17a2b8; color: white;">{} links</span>', count)
         return 'No links'
     links_count.short_description = 'Content Links'
+    links_count.admin_order_field = 'link_count'
     
-    # Make it easy to create progress records for all platforms
-    actions = ['create_all_platforms']
+    # Make it easy to create progress records for all platforms, and to
+    # update many rows at once (one UPDATE per action)
+    action_form = BulkActionForm
+    actions = ['create_all_platforms'] + [bulk_operation_action(name) for name in OPERATIONS]
     
     def create_all_platforms(self, request, queryset):
         """Create platform progress records for selected brands across all platforms"""
-        platform_choices = ClientPlatformProgress.PLATFORM_CHOICES
-        created_count = 0
-        
-        for progress in queryset:
-            brand = progress.brand
-            for platform_code, platform_name in platform_choices:
-                obj, created = ClientPlatformProgress.objects.get_or_create(
-                    brand=brand,
-                    platform=platform_code,
-                    defaults={'committed': 0, 'drafted': 0, 'published': 0}
-                )
-                if created:
-                    created_count += 1
+        from profiles.models import BrandProfile
         
-        self.message_user(request, f'Created {created_count} platform progress records')
+        # Each brand once, however many of its rows are selected
+        created_count, brands_updated = BrandProfile.create_missing_platform_records(
+            brand_ids=queryset.values('brand_id')
+        )
+        self.message_user(request, f'Created {created_count} platform progress records for {brands_updated} brands')
     create_all_platforms.short_description = "Create all platforms for selected brands"
 
 
 @admin.register(ContentLink)
-class ContentLinkAdmin(admin.ModelAdmin):
+class ContentLinkAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     """Manage content links separately if needed"""
     list_display = ['platform_progress', 'title', 'url_link']
-    list_filter = ['platform_progress__platform', 'platform_progress__brand']
+    list_filter = ['platform_progress__platform', ('platform_progress__brand', AutocompleteFilter)]
+    list_select_related = ['platform_progress__brand']
     search_fields = ['title', 'platform_progress__brand__brand_name']
     
     def url_link(self, obj):
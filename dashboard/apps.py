@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class DashboardConfig(AppConfig):
@@ -9,3 +10,9 @@ class DashboardConfig(AppConfig):
         """Apply patches when Django starts"""
         # Import the patch to prevent Site model conflicts
         from . import patch_sites  # noqa
+        # Record deletes for incremental backups
+        from . import signals  # noqa
+        # Backfill platforms added to PLATFORM_CHOICES
+        post_migrate.connect(
+            signals.create_new_platform_records, sender=self, dispatch_uid='dashboard_new_platform_records',
+        )
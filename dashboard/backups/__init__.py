@@ -0,0 +1,8 @@
+"""
+Streaming database backups
+
+Backups are JSON Lines files (one Django-serialized object per line, the
+format `loaddata` reads as ``.jsonl``), compressed with gzip or zstd, with a
+``.manifest.json`` next to each file recording per-model row counts and
+checksums.
+"""
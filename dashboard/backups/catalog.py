@@ -0,0 +1,214 @@
+"""
+Backup catalog
+
+An index file (catalog.json) in the backup directory that records every
+backup: file, kind, format, size, checksum, manifest and chain links. Listing,
+finding the latest restore point and pruning read this one file instead of
+scanning the directory. Writers register backups as they finish;
+`backup_catalog --rebuild` recreates the index from the manifests.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from django.conf import settings
+from django.utils import timezone
+from pathlib import Path
+import fcntl
+import json
+import os
+import shutil
+
+CATALOG_NAME = 'catalog.json'
+
+# Manifest keys copied into catalog entries
+ENTRY_KEYS = (
+    'file', 'kind', 'format', 'compression', 'started_at', 'created_at',
+    'size_bytes', 'sha256', 'rows', 'base', 'parent',
+)
+
+
+def retention_policy():
+    """How many daily, weekly and monthly restore points to keep"""
+    return {
+        'daily': getattr(settings, 'BACKUP_KEEP_DAILY', 7),
+        'weekly': getattr(settings, 'BACKUP_KEEP_WEEKLY', 4),
+        'monthly': getattr(settings, 'BACKUP_KEEP_MONTHLY', 6),
+    }
+
+
+def retained(entries, policy):
+    """
+    Names of the restore points kept by a grandfather-father-son policy:
+    the newest backup of each of the last N days, ISO weeks and months.
+    """
+    keep = set()
+    newest_first = sorted(entries, key=lambda entry: entry['started_at'], reverse=True)
+    if newest_first:
+        keep.add(newest_first[0]['file'])
+
+    bucket_keys = {
+        'daily': lambda moment: moment.date(),
+        'weekly': lambda moment: moment.isocalendar()[:2],
+        'monthly': lambda moment: (moment.year, moment.month),
+    }
+    for bucket, count in policy.items():
+        seen = set()
+        for entry in newest_first:
+            key = bucket_keys[bucket](datetime.fromisoformat(entry['started_at']))
+            if key in seen:
+                continue
+            if len(seen) >= count:
+                break
+            seen.add(key)
+            keep.add(entry['file'])
+    return keep
+
+
+class Catalog:
+    """The catalog.json index of one backup directory"""
+
+    def __init__(self, location):
+        self.location = Path(location)
+        self.path = self.location / CATALOG_NAME
+
+    @contextmanager
+    def locked(self, shared=False):
+        """
+        Hold the backup directory's lock: exclusive for catalog updates and
+        chunk garbage collection, shared for chunk writes
+        """
+        with open(self.location / '.catalog.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+
+    def load(self):
+        try:
+            with open(self.path) as catalog_file:
+                return json.load(catalog_file)
+        except FileNotFoundError:
+            return self._scan()
+
+    def _save(self, data):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w') as tmp_file:
+            json.dump(data, tmp_file, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _update(self):
+        with self.locked():
+            data = self.load()
+            yield data
+            self._save(data)
+
+    def _scan(self):
+        """Build the index from the manifests on disk (first run or --rebuild)"""
+        from .writer import BACKUP_PREFIX, MANIFEST_SUFFIX
+
+        backups = {}
+        for path in self.location.glob(f'{BACKUP_PREFIX}_*{MANIFEST_SUFFIX}'):
+            with open(path) as manifest_file:
+                manifest = json.load(manifest_file)
+            backups[manifest['file']] = self._entry(manifest, path.name)
+        return {'version': 1, 'backups': backups}
+
+    def _entry(self, manifest, manifest_name):
+        entry = {key: manifest[key] for key in ENTRY_KEYS if key in manifest}
+        entry['manifest'] = manifest_name
+        return entry
+
+    def add(self, manifest, manifest_name):
+        with self._update() as data:
+            data['backups'][manifest['file']] = self._entry(manifest, manifest_name)
+
+    def add_file(self, path, kind, backup_format, sha256=None):
+        """Register a backup without a manifest (dbbackup dumps)"""
+        path = Path(path)
+        now = timezone.now().isoformat()
+        self.add({
+            'file': path.name, 'kind': kind, 'format': backup_format,
+            'started_at': now, 'created_at': now,
+            'size_bytes': path.stat().st_size, 'sha256': sha256,
+        }, None)
+
+    def rebuild(self):
+        with self.locked():
+            data = self._scan()
+            self._save(data)
+        return data
+
+    def entries(self, kind=None, backup_format=None, data=None):
+        """Catalog entries, oldest first (from `data` when the catalog is already loaded)"""
+        entries = (data or self.load())['backups'].values()
+        return sorted(
+            (entry for entry in entries
+             if (kind is None or entry['kind'] == kind)
+             and (backup_format is None or entry.get('format') == backup_format)),
+            key=lambda entry: entry['started_at'],
+        )
+
+    def get(self, name):
+        return self.load()['backups'].get(name)
+
+    def manifest(self, name):
+        """Full manifest of a catalogued backup"""
+        return self._read_manifest(self.get(name))
+
+    def _read_manifest(self, entry):
+        if entry is None or entry.get('manifest') is None:
+            return None
+        with open(self.location / entry['manifest']) as manifest_file:
+            return json.load(manifest_file)
+
+    def latest(self, kind='full', data=None):
+        entries = [
+            entry for entry in self.entries(kind, data=data)
+            if entry.get('format') != 'dbbackup'
+        ]
+        return entries[-1] if entries else None
+
+    def chain(self, full_name=None):
+        """(full manifest, [incremental manifests]) for a restore point"""
+        data = self.load()
+        full = data['backups'].get(full_name) if full_name else self.latest('full', data)
+        if full is None or full['kind'] != 'full' or full.get('manifest') is None:
+            return None, []
+        incrementals = [
+            self._read_manifest(entry)
+            for entry in self.entries('incremental', data=data) if entry.get('base') == full['file']
+        ]
+        return self._read_manifest(full), incrementals
+
+    def prune(self, policy=None, dry_run=False):
+        """Delete backups outside the retention policy; returns the removed entries"""
+        policy = policy or retention_policy()
+        with self._update() as data:
+            backups = data['backups']
+            keep = set()
+            # Streaming backups and dbbackup dumps each keep their own history
+            full_backups = [entry for entry in backups.values() if entry['kind'] == 'full']
+            for is_dump in (False, True):
+                keep |= retained(
+                    [entry for entry in full_backups if (entry.get('format') == 'dbbackup') == is_dump],
+                    policy,
+                )
+            # Incrementals live as long as their full backup
+            keep |= {
+                entry['file'] for entry in backups.values()
+                if entry['kind'] == 'incremental' and entry.get('base') in keep
+            }
+
+            removed = [entry for name, entry in backups.items() if name not in keep]
+            if not dry_run:
+                for entry in removed:
+                    self._delete_files(entry)
+                    del backups[entry['file']]
+        return removed
+
+    def _delete_files(self, entry):
+        path = self.location / entry['file']
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        if entry.get('manifest'):
+            (self.location / entry['manifest']).unlink(missing_ok=True)
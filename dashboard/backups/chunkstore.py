@@ -0,0 +1,242 @@
+"""
+Deduplicating, content-addressed backup store
+
+A chunked backup serializes each model as usual but cuts the JSON Lines
+stream into chunks at content-defined row boundaries and stores every chunk
+once under the SHA-256 of its content (backups/chunks/ab/abcd....jsonl.gz).
+The backup's manifest lists the chunks of each model, so rows that did not
+change since the previous backup land in chunks that already exist and cost
+nothing. `collect_garbage` removes chunks no catalogued backup references.
+"""
+from django.db import connections
+from django.utils import timezone
+from .catalog import Catalog
+from .writer import (
+    TIMESTAMP_PRECISION, BackupWriter, COMPRESSION_EXTENSIONS, backup_models,
+    open_compressed, save_manifest, serialize_queryset,
+)
+from pathlib import Path
+import hashlib
+import io
+import json
+import os
+import time
+import zlib
+
+CHUNKED_FORMAT = 'jsonl-chunked'
+CHUNKS_DIRECTORY = 'chunks'
+
+# A row ends a chunk when the low bits of its checksum are zero, so chunks
+# average AVERAGE_ROWS rows and an edit only changes the chunk around it
+AVERAGE_ROWS = 256
+MIN_ROWS = 32
+MAX_ROWS = 4096
+
+TMP_SUFFIX = '.tmp'
+
+# Unreferenced chunks younger than this may belong to a backup still being written
+GC_GRACE_SECONDS = 6 * 3600
+
+
+class ChunkStore:
+    """Chunk files addressed by the SHA-256 of their uncompressed content"""
+
+    def __init__(self, location, compression='gzip', level=None):
+        self.catalog = Catalog(location)
+        self.root = Path(location) / CHUNKS_DIRECTORY
+        self.compression = compression
+        self.level = level
+
+    def path(self, digest, compression=None):
+        extension = COMPRESSION_EXTENSIONS[compression or self.compression]
+        return self.root / digest[:2] / f'{digest}{extension}'
+
+    def put(self, data):
+        """Store chunk bytes; returns (digest, whether a new file was written)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        # collect_garbage holds the lock exclusively, so it cannot delete a
+        # chunk between the check below and its fresh mtime
+        with self.catalog.locked(shared=True):
+            if path.exists():
+                # Fresh mtime keeps a reused chunk out of collect_garbage's grace period
+                os.utime(path)
+                return digest, False
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f'{path.name}.{os.getpid()}{TMP_SUFFIX}')
+            with open_compressed(tmp_path, 'wb', self.compression, self.level) as chunk_file:
+                chunk_file.write(data)
+            os.replace(tmp_path, path)
+        return digest, True
+
+    def open(self, digest, compression=None):
+        return open_compressed(self.path(digest, compression), 'rb', compression or self.compression)
+
+    def read(self, digest, compression=None):
+        with self.open(digest, compression) as chunk_file:
+            return chunk_file.read()
+
+    def files(self):
+        """Stored chunk files, without the temporary files of chunks being written"""
+        return (path for path in self.root.glob('*/*.jsonl.*') if not path.name.endswith(TMP_SUFFIX))
+
+
+class _ChunkingOutput:
+    """Binary output for serialize_queryset that cuts complete rows into stored chunks"""
+
+    def __init__(self, store):
+        self.store = store
+        self.chunks = []
+        self.new_chunks = 0
+        self.new_bytes = 0
+        self._buffer = io.BytesIO()
+        self._line = b''
+        self._rows = 0
+
+    def write(self, data):
+        for line in data.splitlines(keepends=True):
+            self._line += line
+            if self._line.endswith(b'\n'):
+                self._add_row(self._line)
+                self._line = b''
+
+    def _add_row(self, line):
+        self._buffer.write(line)
+        self._rows += 1
+        boundary = (zlib.crc32(line) % AVERAGE_ROWS) == 0
+        if (boundary and self._rows >= MIN_ROWS) or self._rows >= MAX_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        data = self._buffer.getvalue()
+        digest, created = self.store.put(data)
+        self.chunks.append({'sha256': digest, 'rows': self._rows})
+        if created:
+            self.new_chunks += 1
+            self.new_bytes += len(data)
+        self._buffer = io.BytesIO()
+        self._rows = 0
+
+    def close(self):
+        self._flush()
+        return self.chunks
+
+
+class ChunkedBackupWriter(BackupWriter):
+    """Full backup stored as deduplicated chunks in the backup directory's chunk store"""
+
+    def backup_path(self, timestamp=None):
+        # A name only: the data lives in the shared chunk store
+        path = super().backup_path(timestamp)
+        return path.with_name(path.name[:-len(COMPRESSION_EXTENSIONS[self.compression])] + '_chunked')
+
+    def write(self, models=None, path=None, progress=None, extra_manifest=None):
+        models = backup_models(self.using) if models is None else models
+        path = Path(path) if path else self.backup_path()
+        store = ChunkStore(self.location, self.compression, self.level)
+
+        self.started_at = timezone.now()
+        started = time.perf_counter()
+        model_stats = {}
+        new_chunks = new_bytes = 0
+        for label, queryset in self.querysets(models):
+            model_started = time.perf_counter()
+            output = _ChunkingOutput(store)
+            rows, sha256, rows_sha256 = serialize_queryset(queryset, output, self.chunk_size)
+            model_stats[label] = {
+                'rows': rows,
+                'sha256': sha256,
+                'rows_sha256': rows_sha256,
+                'seconds': round(time.perf_counter() - model_started, 3),
+                'chunks': output.close(),
+            }
+            new_chunks += output.new_chunks
+            new_bytes += output.new_bytes
+            if progress:
+                progress(label, model_stats[label])
+
+        elapsed = time.perf_counter() - started
+        total_rows = sum(stats['rows'] for stats in model_stats.values())
+        chunk_count = sum(len(stats['chunks']) for stats in model_stats.values())
+        manifest = {
+            'file': path.name,
+            'kind': self.kind,
+            'format': CHUNKED_FORMAT,
+            'compression': self.compression,
+            'timestamps': TIMESTAMP_PRECISION,
+            'started_at': self.started_at.isoformat(),
+            'created_at': timezone.now().isoformat(),
+            'database': connections[self.using].vendor,
+            'size_bytes': sum(
+                store.path(chunk['sha256']).stat().st_size
+                for stats in model_stats.values() for chunk in stats['chunks']
+            ),
+            'rows': total_rows,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(total_rows / elapsed, 1) if elapsed else None,
+            'chunks': chunk_count,
+            'new_chunks': new_chunks,
+            'new_bytes': new_bytes,
+            'models': model_stats,
+            'watermarks': self.watermarks(model_stats),
+        }
+        if extra_manifest:
+            manifest.update(extra_manifest)
+
+        save_manifest(path, manifest)
+        return manifest
+
+
+def iter_chunk_records(location, manifest):
+    """Records of a chunked backup, model by model in dependency order"""
+    store = ChunkStore(location, manifest['compression'])
+    for stats in manifest['models'].values():
+        for chunk in stats['chunks']:
+            with store.open(chunk['sha256']) as chunk_file:
+                for line in io.TextIOWrapper(chunk_file, encoding='utf-8'):
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def broken_chunks(location, manifest):
+    """Chunks of a backup that are missing or whose content no longer matches their address"""
+    store = ChunkStore(location, manifest['compression'])
+    broken = []
+    for stats in manifest['models'].values():
+        for chunk in stats['chunks']:
+            try:
+                data = store.read(chunk['sha256'])
+            except FileNotFoundError:
+                broken.append(chunk['sha256'])
+                continue
+            if hashlib.sha256(data).hexdigest() != chunk['sha256']:
+                broken.append(chunk['sha256'])
+    return broken
+
+
+def collect_garbage(location, dry_run=False, grace_seconds=GC_GRACE_SECONDS):
+    """Delete chunk files no catalogued backup references; returns (files, bytes) freed"""
+    store = ChunkStore(location)
+    catalog = store.catalog
+    removed = freed = 0
+    with catalog.locked():
+        referenced = set()
+        for entry in catalog.entries(backup_format=CHUNKED_FORMAT):
+            manifest = catalog.manifest(entry['file'])
+            for stats in manifest['models'].values():
+                referenced.update(chunk['sha256'] for chunk in stats['chunks'])
+
+        cutoff = time.time() - grace_seconds
+        for path in store.files():
+            digest = path.name.split('.', 1)[0]
+            stat = path.stat()
+            if digest in referenced or stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            removed += 1
+            freed += stat.st_size
+    return removed, freed
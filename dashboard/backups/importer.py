@@ -0,0 +1,181 @@
+"""
+Streaming fixture import
+
+Reads a fixture (JSON array or JSON Lines, optionally gzip/zstd compressed)
+one object at a time and writes each model's objects in batched upserts.
+"""
+from django.core import serializers
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from .restore import reset_sequences
+from .writer import open_compressed
+import io
+import json
+
+READ_SIZE = 1024 * 1024
+
+
+def iter_fixture(path):
+    """Yield fixture records from a JSON array or JSON Lines file without loading it whole"""
+    with open_compressed(path, 'rb') as compressed:
+        text = io.TextIOWrapper(compressed, encoding='utf-8')
+        first = text.read(READ_SIZE)
+        stripped = first.lstrip()
+        if stripped.startswith('['):
+            yield from _iter_array(text, stripped[1:])
+        else:
+            yield from _iter_lines(text, first)
+
+
+def _iter_lines(text, buffer):
+    for line in (buffer + text.readline()).splitlines():
+        if line.strip():
+            yield json.loads(line)
+    for line in text:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_array(text, buffer):
+    decoder = json.JSONDecoder()
+    position = 0
+    while True:
+        # Skip whitespace and the comma between elements
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer):
+                break
+            more = text.read(READ_SIZE)
+            if not more:
+                raise ValueError('Unterminated JSON array in fixture')
+            buffer, position = more, 0
+
+        if buffer[position] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            more = text.read(READ_SIZE)
+            if not more:
+                raise
+            buffer, position = buffer[position:] + more, 0
+            continue
+        yield record
+        position = end
+        if position > READ_SIZE:
+            buffer, position = buffer[position:], 0
+
+
+def timestamp_fields(model):
+    """auto_now/auto_now_add fields, which bulk_create would overwrite with the current time"""
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.DateField) and (field.auto_now or field.auto_now_add)
+    ]
+
+
+class FixtureImporter:
+    """
+    Imports fixture records in per-model batches of `batch_size`.
+
+    Each batch is one bulk upsert inside a savepoint. If the batch fails, the
+    savepoint is rolled back and its objects are saved one by one so a single
+    bad row only skips that row. pk sequences are reset at the end, as
+    loaddata does.
+    """
+
+    def __init__(self, exclude_models=(), batch_size=1000, using=DEFAULT_DB_ALIAS, on_error=None):
+        self.exclude_models = {label.lower() for label in exclude_models}
+        self.batch_size = batch_size
+        self.using = using
+        self.on_error = on_error
+        self.stats = {'read': 0, 'excluded': 0, 'imported': 0, 'failed': 0, 'models': {}}
+        self.deferred = []
+        self.models = set()
+
+    def run(self, path):
+        batch = []
+        with transaction.atomic(using=self.using):
+            for record in iter_fixture(path):
+                self.stats['read'] += 1
+                if record.get('model', '').lower() in self.exclude_models:
+                    self.stats['excluded'] += 1
+                    continue
+                if batch and (record['model'] != batch[0]['model'] or len(batch) >= self.batch_size):
+                    self.import_batch(batch)
+                    batch = []
+                batch.append(record)
+            if batch:
+                self.import_batch(batch)
+
+            for obj in self.deferred:
+                obj.save_deferred_fields(using=self.using)
+            reset_sequences(self.models, self.using)
+        return self.stats
+
+    def import_batch(self, records):
+        objects = list(serializers.deserialize(
+            'python', records, using=self.using,
+            ignorenonexistent=True, handle_forward_references=True,
+        ))
+        model = type(objects[0].object)
+        self.models.add(model)
+        try:
+            with transaction.atomic(using=self.using):
+                self._upsert(model, objects)
+        except Exception:
+            for obj in objects:
+                self._save_one(obj)
+        else:
+            self._count(model, len(objects))
+
+        self.deferred.extend(obj for obj in objects if obj.deferred_fields)
+
+    def _upsert(self, model, objects):
+        with_pk = [obj for obj in objects if obj.object.pk is not None]
+        pk = model._meta.pk
+        update_fields = [field.name for field in model._meta.local_concrete_fields if not field.primary_key]
+        if with_pk:
+            instances = [obj.object for obj in with_pk]
+            timestamps = [field.attname for field in timestamp_fields(model)]
+            fixture_values = [[getattr(instance, name) for name in timestamps] for instance in instances]
+            manager = model._default_manager.using(self.using)
+            manager.bulk_create(
+                instances,
+                update_conflicts=bool(update_fields),
+                ignore_conflicts=not update_fields,
+                update_fields=update_fields or None,
+                unique_fields=[pk.name] if update_fields else None,
+            )
+            # Put the fixture's timestamps back, as loaddata's raw saves keep them.
+            # bulk_update writes the instance values without calling pre_save().
+            if timestamps:
+                for instance, values in zip(instances, fixture_values):
+                    for name, value in zip(timestamps, values):
+                        if value is not None:
+                            setattr(instance, name, value)
+                manager.bulk_update(instances, timestamps, batch_size=self.batch_size)
+        for obj in objects:
+            # New rows identified only by natural key, and many-to-many data, need a save
+            if obj.object.pk is None:
+                obj.save(using=self.using)
+            elif obj.m2m_data:
+                for field_name, values in obj.m2m_data.items():
+                    getattr(obj.object, field_name).set(values)
+
+    def _save_one(self, obj):
+        model = type(obj.object)
+        try:
+            with transaction.atomic(using=self.using):
+                obj.save(using=self.using)
+        except Exception as error:
+            self.stats['failed'] += 1
+            if self.on_error:
+                self.on_error(obj.object, error)
+        else:
+            self._count(model, 1)
+
+    def _count(self, model, count):
+        label = model._meta.label_lower
+        self.stats['imported'] += count
+        self.stats['models'][label] = self.stats['models'].get(label, 0) + count
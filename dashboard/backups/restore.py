@@ -0,0 +1,111 @@
+from django.apps import apps
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from dashboard.models import BackupTombstone
+from .incremental import TOMBSTONE_LABEL
+from .writer import open_compressed
+import io
+import json
+import time
+
+# object_key values per DELETE, below SQLite's bound parameter limit
+TOMBSTONE_BATCH = 500
+
+
+def iter_records(path):
+    """Decoded JSON Lines records of a backup file, streamed"""
+    with open_compressed(path, 'rb') as compressed:
+        for line in io.TextIOWrapper(compressed, encoding='utf-8'):
+            if line.strip():
+                yield json.loads(line)
+
+
+def apply_tombstone(record, using=DEFAULT_DB_ALIAS):
+    """Delete the row a tombstone record points at; returns True if it existed"""
+    fields = record['fields']
+    model = apps.get_model(fields['model'])
+    key = json.loads(fields['object_key'])
+    manager = model._default_manager.db_manager(using)
+    try:
+        instance = manager.get_by_natural_key(*key) if isinstance(key, list) else manager.get(pk=key)
+    except model.DoesNotExist:
+        return False
+    instance.delete(using=using)
+    return True
+
+
+def reset_sequences(models, using=DEFAULT_DB_ALIAS):
+    """Move the pk sequences past rows saved with explicit pks, as loaddata does"""
+    connection = connections[using]
+    sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+    if sequence_sql:
+        with connection.cursor() as cursor:
+            for statement in sequence_sql:
+                cursor.execute(statement)
+
+
+def restore_file(path, using=DEFAULT_DB_ALIAS, progress=None, sequences=True):
+    """Load one backup file (full or incremental) in a single transaction"""
+    return restore_records(iter_records(path), using, progress, name=path, sequences=sequences)
+
+
+def restore_records(source, using=DEFAULT_DB_ALIAS, progress=None, name=None, sequences=True):
+    """
+    Load backup records in a single transaction.
+
+    Objects are saved as loaddata would: natural keys resolved, forward
+    references deferred until the end, constraints checked once and pk
+    sequences reset (unless `sequences` is False, for callers that reset
+    them once after several restores). Tombstone records are applied as
+    deletes instead of being saved.
+    """
+    started = time.perf_counter()
+    stats = {'rows': {}, 'deleted': 0}
+    connection = connections[using]
+    replayed = {}
+
+    def records():
+        for record in source:
+            if record['model'] == TOMBSTONE_LABEL:
+                stats['deleted'] += apply_tombstone(record, using)
+                replayed.setdefault(record['fields']['model'], set()).add(record['fields']['object_key'])
+                continue
+            stats['rows'][record['model']] = stats['rows'].get(record['model'], 0) + 1
+            yield record
+
+    with transaction.atomic(using=using):
+        tombstones = BackupTombstone.objects.using(using)
+        last_tombstone = tombstones.order_by('-pk').values_list('pk', flat=True).first() or 0
+        deferred = []
+        models = set()
+        with connection.constraint_checks_disabled():
+            objects = serializers.deserialize(
+                'python', records(), using=using,
+                ignorenonexistent=True, handle_forward_references=True,
+            )
+            for obj in objects:
+                obj.save(using=using)
+                models.add(type(obj.object))
+                if obj.deferred_fields:
+                    deferred.append(obj)
+            for obj in deferred:
+                obj.save_deferred_fields(using=using)
+        connection.check_constraints(table_names=[model._meta.db_table for model in models])
+        if sequences:
+            reset_sequences(models, using)
+
+        # Deletes replayed above (and their cascades, which the backup
+        # recorded too) are not deletes this database needs to back up.
+        # Tombstones of its own deletes stay for its next incremental.
+        for label, keys in replayed.items():
+            keys = sorted(keys)
+            for offset in range(0, len(keys), TOMBSTONE_BATCH):
+                tombstones.filter(
+                    pk__gt=last_tombstone, model=label, object_key__in=keys[offset:offset + TOMBSTONE_BATCH],
+                ).delete()
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    if progress:
+        progress(name, stats)
+    return stats
@@ -0,0 +1,186 @@
+"""
+Restore drills
+
+Restores a backup into a throwaway SQLite database and checks it against
+its manifest: file checksums, per-model row counts, and content hashes of the
+restored rows serialized exactly as the backup writer serialized them. The
+hashes ignore row order (see RowsDigest); manifests written before the
+backups recorded `rows_sha256` are compared in pk order, and backups written
+before timestamps kept their microseconds are serialized as they were then.
+A chain with incrementals is checked against the row counts the last
+incremental recorded instead, as its rows no longer match the full backup.
+"""
+from contextlib import contextmanager
+from django.apps import apps
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from .chunkstore import CHUNKED_FORMAT, broken_chunks, iter_chunk_records
+from .parallel import SPLIT_FORMAT, restore_split
+from .restore import restore_file, restore_records
+from .writer import (
+    TIMESTAMP_PRECISION, BackupJSONEncoder, file_sha256, open_compressed, serialize_queryset,
+)
+from pathlib import Path
+import hashlib
+import os
+import time
+
+SCRATCH_ALIAS = 'backup_verify'
+
+
+@contextmanager
+def sqlite_database(name, alias):
+    """Register the SQLite database file `name` as connection `alias`"""
+    configured = connections.configure_settings({
+        **connections.settings,
+        alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(name)},
+    })
+    connections.settings[alias] = configured[alias]
+    try:
+        yield alias
+    finally:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+@contextmanager
+def scratch_database(directory, alias=SCRATCH_ALIAS):
+    """Register an empty, migrated SQLite database in `directory` as connection `alias`"""
+    with sqlite_database(Path(directory) / 'verify.sqlite3', alias):
+        call_command('migrate', database=alias, verbosity=0, interactive=False)
+        # migrate creates its own content types, permissions and default site;
+        # the restore brings the backed up ones
+        call_command('flush', database=alias, verbosity=0, interactive=False, inhibit_post_migrate=True)
+        yield alias
+
+
+class _ChunkHasher:
+    """Output for serialize_queryset that hashes consecutive runs of `sizes` lines"""
+
+    def __init__(self, sizes):
+        self.sizes = list(sizes)
+        self.digests = []
+        self.sha256 = hashlib.sha256()
+        self.rows = 0
+
+    def write(self, data):
+        for line in data.splitlines(keepends=True):
+            self.sha256.update(line)
+            if line.endswith(b'\n'):
+                self.rows += 1
+                if self.sizes and self.rows == self.sizes[0]:
+                    self._next_chunk()
+
+    def _next_chunk(self):
+        self.digests.append(self.sha256.hexdigest())
+        self.sha256 = hashlib.sha256()
+        self.rows = 0
+        self.sizes.pop(0)
+
+    def finish(self):
+        if self.rows or self.sizes:
+            self.digests.append(self.sha256.hexdigest())
+        return self.digests
+
+
+def expected_chunks(manifest, label):
+    """[(rows, sha256)] the manifest recorded for a model"""
+    stats = manifest['models'][label]
+    if manifest.get('format') == SPLIT_FORMAT:
+        return [(chunk['rows'], chunk['sha256']) for chunk in stats['chunks']]
+    return [(stats['rows'], stats['sha256'])]
+
+
+def check_files(path, manifest):
+    """Names of backup files whose content does not match the manifest"""
+    path = Path(path)
+    if manifest.get('format') == CHUNKED_FORMAT:
+        return broken_chunks(path.parent, manifest)
+    if manifest.get('format') != SPLIT_FORMAT:
+        return [] if file_sha256(path) == manifest['sha256'] else [path.name]
+
+    broken = []
+    for stats in manifest['models'].values():
+        for chunk in stats['chunks']:
+            digest = hashlib.sha256()
+            with open_compressed(path / chunk['file'], 'rb') as chunk_file:
+                for block in iter(lambda: chunk_file.read(1024 * 1024), b''):
+                    digest.update(block)
+            if digest.hexdigest() != chunk['sha256']:
+                broken.append(chunk['file'])
+    return broken
+
+
+def check_models(manifest, using):
+    """Per-model comparison of the restored rows with the manifest"""
+    results = {}
+    encoder = BackupJSONEncoder if manifest.get('timestamps') == TIMESTAMP_PRECISION else DjangoJSONEncoder
+    for label, stats in manifest['models'].items():
+        model = apps.get_model(label)
+        chunks = expected_chunks(manifest, label)
+        queryset = model._default_manager.using(using).order_by(model._meta.pk.name)
+        expected_rows = sum(rows for rows, _ in chunks)
+        if 'rows_sha256' in stats:
+            with open(os.devnull, 'wb') as output:
+                rows, _, rows_sha256 = serialize_queryset(queryset, output, encoder=encoder)
+            hashes_match = rows_sha256 == stats['rows_sha256']
+        else:
+            hasher = _ChunkHasher(rows for rows, _ in chunks)
+            rows, _, _ = serialize_queryset(queryset, hasher, encoder=encoder)
+            hashes_match = hasher.finish() == [sha256 for _, sha256 in chunks]
+        results[label] = {
+            'expected_rows': expected_rows,
+            'rows': rows,
+            'ok': rows == expected_rows and hashes_match,
+            'hash_ok': hashes_match,
+        }
+    return results
+
+
+def check_counts(table_rows, using):
+    """Per-model comparison of the restored row counts with an incremental's `table_rows`"""
+    results = {}
+    for label, expected_rows in table_rows.items():
+        rows = apps.get_model(label)._default_manager.using(using).count()
+        results[label] = {'expected_rows': expected_rows, 'rows': rows, 'ok': rows == expected_rows}
+    return results
+
+
+def verify_backup(path, manifest, directory, incrementals=()):
+    """
+    Restore `path` (and any incrementals on top of it) into a scratch database
+    in `directory` and compare it with the manifest. Returns a report dict.
+    """
+    path = Path(path)
+    report = {'file': manifest['file'], 'broken_files': check_files(path, manifest)}
+    for incremental in incrementals:
+        report['broken_files'] += check_files(path.parent / incremental['file'], incremental)
+
+    with scratch_database(directory) as alias:
+        started = time.perf_counter()
+        if manifest.get('format') == SPLIT_FORMAT:
+            restore_split(path, manifest, using=alias, workers=1)
+        elif manifest.get('format') == CHUNKED_FORMAT:
+            restore_records(iter_chunk_records(path.parent, manifest), using=alias)
+        else:
+            restore_file(path, using=alias)
+        for incremental in incrementals:
+            restore_file(path.parent / incremental['file'], using=alias)
+        report['restore_seconds'] = round(time.perf_counter() - started, 3)
+        report['rows'] = sum(
+            model._default_manager.using(alias).count()
+            for model in map(apps.get_model, manifest['models'])
+        )
+
+        if not incrementals:
+            report['models'] = check_models(manifest, alias)
+        else:
+            # Incrementals written before they recorded row counts are not compared
+            report['models'] = check_counts(incrementals[-1].get('table_rows', {}), alias)
+
+    report['ok'] = not report['broken_files'] and all(
+        result['ok'] for result in report['models'].values()
+    )
+    return report
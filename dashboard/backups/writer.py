@@ -0,0 +1,276 @@
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.utils import timezone
+from .catalog import Catalog
+from pathlib import Path
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import time
+
+try:
+    import zstandard
+except ImportError:  # Optional - gzip is always available
+    zstandard = None
+
+
+BACKUP_PREFIX = 'quantum_digital_backup'
+COMPRESSION_EXTENSIONS = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+MANIFEST_SUFFIX = '.manifest.json'
+
+# Backup bookkeeping tables that are never part of the backed up data
+BOOKKEEPING_MODELS = {'dashboard.backuptombstone'}
+
+
+def backup_location():
+    """Directory backups are written to (DBBACKUP_STORAGE_OPTIONS['location'])"""
+    location = Path(settings.DBBACKUP_STORAGE_OPTIONS['location'])
+    location.mkdir(parents=True, exist_ok=True)
+    return location
+
+
+def available_compressions():
+    return ['gzip', 'zstd'] if zstandard else ['gzip']
+
+
+def open_compressed(path, mode='rb', compression=None, level=None):
+    """Open a backup file, choosing the codec from `compression` or the file suffix"""
+    path = str(path)
+    if compression is None:
+        compression = 'zstd' if path.endswith('.zst') else 'gzip' if path.endswith('.gz') else None
+
+    if compression == 'gzip':
+        return gzip.open(path, mode, compresslevel=level or 6)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd compression requires the "zstandard" package')
+        if 'w' in mode:
+            return zstandard.ZstdCompressor(level=level or 3).stream_writer(open(path, mode))
+        return zstandard.ZstdDecompressor().stream_reader(open(path, mode))
+    return open(path, mode)
+
+
+def manifest_path(backup_path):
+    backup_path = str(backup_path)
+    for extension in COMPRESSION_EXTENSIONS.values():
+        if backup_path.endswith(extension):
+            return Path(backup_path[:-len(extension)] + MANIFEST_SUFFIX)
+    return Path(backup_path + MANIFEST_SUFFIX)
+
+
+def read_manifest(backup_path):
+    with open(manifest_path(backup_path)) as manifest_file:
+        return json.load(manifest_file)
+
+
+def save_manifest(backup_path, manifest):
+    """Write the manifest next to the backup and register it in the catalog"""
+    path = manifest_path(backup_path)
+    with open(path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    Catalog(Path(backup_path).parent).add(manifest, path.name)
+
+
+def backup_models(using=DEFAULT_DB_ALIAS):
+    """Concrete models in dependency order, as `dumpdata` would dump them"""
+    app_list = {
+        app_config: None
+        for app_config in apps.get_app_configs()
+        if app_config.models_module is not None
+    }
+    models = serializers.sort_dependencies(app_list.items(), allow_cycles=True)
+    return [
+        model for model in models
+        if not model._meta.proxy
+        and model._meta.label_lower not in BOOKKEEPING_MODELS
+        and model._meta.can_migrate(connections[using])
+        and router.allow_migrate_model(using, model)
+    ]
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+# Recorded as 'timestamps' in manifests of backups that keep microseconds
+TIMESTAMP_PRECISION = 'microseconds'
+
+
+class BackupJSONEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder without its truncation of times to milliseconds, so
+    restored timestamps (and their serialized rows) equal the originals.
+    Manifests of backups written with it record TIMESTAMP_PRECISION.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            value = o.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return super().default(o)
+
+
+class RowsDigest:
+    """
+    Digest of JSON Lines rows that does not depend on their order: the sum
+    of the rows' SHA-256 digests modulo 2**256, so digests of parts add up.
+
+    Rows with natural keys are serialized without their pk, and a database
+    numbers them in the order they were created; comparing this digest
+    instead of the file hash ignores that order.
+    """
+    MODULUS = 1 << 256
+
+    def __init__(self, value=0):
+        self.value = value
+        self._row = hashlib.sha256()
+
+    def update(self, data):
+        for line in data.splitlines(keepends=True):
+            self._row.update(line)
+            if line.endswith(b'\n'):
+                self.value = (self.value + int.from_bytes(self._row.digest(), 'big')) % self.MODULUS
+                self._row = hashlib.sha256()
+
+    def hexdigest(self):
+        return f'{self.value:064x}'
+
+    @classmethod
+    def combine(cls, hexdigests):
+        return cls(sum(int(digest, 16) for digest in hexdigests) % cls.MODULUS).hexdigest()
+
+
+class _ModelStream:
+    """Text stream that hashes and counts serialized lines before compressing them"""
+
+    def __init__(self, output):
+        self.output = output
+        self.sha256 = hashlib.sha256()
+        self.rows_digest = RowsDigest()
+        self.rows = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.sha256.update(data)
+        self.rows_digest.update(data)
+        self.rows += data.count(b'\n')
+        self.output.write(data)
+
+
+def serialize_queryset(queryset, output, chunk_size=2000, encoder=BackupJSONEncoder):
+    """
+    Stream a queryset as JSON Lines into a binary file; returns
+    (rows, sha256 of the lines, RowsDigest of the lines)
+    """
+    stream = _ModelStream(output)
+    serializers.serialize(
+        'jsonl',
+        queryset.iterator(chunk_size=chunk_size),
+        stream=stream,
+        use_natural_foreign_keys=True,
+        use_natural_primary_keys=True,
+        cls=encoder,
+    )
+    return stream.rows, stream.sha256.hexdigest(), stream.rows_digest.hexdigest()
+
+
+class BackupWriter:
+    """
+    Serializes models one at a time with .iterator() into a compressed
+    JSON Lines file, then writes the manifest next to it.
+    """
+
+    def __init__(self, location=None, compression='gzip', level=None,
+                 chunk_size=2000, using=DEFAULT_DB_ALIAS, kind='full'):
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f'Unknown compression "{compression}"')
+        self.location = Path(location) if location else backup_location()
+        self.compression = compression
+        self.level = level
+        self.chunk_size = chunk_size
+        self.using = using
+        self.kind = kind
+
+    def backup_path(self, timestamp=None):
+        timestamp = timestamp or timezone.now().strftime('%Y%m%d_%H%M%S')
+        suffix = '' if self.kind == 'full' else f'_{self.kind}'
+        return self.location / f'{BACKUP_PREFIX}_{timestamp}{suffix}{COMPRESSION_EXTENSIONS[self.compression]}'
+
+    def watermarks(self, labels):
+        """Per-model watermarks: every row changed before the run started is included"""
+        return {label: self.started_at.isoformat() for label in labels}
+
+    def querysets(self, models):
+        """(label, queryset) pairs to serialize; subclasses can filter rows"""
+        for model in models:
+            queryset = model._default_manager.using(self.using).order_by(model._meta.pk.name)
+            yield model_label(model), queryset
+
+    def _write_models(self, output, models, progress):
+        model_stats = {}
+        for label, queryset in self.querysets(models):
+            model_started = time.perf_counter()
+            rows, sha256, rows_sha256 = serialize_queryset(queryset, output, self.chunk_size)
+            model_stats[label] = {
+                'rows': rows,
+                'sha256': sha256,
+                'rows_sha256': rows_sha256,
+                'seconds': round(time.perf_counter() - model_started, 3),
+            }
+            if progress:
+                progress(label, model_stats[label])
+        return model_stats
+
+    def write(self, models=None, path=None, progress=None, extra_manifest=None):
+        """Write the backup and its manifest; returns the manifest dict"""
+        models = backup_models(self.using) if models is None else models
+        path = Path(path) if path else self.backup_path()
+        partial_path = path.with_name(path.name + '.partial')
+
+        self.started_at = timezone.now()
+        started = time.perf_counter()
+        try:
+            with open_compressed(partial_path, 'wb', self.compression, self.level) as output:
+                model_stats = self._write_models(output, models, progress)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        os.replace(partial_path, path)
+
+        elapsed = time.perf_counter() - started
+        total_rows = sum(stats['rows'] for stats in model_stats.values())
+        manifest = {
+            'file': path.name,
+            'kind': self.kind,
+            'format': 'jsonl',
+            'compression': self.compression,
+            'timestamps': TIMESTAMP_PRECISION,
+            'started_at': self.started_at.isoformat(),
+            'created_at': timezone.now().isoformat(),
+            'database': connections[self.using].vendor,
+            'size_bytes': path.stat().st_size,
+            'sha256': file_sha256(path),
+            'rows': total_rows,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(total_rows / elapsed, 1) if elapsed else None,
+            'models': model_stats,
+            'watermarks': self.watermarks(model_stats),
+        }
+        if extra_manifest:
+            manifest.update(extra_manifest)
+
+        save_manifest(path, manifest)
+        return manifest
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as backup_file:
+        for block in iter(lambda: backup_file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,40 @@
+"""
+Bulk platform operations
+
+Each operation is a set of field values applied to a ClientPlatformProgress
+queryset with a single UPDATE statement, shared by the admin actions and the
+manager app's bulk endpoint. Bulk updates don't call save(), so updated_at is
+set explicitly (incremental backups select rows by it).
+"""
+from django.db.models import F
+from django.utils import timezone
+
+
+class BulkOperation:
+    """Named set of field updates; `values(value)` returns the UPDATE's field values"""
+
+    def __init__(self, label, values, needs_value=False):
+        self.label = label
+        self.values = values
+        self.needs_value = needs_value
+
+
+OPERATIONS = {
+    'set_committed': BulkOperation('Set committed', lambda value: {'committed': value}, needs_value=True),
+    'reset_progress': BulkOperation('Reset drafted and published', lambda value: {'drafted': 0, 'published': 0}),
+    'show': BulkOperation('Show platforms', lambda value: {'is_visible': True}),
+    'hide': BulkOperation('Hide platforms', lambda value: {'is_visible': False}),
+    'toggle_visibility': BulkOperation('Toggle visibility', lambda value: {'is_visible': ~F('is_visible')}),
+    'activate': BulkOperation('Mark active', lambda value: {'is_active': True}),
+    'deactivate': BulkOperation('Mark inactive', lambda value: {'is_active': False}),
+}
+
+
+def apply_operation(queryset, name, value=None, dry_run=False):
+    """Apply operation `name` to every row of `queryset`; returns the number of rows (to be) updated"""
+    operation = OPERATIONS[name]
+    if operation.needs_value and (value is None or value < 0):
+        raise ValueError(f'{operation.label} needs a value of 0 or more')
+    if dry_run:
+        return queryset.count()
+    return queryset.update(updated_at=timezone.now(), **operation.values(value))
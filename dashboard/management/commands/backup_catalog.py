@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from dashboard.backups.catalog import Catalog, retention_policy
+from dashboard.backups.chunkstore import collect_garbage
+from dashboard.backups.writer import backup_location
+
+
+class Command(BaseCommand):
+    help = 'List, rebuild or prune the backup catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recreate catalog.json from the backup manifests on disk'
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete backups outside the retention policy'
+        )
+        parser.add_argument(
+            '--gc',
+            action='store_true',
+            help='Delete deduplicated chunks no catalogued backup references (implied by --prune)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='With --prune or --gc, only show what would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        catalog = Catalog(backup_location())
+
+        if options['rebuild']:
+            data = catalog.rebuild()
+            self.stdout.write(self.style.SUCCESS(f'✅ Catalog rebuilt: {len(data["backups"])} backups'))
+
+        if options['prune']:
+            policy = retention_policy()
+            removed = catalog.prune(policy, dry_run=options['dry_run'])
+            verb = 'Would remove' if options['dry_run'] else 'Removed'
+            for entry in removed:
+                self.stdout.write(f'  {verb}: {entry["file"]}')
+            self.stdout.write(
+                f'🧹 {verb} {len(removed)} backups (keeping {policy["daily"]} daily, '
+                f'{policy["weekly"]} weekly, {policy["monthly"]} monthly)'
+            )
+
+        if options['prune'] or options['gc']:
+            chunks, freed = collect_garbage(catalog.location, dry_run=options['dry_run'])
+            verb = 'Would remove' if options['dry_run'] else 'Removed'
+            self.stdout.write(f'🧹 {verb} {chunks} unreferenced chunks ({freed / (1024 * 1024):.1f} MB)')
+
+        self.stdout.write(f'📋 Backups in {catalog.location}:')
+        for entry in catalog.entries():
+            size_mb = entry.get('size_bytes', 0) / (1024 * 1024)
+            rows = f'{entry["rows"]} rows' if 'rows' in entry else ''
+            self.stdout.write(
+                f'  {entry["started_at"][:19]}  {entry["kind"]:<11} {entry.get("format", ""):<11} '
+                f'{size_mb:7.1f} MB  {entry["file"]}  {rows}'
+            )
+
+        latest = catalog.latest('full')
+        if latest:
+            self.stdout.write(f'🔄 Latest restore point: {latest["file"]}')
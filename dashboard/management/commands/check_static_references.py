@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from pathlib import Path
+import posixpath
+import re
+
+# {% static 'path' %} with a literal path; other arguments are template variables
+STATIC_TAG = re.compile(r"""{%\s*static\s+(?:(['"])(?P<path>[^'"]+)\1|(?P<variable>\S+))""")
+# Hardcoded /static/... or {{ STATIC_URL }}... links skip fingerprinting
+HARDCODED = re.compile(r"""(?:href|src)\s*=\s*['"](?:/static/|{{\s*STATIC_URL\s*}})(?P<path>[^'"?#]+)""")
+CSS_URL = re.compile(r"""url\(\s*(['"]?)(?P<path>[^'")]+)\1\s*\)""")
+
+
+class Command(BaseCommand):
+    help = 'Find static file references in templates and stylesheets that no static files finder can resolve'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='Template directories to scan (default: the TEMPLATES DIRS, i.e. templates/)'
+        )
+        parser.add_argument(
+            '--no-css',
+            action='store_true',
+            help='Do not check url() references in stylesheets'
+        )
+
+    def handle(self, *args, **options):
+        template_dirs = [Path(path) for path in options['paths']] or [
+            Path(directory) for engine in settings.TEMPLATES for directory in engine.get('DIRS', [])
+        ]
+        self.missing = 0
+        self.hardcoded = 0
+        self.dynamic = 0
+        checked = 0
+
+        for directory in template_dirs:
+            for template in sorted(directory.rglob('*.html')):
+                checked += self.check_template(template)
+        if not options['no_css']:
+            for css_name, css_path in self.stylesheets():
+                checked += self.check_stylesheet(css_name, css_path)
+
+        self.stdout.write(
+            f'🔍 {checked} references checked: {self.missing} missing, '
+            f'{self.hardcoded} hardcoded (not fingerprinted), {self.dynamic} dynamic (not checked)'
+        )
+        if self.missing:
+            raise CommandError(f'{self.missing} static references point to missing files')
+        self.stdout.write(self.style.SUCCESS('✅ All static references resolve'))
+
+    def check_template(self, template):
+        checked = 0
+        for line_number, line in enumerate(template.read_text(encoding='utf-8').splitlines(), 1):
+            location = f'{template}:{line_number}'
+            for match in STATIC_TAG.finditer(line):
+                if match.group('variable'):
+                    self.dynamic += 1
+                    continue
+                checked += 1
+                self.check_reference(location, match.group('path'))
+            for match in HARDCODED.finditer(line):
+                checked += 1
+                self.hardcoded += 1
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️  {location}: /static/{match.group("path")} is hardcoded; use {{% static %}} so it is fingerprinted'
+                ))
+                self.check_reference(location, match.group('path'))
+        return checked
+
+    def stylesheets(self):
+        """(static name, file path) of every stylesheet the finders provide"""
+        seen = set()
+        for finder in finders.get_finders():
+            for path, storage in finder.list(['CVS', '.*', '*~']):
+                if not path.endswith('.css'):
+                    continue
+                prefix = getattr(storage, 'prefix', None)
+                name = f'{prefix}/{path}' if prefix else path
+                if name not in seen:
+                    seen.add(name)
+                    yield name, storage.path(path)
+
+    def check_stylesheet(self, css_name, css_path):
+        checked = 0
+        with open(css_path, encoding='utf-8', errors='replace') as css_file:
+            for line_number, line in enumerate(css_file, 1):
+                for match in CSS_URL.finditer(line):
+                    path = match.group('path').strip()
+                    # Same exclusions as ManifestStaticFilesStorage
+                    if re.match(r'^[a-z]+:|^//|^#|^/', path):
+                        continue
+                    checked += 1
+                    target = posixpath.normpath(posixpath.join(posixpath.dirname(css_name), path.split('?')[0].split('#')[0]))
+                    self.check_reference(f'{css_name}:{line_number}', target)
+        return checked
+
+    def check_reference(self, location, path):
+        if not finders.find(path):
+            self.missing += 1
+            self.stdout.write(self.style.ERROR(f'❌ {location}: {path} not found'))
@@ -1,7 +1,13 @@
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 from django.utils import timezone
+from dashboard.backups.catalog import Catalog, retention_policy
+from dashboard.backups.chunkstore import collect_garbage
+from dashboard.backups.writer import backup_location
+from dbbackup.db.base import get_connector
+from quantum_digital import metrics
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -13,19 +19,31 @@ class Command(BaseCommand):
         parser.add_argument(
             '--cleanup',
             action='store_true',
-            help='Also cleanup old backup files'
+            help='Also prune backups outside the retention policy (BACKUP_KEEP_DAILY/WEEKLY/MONTHLY)'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Write an incremental streaming backup instead of a full dump'
         )
 
     def handle(self, *args, **options):
         """
         Perform daily database backup with optional cleanup
         """
+        started = time.perf_counter()
         self.stdout.write('🔄 Starting daily database backup...')
         
         try:
             # Perform database backup
-            self.stdout.write('📦 Creating database backup...')
-            call_command('dbbackup', verbosity=1)
+            if options['incremental']:
+                self.stdout.write('📦 Creating incremental database backup...')
+                call_command('production_backup', incremental=True, verbosity=1)
+            else:
+                self.stdout.write('📦 Creating database backup...')
+                filename = get_connector().generate_filename()
+                call_command('dbbackup', output_filename=filename, verbosity=1)
+                Catalog(backup_location()).add_file(backup_location() / filename, 'full', 'dbbackup')
             self.stdout.write(self.style.SUCCESS('✅ Database backup completed'))
             
             # Perform media backup if needed
@@ -43,8 +61,11 @@ class Command(BaseCommand):
             if options['cleanup']:
                 self.stdout.write('🧹 Cleaning up old backups...')
                 try:
-                    call_command('dbbackup', '--clean', verbosity=1)
-                    self.stdout.write(self.style.SUCCESS('✅ Backup cleanup completed'))
+                    removed = Catalog(backup_location()).prune(retention_policy())
+                    collect_garbage(backup_location())
+                    self.stdout.write(
+                        self.style.SUCCESS(f'✅ Backup cleanup completed ({len(removed)} removed)')
+                    )
                 except Exception as e:
                     self.stdout.write(
                         self.style.WARNING(f'⚠️  Cleanup failed: {e}')
@@ -53,6 +74,7 @@ class Command(BaseCommand):
             # Log success
             timestamp = timezone.now().strftime('%Y-%m-%d %H:%M:%S')
             logger.info(f'Daily backup completed successfully at {timestamp}')
+            metrics.record_backup('daily_backup', time.perf_counter() - started, success=True)
             
             self.stdout.write(
                 self.style.SUCCESS('🎉 Daily backup process completed successfully!')
@@ -61,6 +83,7 @@ class Command(BaseCommand):
         except Exception as e:
             error_msg = f'Daily backup failed: {e}'
             logger.error(error_msg)
+            metrics.record_backup('daily_backup', time.perf_counter() - started, success=False)
             self.stdout.write(
                 self.style.ERROR(f'❌ {error_msg}')
             )
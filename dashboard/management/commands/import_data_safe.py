@@ -1,66 +1,71 @@
 from django.core.management.base import BaseCommand
-from django.core import serializers
-from django.db import transaction
-import json
+from dashboard.backups.importer import FixtureImporter
+import time
 
 
 class Command(BaseCommand):
     help = 'Safely import data excluding conflicting models'
-    
+
     def add_arguments(self, parser):
-        parser.add_argument('fixture_file', type=str, help='Path to the fixture file')
+        parser.add_argument(
+            'fixture_file',
+            type=str,
+            help='Path to the fixture file (JSON array or JSON Lines, optionally .gz/.zst)'
+        )
         parser.add_argument(
             '--exclude-models',
             nargs='*',
             default=['sites.site'],
             help='Models to exclude from import (default: sites.site)'
         )
-    
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Objects per bulk upsert (default: 1000)'
+        )
+
     def handle(self, *args, **options):
         fixture_file = options['fixture_file']
         exclude_models = options['exclude_models']
-        
+
         self.stdout.write(f'Importing data from: {fixture_file}')
         self.stdout.write(f'Excluding models: {exclude_models}')
-        
+
         try:
-            with open(fixture_file, 'r') as f:
-                data = json.load(f)
-            
-            # Filter out excluded models
-            filtered_data = []
-            excluded_count = 0
-            
-            for item in data:
-                if item.get('model') in exclude_models:
-                    excluded_count += 1
-                    continue
-                filtered_data.append(item)
-            
-            self.stdout.write(f'Original objects: {len(data)}')
-            self.stdout.write(f'Excluded objects: {excluded_count}')
-            self.stdout.write(f'Objects to import: {len(filtered_data)}')
-            
-            # Import the filtered data
-            with transaction.atomic():
-                for obj_data in serializers.deserialize('json', json.dumps(filtered_data)):
-                    try:
-                        obj_data.save()
-                    except Exception as e:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'⚠️  Warning: Failed to import {obj_data.object}: {e}'
-                            )
-                        )
-                        # Continue with other objects
-                        continue
-            
+            # Stream the fixture and upsert each model in batches
+            started = time.perf_counter()
+            importer = FixtureImporter(
+                exclude_models=exclude_models,
+                batch_size=options['batch_size'],
+                on_error=self._report_error,
+            )
+            stats = importer.run(fixture_file)
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(f'Original objects: {stats["read"]}')
+            self.stdout.write(f'Excluded objects: {stats["excluded"]}')
+            for label, count in stats['models'].items():
+                self.stdout.write(f'  {label}: {count}')
+            if stats['failed']:
+                self.stdout.write(self.style.WARNING(f'⚠️  Failed objects: {stats["failed"]}'))
+
             self.stdout.write(
-                self.style.SUCCESS(f'✅ Successfully imported {len(filtered_data)} objects!')
+                self.style.SUCCESS(
+                    f'✅ Successfully imported {stats["imported"]} objects in {elapsed:.1f}s!'
+                )
             )
-            
+
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'❌ Error importing data: {e}')
             )
-            raise
\ No newline at end of file
+            raise
+
+    def _report_error(self, obj, error):
+        # Continue with other objects
+        self.stdout.write(
+            self.style.WARNING(
+                f'⚠️  Warning: Failed to import {obj}: {error}'
+            )
+        )
@@ -0,0 +1,276 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from profiles.models import BrandProfile
+from .run_benchmarks import Command as ViewBenchmark
+from .seed_benchmark_data import BENCHMARK_MANAGER_USERNAME
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+SERVERS = {
+    'wsgi': ['quantum_digital.wsgi:application', '--worker-class', 'gthread'],
+    'asgi': ['quantum_digital.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the read views under gunicorn in WSGI (gthread) and ASGI (uvicorn) mode '
+        'with concurrent connections and report throughput as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=list(SERVERS),
+            default=list(SERVERS),
+            help='Server modes to compare (default: wsgi asgi)'
+        )
+        parser.add_argument(
+            '--connections',
+            type=int,
+            default=20,
+            help='Concurrent clients sending requests back to back (default: 20)'
+        )
+        parser.add_argument(
+            '--slow-clients',
+            type=int,
+            default=0,
+            help='Extra clients that download the public dashboard slowly while the load runs (default: 0)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Seconds of load per view (default: 10)'
+        )
+        parser.add_argument(
+            '--profiles',
+            nargs='+',
+            choices=['balanced', 'cpu', 'memory'],
+            help='Size the server with these gunicorn.conf.py profiles instead of --workers/--threads'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Gunicorn workers (default: 2)'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=2,
+            help='Threads per gthread worker in WSGI mode (default: 2)'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Local port the server under test listens on (default: 8765)'
+        )
+        parser.add_argument(
+            '--prefix',
+            default='bench',
+            help='Username prefix used by seed_benchmark_data (default: bench)'
+        )
+        parser.add_argument(
+            '--only',
+            nargs='*',
+            help='Only load the named views'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the JSON report to this file instead of stdout'
+        )
+
+    def handle(self, *args, **options):
+        brand = (
+            BrandProfile.objects.filter(user__username__startswith=f'{options["prefix"]}_brand_', is_public_enabled=True)
+            .order_by('id').first()
+        )
+        if brand is None:
+            raise CommandError('No benchmark brands found - run seed_benchmark_data first')
+        try:
+            manager = User.objects.get(username=BENCHMARK_MANAGER_USERNAME)
+        except User.DoesNotExist:
+            raise CommandError('Benchmark manager user not found - run seed_benchmark_data first')
+
+        # A real session in the database, so the server processes see the login
+        manager_client = Client()
+        manager_client.force_login(manager)
+        manager_cookie = f'{settings.SESSION_COOKIE_NAME}={manager_client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+        public_path = reverse('dashboard:public_dashboard', kwargs={'uuid': brand.public_uuid})
+        targets = {
+            'public_dashboard_view': (public_path, None),
+            'get_brand_platforms': (reverse('manager:get_brand_platforms', args=[brand.id]), manager_cookie),
+            'manager_dashboard_data': (reverse('manager:dashboard_data'), manager_cookie),
+        }
+        if options['only']:
+            unknown = set(options['only']) - set(targets)
+            if unknown:
+                raise CommandError(f'Unknown views: {", ".join(sorted(unknown))}')
+            targets = {name: targets[name] for name in options['only']}
+
+        results = {}
+        runs = [
+            (mode, profile)
+            for mode in options['modes']
+            for profile in (options['profiles'] or [None])
+        ]
+        for mode, profile in runs:
+            server = self._start_server(mode, profile, options)
+            try:
+                results[f'{mode}/{profile}' if profile else mode] = {
+                    name: asyncio.run(self._load(name, path, cookie, public_path, options))
+                    for name, (path, cookie) in targets.items()
+                }
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+        report = {
+            'commit': ViewBenchmark._git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'brands': BrandProfile.objects.count(),
+            'cpus': os.cpu_count(),
+            'workers': None if options['profiles'] else options['workers'],
+            'threads': None if options['profiles'] else options['threads'],
+            'connections': options['connections'],
+            'slow_clients': options['slow_clients'],
+            'duration_s': options['duration'],
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output)
+            self.stdout.write(self.style.SUCCESS(f'✅ Load benchmark report written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    def _start_server(self, mode, profile, options):
+        """Run gunicorn in a subprocess and wait until it accepts connections"""
+        label = f'{mode}/{profile}' if profile else mode
+        self.stderr.write(f'🚀 Starting {label} server...')
+        # gunicorn.conf.py is always read; command line options override it
+        command = [
+            sys.executable, '-m', 'gunicorn',
+            '--config', str(settings.BASE_DIR / 'gunicorn.conf.py'),
+            '--bind', f'127.0.0.1:{options["port"]}',
+            '--access-logfile', os.devnull,
+            '--log-level', 'warning',
+        ]
+        env = dict(os.environ, SERVER_MODE=mode)
+        if profile:
+            env['GUNICORN_PROFILE'] = profile
+        else:
+            command += [*SERVERS[mode], '--workers', str(options['workers'])]
+            if mode == 'wsgi':
+                command += ['--threads', str(options['threads'])]
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'{label} server exited with code {server.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', options['port']), timeout=1).close()
+                # Let the remaining workers finish booting
+                time.sleep(1)
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'{label} server did not start on port {options["port"]}')
+
+    async def _load(self, name, path, cookie, public_path, options):
+        """Requests per second and latency of one view under concurrent load"""
+        self.stderr.write(f'⏱️  {name}...')
+        port = options['port']
+        deadline = time.monotonic() + options['duration']
+        timings = []
+        errors = [0]
+
+        async def client():
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await fetch(port, path, cookie)
+                except OSError:
+                    status = None
+                if status == 200:
+                    timings.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors[0] += 1
+
+        async def slow_client():
+            while time.monotonic() < deadline:
+                try:
+                    await fetch(port, public_path, None, slow=True)
+                except OSError:
+                    pass
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client() for _ in range(options['connections'])),
+            *(slow_client() for _ in range(options['slow_clients'])),
+        )
+        elapsed = time.perf_counter() - started
+
+        if not timings:
+            raise CommandError(f'{name} did not return a single HTTP 200')
+        return {
+            'requests': len(timings),
+            'errors': errors[0],
+            'requests_per_s': round(len(timings) / elapsed, 1),
+            'p50_ms': round(ViewBenchmark._percentile(timings, 50), 2),
+            'p95_ms': round(ViewBenchmark._percentile(timings, 95), 2),
+            'max_ms': round(max(timings), 2),
+        }
+
+
+async def fetch(port, path, cookie, slow=False):
+    """GET path over a fresh connection and return the status code"""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if slow:
+        # A small receive window keeps the server writing until the client is done
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.setblocking(False)
+    try:
+        await loop.sock_connect(sock, ('127.0.0.1', port))
+    except OSError:
+        sock.close()
+        raise
+    reader, writer = await asyncio.open_connection(sock=sock)
+    try:
+        headers = [f'GET {path} HTTP/1.1', 'Host: localhost', 'Connection: close']
+        if cookie:
+            headers.append(f'Cookie: {cookie}')
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode())
+        await writer.drain()
+
+        status_line = await reader.readline()
+        while True:
+            chunk = await reader.read(1024 if slow else 65536)
+            if not chunk:
+                break
+            if slow:
+                await asyncio.sleep(0.05)
+    finally:
+        writer.close()
+    parts = status_line.split()
+    return int(parts[1]) if len(parts) > 1 else None
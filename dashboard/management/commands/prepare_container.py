@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from pathlib import Path
+import hashlib
+import time
+
+# Fingerprint of the static sources the collected files were built from
+STATIC_STAMP = Path(f'{settings.STATIC_ROOT}.stamp')
+
+
+def unapplied_migrations(using=DEFAULT_DB_ALIAS):
+    """Migrations `migrate` would apply; reads the migration files and django_migrations only"""
+    executor = MigrationExecutor(connections[using])
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def static_fingerprint():
+    """Hash of every file collectstatic would copy, plus the storage backend that processes them"""
+    digest = hashlib.sha256(settings.STORAGES['staticfiles']['BACKEND'].encode())
+    sources = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            prefix = getattr(storage, 'prefix', None)
+            name = f'{prefix}/{path}' if prefix else path
+            # Like collectstatic, the first finder to provide a name wins
+            sources.setdefault(name, storage.path(path))
+    for name in sorted(sources):
+        digest.update(name.encode())
+        with open(sources[name], 'rb') as source:
+            digest.update(hashlib.sha256(source.read()).digest())
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        'Prepare the database and static files for a container start, '
+        'skipping migrate and collectstatic when there is nothing to do'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--static-only',
+            action='store_true',
+            help='Only collect static files (image build time, no database needed)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run migrate and collectstatic even if nothing changed'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if not options['static_only']:
+            self.migrate(options['force'])
+            # As before prepare_container, a broken site setup doesn't stop the container
+            self.step('🌐 Production site', lambda: call_command('setup_production', stdout=self.stdout, stderr=self.stderr), optional=True)
+        self.collect_static(options['force'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Container ready in {time.perf_counter() - started:.1f}s'))
+
+    def step(self, label, action, optional=False):
+        step_started = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            if not optional:
+                raise
+            self.stdout.write(self.style.WARNING(f'⚠️  {label} failed, continuing: {e}'))
+            return
+        self.stdout.write(f'{label}: {time.perf_counter() - step_started:.1f}s')
+
+    def migrate(self, force):
+        # Post-migrate handlers (content types, permissions, platform backfill)
+        # only have work to do when models changed, which comes with migrations
+        plan = unapplied_migrations()
+        if not plan and not force:
+            self.stdout.write('✅ No unapplied migrations, skipping migrate')
+            return
+        self.stdout.write(f'🔧 Applying {len(plan)} migration(s)...')
+        self.step('🔧 migrate', lambda: call_command('migrate', interactive=False, stdout=self.stdout, stderr=self.stderr))
+
+    def collect_static(self, force):
+        fingerprint = static_fingerprint()
+        try:
+            collected = STATIC_STAMP.read_text().strip()
+        except OSError:
+            collected = None
+        static_root = Path(settings.STATIC_ROOT)
+        if not static_root.is_dir() or not any(static_root.iterdir()):
+            collected = None
+        if collected == fingerprint and not force:
+            self.stdout.write('✅ Static files unchanged since the image was built, skipping collectstatic')
+            return
+
+        self.stdout.write('📦 Collecting static files...')
+        # Without --clear only new and changed files are copied; --clear would
+        # delete and recompress every file on each run
+        self.step('📦 collectstatic', lambda: call_command('collectstatic', interactive=False, verbosity=0))
+        try:
+            STATIC_STAMP.write_text(fingerprint)
+        except OSError as e:
+            raise CommandError(f'Static files collected but the stamp could not be written: {e}')
@@ -1,9 +1,15 @@
-from django.core.management.base import BaseCommand
-from django.core.management import call_command
-from django.utils import timezone
-from django.conf import settings
-import os
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.backups.catalog import Catalog, retention_policy
+from dashboard.backups.chunkstore import ChunkedBackupWriter, collect_garbage
+from dashboard.backups.incremental import IncrementalBackupWriter, backup_chain, prune_tombstones
+from dashboard.backups.parallel import ParallelBackupWriter
+from dashboard.backups.writer import (
+    BackupWriter, available_compressions, backup_location, manifest_path,
+)
+from datetime import datetime
+from quantum_digital import metrics
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -15,64 +21,140 @@ class Command(BaseCommand):
         parser.add_argument(
             '--cleanup',
             action='store_true',
-            help='Also cleanup old backup files'
+            help='Also prune backups outside the retention policy (BACKUP_KEEP_DAILY/WEEKLY/MONTHLY)'
         )
         parser.add_argument(
-            '--days',
+            '--compression',
+            choices=['gzip', 'zstd'],
+            default='gzip',
+            help='Compression codec (default: gzip; zstd needs the zstandard package)'
+        )
+        parser.add_argument(
+            '--level',
+            type=int,
+            help='Compression level (default: 6 for gzip, 3 for zstd)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per database round trip (default: 2000)'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only write rows changed (and deleted) since the previous backup'
+        )
+        parser.add_argument(
+            '--dedup',
+            action='store_true',
+            help='Store the backup as content-addressed chunks shared with earlier --dedup backups'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Dump models in parallel into a directory of per-model chunk files (default: 1)'
+        )
+        parser.add_argument(
+            '--chunk-rows',
             type=int,
-            default=7,
-            help='Number of days to keep backups (default: 7)'
+            default=50000,
+            help='Rows per chunk file when --workers is above 1 (default: 50000)'
         )
 
     def handle(self, *args, **options):
         """
-        Perform production backup using Django's dumpdata
-        This works in environments where pg_dump is not available
+        Perform production backup by streaming each model into a compressed
+        JSON Lines file. This works in environments where pg_dump is not available
         """
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        backup_filename = f'quantum_digital_backup_{timestamp}.json'
-        
+        if options['compression'] not in available_compressions():
+            raise CommandError('zstd compression requires the "zstandard" package')
+        if options['incremental'] and options['workers'] > 1:
+            raise CommandError('--workers only applies to full backups')
+        if options['dedup'] and (options['incremental'] or options['workers'] > 1):
+            raise CommandError('--dedup cannot be combined with --incremental or --workers')
+
+        self.verbosity = options['verbosity']
+        started = time.perf_counter()
         self.stdout.write('🔄 Starting production database backup...')
-        
+
         try:
-            # Create Django JSON backup (works everywhere)
-            self.stdout.write('📦 Creating Django JSON backup...')
-            
-            with open(backup_filename, 'w') as backup_file:
-                call_command(
-                    'dumpdata',
-                    '--indent=2',
-                    '--natural-foreign',
-                    '--natural-primary',
-                    stdout=backup_file
+            writer_options = {
+                'compression': options['compression'],
+                'level': options['level'],
+                'chunk_size': options['chunk_size'],
+            }
+            if options['incremental'] and backup_chain()[0] is None:
+                self.stdout.write(self.style.WARNING('⚠️  No full backup yet - writing a full backup'))
+                options['incremental'] = False
+
+            if options['incremental']:
+                writer = IncrementalBackupWriter(**writer_options)
+                self.stdout.write(f'📦 Streaming changes since {writer.parent["file"]} into {writer.location}...')
+            elif options['dedup']:
+                writer = ChunkedBackupWriter(**writer_options)
+                self.stdout.write(f'📦 Streaming models into the chunk store in {writer.location}...')
+            elif options['workers'] > 1:
+                writer = ParallelBackupWriter(
+                    workers=options['workers'], chunk_rows=options['chunk_rows'], **writer_options
                 )
-            
-            # Check backup file size
-            backup_size = os.path.getsize(backup_filename)
-            backup_size_mb = backup_size / (1024 * 1024)
-            
+                self.stdout.write(f'📦 Dumping models with {writer.workers} workers into {writer.location}...')
+            else:
+                writer = BackupWriter(**writer_options)
+                self.stdout.write(f'📦 Streaming models into {writer.location}...')
+
+            manifest = writer.write(progress=self._report_model)
+            backup_path = writer.location / manifest['file']
+            backup_size_mb = manifest['size_bytes'] / (1024 * 1024)
+
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'✅ Backup completed: {backup_filename} ({backup_size_mb:.1f} MB)'
+                    f'✅ Backup completed: {backup_path} ({backup_size_mb:.1f} MB, '
+                    f'{manifest["rows"]} rows at {manifest["rows_per_second"]} rows/sec)'
                 )
             )
-            
+
+            # Deletes before a full backup no longer need replaying
+            if manifest['kind'] == 'full':
+                pruned = prune_tombstones(datetime.fromisoformat(manifest['started_at']))
+                if pruned:
+                    self.stdout.write(f'🪦 Pruned {pruned} tombstones covered by this backup')
+
             # Cleanup old backups if requested
             if options['cleanup']:
-                self._cleanup_old_backups(options['days'])
-            
+                self._cleanup_old_backups()
+
             # Log success
-            logger.info(f'Production backup completed: {backup_filename} ({backup_size_mb:.1f} MB)')
-            
+            logger.info(f'Production backup completed: {backup_path} ({backup_size_mb:.1f} MB)')
+            metrics.record_backup('production_backup', time.perf_counter() - started, success=True)
+
             # Print backup instructions
             self.stdout.write('')
             self.stdout.write('📋 BACKUP INFORMATION:')
-            self.stdout.write(f'  File: {backup_filename}')
+            self.stdout.write(f'  File: {backup_path}')
+            self.stdout.write(f'  Manifest: {manifest_path(backup_path)}')
             self.stdout.write(f'  Size: {backup_size_mb:.1f} MB')
-            self.stdout.write(f'  Records: Django JSON format with all data')
+            self.stdout.write(f'  Records: {manifest["rows"]} across {len(manifest["models"])} models')
+            if 'sha256' in manifest:
+                self.stdout.write(f'  SHA-256: {manifest["sha256"]}')
+            if 'new_chunks' in manifest:
+                self.stdout.write(
+                    f'  Chunks: {manifest["chunks"]} ({manifest["new_chunks"]} new, '
+                    f'{manifest["new_bytes"] / (1024 * 1024):.1f} MB uncompressed written)'
+                )
             self.stdout.write('')
             self.stdout.write('🔄 RESTORE INSTRUCTIONS:')
-            self.stdout.write(f'  python manage.py loaddata {backup_filename}')
+            if manifest['kind'] == 'incremental':
+                self.stdout.write(f'  python manage.py restore_backup {manifest["base"]}')
+            elif 'workers' in manifest:
+                self.stdout.write(f'  python manage.py restore_backup {manifest["file"]} --workers {manifest["workers"]}')
+            elif 'new_chunks' in manifest:
+                self.stdout.write(f'  python manage.py restore_backup {manifest["file"]}')
+            elif manifest['compression'] == 'gzip':
+                self.stdout.write(f'  python manage.py loaddata {backup_path}')
+            else:
+                self.stdout.write(f'  zstd -d {backup_path} && python manage.py loaddata {str(backup_path)[:-4]}')
             self.stdout.write('')
             self.stdout.write('📝 BACKUP CONTAINS:')
             self.stdout.write('  - All Quantum Digital brand profiles')
@@ -80,41 +162,37 @@ class Command(BaseCommand):
             self.stdout.write('  - User accounts and authentication')
             self.stdout.write('  - Site configuration and OAuth settings')
             self.stdout.write('')
-            
+
         except Exception as e:
             error_msg = f'Production backup failed: {e}'
             logger.error(error_msg)
+            metrics.record_backup('production_backup', time.perf_counter() - started, success=False)
             self.stdout.write(self.style.ERROR(f'❌ {error_msg}'))
             raise
 
-    def _cleanup_old_backups(self, days_to_keep):
-        """Remove backup files older than specified days"""
-        self.stdout.write(f'🧹 Cleaning up backups older than {days_to_keep} days...')
-        
-        import glob
-        import time
-        
-        # Find all backup files
-        backup_files = glob.glob('quantum_digital_backup_*.json')
-        current_time = time.time()
-        removed_count = 0
-        
-        for backup_file in backup_files:
-            file_age_days = (current_time - os.path.getmtime(backup_file)) / (24 * 3600)
-            
-            if file_age_days > days_to_keep:
-                try:
-                    os.remove(backup_file)
-                    removed_count += 1
-                    self.stdout.write(f'  Removed: {backup_file}')
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.WARNING(f'  Failed to remove {backup_file}: {e}')
-                    )
-        
-        if removed_count > 0:
+    def _report_model(self, label, stats):
+        if self.verbosity >= 2 or stats['rows']:
+            rate = stats['rows'] / stats['seconds'] if stats['seconds'] else 0
+            self.stdout.write(f'  {label}: {stats["rows"]} rows ({rate:.0f} rows/sec)')
+
+    def _cleanup_old_backups(self):
+        """Remove backups (and their manifests) outside the retention policy"""
+        policy = retention_policy()
+        self.stdout.write(
+            f'🧹 Keeping {policy["daily"]} daily, {policy["weekly"]} weekly '
+            f'and {policy["monthly"]} monthly backups...'
+        )
+
+        removed = Catalog(backup_location()).prune(policy)
+        for entry in removed:
+            self.stdout.write(f'  Removed: {entry["file"]}')
+        chunks, freed = collect_garbage(backup_location())
+        if chunks:
+            self.stdout.write(f'  Removed {chunks} unreferenced chunks ({freed / (1024 * 1024):.1f} MB)')
+
+        if removed:
             self.stdout.write(
-                self.style.SUCCESS(f'✅ Cleaned up {removed_count} old backup files')
+                self.style.SUCCESS(f'✅ Cleaned up {len(removed)} old backups')
             )
         else:
-            self.stdout.write('ℹ️  No old backup files to clean up')
\ No newline at end of file
+            self.stdout.write('ℹ️  No old backup files to clean up')
@@ -0,0 +1,95 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.backups.incremental import backup_chain
+from dashboard.backups.chunkstore import CHUNKED_FORMAT, iter_chunk_records
+from dashboard.backups.parallel import SPLIT_FORMAT, restore_split
+from dashboard.backups.restore import restore_file, restore_records
+from dashboard.backups.writer import backup_location
+from pathlib import Path
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Restore a full streaming backup followed by its incremental backups, in order'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'backup',
+            nargs='?',
+            help='Full backup file name to restore (default: the latest full backup)'
+        )
+        parser.add_argument(
+            '--full-only',
+            action='store_true',
+            help='Restore the full backup without replaying incrementals'
+        )
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help='Remove all existing data before restoring'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Processes loading a split (--workers) backup (default: CPU count, max 8; SQLite: 1)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show which files would be restored'
+        )
+
+    def handle(self, *args, **options):
+        location = backup_location()
+        full, incrementals = self._chain(location, options['backup'])
+        if options['full_only']:
+            incrementals = []
+
+        files = [full['file']] + [manifest['file'] for manifest in incrementals]
+        self.stdout.write(f'🔄 Restoring {len(files)} backup file(s) from {location}:')
+        for name in files:
+            self.stdout.write(f'  {name}')
+        if options['dry_run']:
+            return
+
+        if options['flush']:
+            self.stdout.write('🧹 Flushing existing data...')
+            call_command('flush', interactive=False, verbosity=0)
+
+        started = time.perf_counter()
+        if full.get('format') == SPLIT_FORMAT:
+            restore_split(location / full['file'], full, workers=options['workers'], progress=self._report_model)
+            files = files[1:]
+        elif full.get('format') == CHUNKED_FORMAT:
+            restore_records(
+                iter_chunk_records(location, full), progress=self._report_file, name=full['file']
+            )
+            files = files[1:]
+        for name in files:
+            restore_file(location / name, progress=self._report_file)
+
+        logger.info(f'Restored {full["file"]} with {len(incrementals)} incremental backup(s)')
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Restore completed in {time.perf_counter() - started:.1f}s')
+        )
+        self.stdout.write('ℹ️  Take a full backup before the next incremental one')
+
+    def _chain(self, location, backup):
+        full, incrementals = backup_chain(location, backup and Path(backup).name)
+        if full is None:
+            if backup:
+                raise CommandError(f'{Path(backup).name} is not a full backup in {location}')
+            raise CommandError(f'No full backup manifest found in {location}')
+        return full, incrementals
+
+    def _report_model(self, label, stats):
+        self.stdout.write(f'  {label}: {stats["rows"]} rows ({stats["seconds"]}s)')
+
+    def _report_file(self, path, stats):
+        rows = sum(stats['rows'].values())
+        self.stdout.write(
+            f'  {Path(path).name}: {rows} rows, {stats["deleted"]} deletes ({stats["seconds"]}s)'
+        )
@@ -0,0 +1,175 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from profiles.models import BrandProfile
+from .seed_benchmark_data import BENCHMARK_MANAGER_USERNAME
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main views through the test client and report latency, queries and memory as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Timed requests per view (default: 20)'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=2,
+            help='Untimed requests per view before measuring (default: 2)'
+        )
+        parser.add_argument(
+            '--prefix',
+            default='bench',
+            help='Username prefix used by seed_benchmark_data (default: bench)'
+        )
+        parser.add_argument(
+            '--zip-brands',
+            type=int,
+            default=10,
+            help='Brands included in the bulk folder structure export (default: 10)'
+        )
+        parser.add_argument(
+            '--only',
+            nargs='*',
+            help='Only run the named benchmarks'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the JSON report to this file instead of stdout'
+        )
+
+    def handle(self, *args, **options):
+        brands = list(
+            BrandProfile.objects.select_related('user')
+            .filter(user__username__startswith=f'{options["prefix"]}_brand_')
+            .order_by('id')[:max(options['zip_brands'], 1)]
+        )
+        if not brands:
+            raise CommandError('No benchmark brands found - run seed_benchmark_data first')
+        try:
+            manager = User.objects.get(username=BENCHMARK_MANAGER_USERNAME)
+        except User.DoesNotExist:
+            raise CommandError('Benchmark manager user not found - run seed_benchmark_data first')
+
+        brand = brands[0]
+        manager_client = Client()
+        manager_client.force_login(manager)
+        brand_client = Client()
+        brand_client.force_login(brand.user)
+        anonymous_client = Client()
+
+        benchmarks = {
+            'manager_dashboard': lambda: manager_client.get(reverse('manager:dashboard')),
+            'brand_detail': lambda: manager_client.get(
+                reverse('manager:brand_detail', args=[brand.id])),
+            'brand_quick_update': lambda: manager_client.get(
+                reverse('manager:brand_quick_update', args=[brand.id])),
+            'get_brand_platforms': lambda: manager_client.get(
+                reverse('manager:get_brand_platforms', args=[brand.id])),
+            'dashboard_view': lambda: brand_client.get(reverse('dashboard:dashboard')),
+            'public_dashboard_view': lambda: anonymous_client.get(
+                reverse('dashboard:public_dashboard', kwargs={'uuid': brand.public_uuid})),
+            'generate_folder_structure': lambda: manager_client.post(
+                reverse('manager:generate_folder_structure'),
+                {'brand_ids': [b.id for b in brands]}),
+        }
+        if options['only']:
+            unknown = set(options['only']) - set(benchmarks)
+            if unknown:
+                raise CommandError(f'Unknown benchmarks: {", ".join(sorted(unknown))}')
+            benchmarks = {name: benchmarks[name] for name in options['only']}
+
+        # Allows the test client's "testserver" host and instruments template rendering
+        setup_test_environment()
+        try:
+            results = {
+                name: self._run(name, request, options['iterations'], options['warmup'])
+                for name, request in benchmarks.items()
+            }
+        finally:
+            teardown_test_environment()
+
+        report = {
+            'commit': self._git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'brands': BrandProfile.objects.count(),
+            'iterations': options['iterations'],
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output)
+            self.stdout.write(self.style.SUCCESS(f'✅ Benchmark report written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    def _run(self, name, request, iterations, warmup):
+        """Time one view and collect its query count and peak memory"""
+        self.stderr.write(f'⏱️  {name}...')
+
+        for _ in range(warmup):
+            self._check(name, request())
+
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            self._check(name, request())
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # Queries and memory are measured on a separate request so that
+        # tracing overhead does not skew the timings above
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = request()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self._check(name, response)
+
+        return {
+            'p50_ms': round(self._percentile(timings, 50), 2),
+            'p95_ms': round(self._percentile(timings, 95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries': len(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+            'response_bytes': len(response.content),
+        }
+
+    def _check(self, name, response):
+        if response.status_code != 200:
+            raise CommandError(f'{name} returned HTTP {response.status_code}')
+
+    @staticmethod
+    def _percentile(values, percent):
+        ordered = sorted(values)
+        index = (len(ordered) - 1) * percent / 100
+        lower = int(index)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+    @staticmethod
+    def _git_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,219 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.functions import Length
+from django.utils import timezone
+from profiles.models import BrandProfile
+from dashboard.models import ClientPlatformProgress, ContentLink
+import random
+import re
+import time
+import uuid
+
+
+BENCHMARK_MANAGER_USERNAME = 'bench_manager'
+
+LOREM = (
+    'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod '
+    'tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, '
+    'quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat.'
+)
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic multi-brand dataset for benchmarking views'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brands',
+            type=int,
+            default=1000,
+            help='Number of brands to create (default: 1000)'
+        )
+        parser.add_argument(
+            '--links',
+            type=int,
+            default=3,
+            help='Content links to create per platform row (default: 3)'
+        )
+        parser.add_argument(
+            '--prefix',
+            default='bench',
+            help='Username prefix for generated brand users (default: bench)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Brands inserted per transaction (default: 500)'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously seeded brands with the same prefix first'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed so datasets are reproducible (default: 42)'
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        brand_count = options['brands']
+        links_per_platform = options['links']
+        batch_size = options['batch_size']
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=f'{prefix}_brand_').delete()
+            self.stdout.write(f'🧹 Removed {deleted} previously seeded objects')
+
+        manager, created = User.objects.get_or_create(
+            username=BENCHMARK_MANAGER_USERNAME,
+            defaults={'email': 'bench.manager@example.com', 'is_staff': True},
+        )
+        if created:
+            manager.set_unusable_password()
+            manager.save(update_fields=['password'])
+
+        # Continue numbering after the highest brand seeded by an earlier run
+        start = self._next_number(prefix)
+        # Seeded per starting number too, so a follow-up run does not repeat the UUIDs
+        rng = random.Random(f'{options["seed"]}:{prefix}:{start}')
+
+        self.stdout.write(
+            f'🌱 Seeding {brand_count} brands with {len(ClientPlatformProgress.PLATFORM_CHOICES)} '
+            f'platforms and {links_per_platform} links per platform...'
+        )
+        started = time.perf_counter()
+        totals = {'brands': 0, 'platforms': 0, 'links': 0}
+
+        for offset in range(0, brand_count, batch_size):
+            numbers = range(start + offset, start + min(offset + batch_size, brand_count))
+            with transaction.atomic():
+                batch = self._create_batch(prefix, numbers, links_per_platform, manager, rng)
+            for key, value in batch.items():
+                totals[key] += value
+            self.stdout.write(f'  Seeded {totals["brands"]}/{brand_count} brands')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Created {totals["brands"]} brands, {totals["platforms"]} platform rows and '
+                f'{totals["links"]} content links in {elapsed:.1f}s'
+            )
+        )
+
+    def _next_number(self, prefix):
+        """One past the highest numeric suffix of <prefix>_brand_<n> usernames"""
+        highest = (
+            User.objects.filter(username__regex=rf'^{re.escape(prefix)}_brand_[0-9]+$')
+            .annotate(length=Length('username'))
+            .order_by('-length', '-username')
+            .values_list('username', flat=True)
+            .first()
+        )
+        return int(highest.rsplit('_', 1)[1]) + 1 if highest else 0
+
+    def _create_batch(self, prefix, numbers, links_per_platform, manager, rng):
+        """Insert one batch of users, profiles, platform rows and links"""
+        users = User.objects.bulk_create([
+            User(
+                username=f'{prefix}_brand_{number}',
+                email=f'{prefix}_brand_{number}@example.com',
+                password='!',  # Unusable password
+            )
+            for number in numbers
+        ])
+
+        now = timezone.now()
+        brands = BrandProfile.objects.bulk_create([
+            self._build_brand(user, number, manager, now, rng)
+            for user, number in zip(users, numbers)
+        ])
+
+        platforms = []
+        for brand in brands:
+            for platform_code, platform_name in ClientPlatformProgress.PLATFORM_CHOICES:
+                committed = rng.choice([0, 0, 5, 15, 30, 60])
+                drafted = rng.randint(0, committed)
+                platforms.append(
+                    ClientPlatformProgress(
+                        brand=brand,
+                        platform=platform_code,
+                        committed=committed,
+                        drafted=drafted,
+                        published=rng.randint(0, drafted),
+                        notes=f'Benchmark data for {platform_name}',
+                        is_visible=rng.random() > 0.2,
+                        is_active=committed > 0,
+                    )
+                )
+        platforms = ClientPlatformProgress.objects.bulk_create(platforms)
+
+        links = []
+        for platform in platforms:
+            for index in range(links_per_platform):
+                title = 'Platform Profile' if index == 0 else f'Content Folder {index}'
+                links.append(
+                    ContentLink(
+                        platform_progress=platform,
+                        title=title,
+                        url=f'https://docs.google.com/document/d/{uuid.UUID(int=rng.getrandbits(128)).hex}/edit',
+                    )
+                )
+        ContentLink.objects.bulk_create(links)
+
+        return {'brands': len(brands), 'platforms': len(platforms), 'links': len(links)}
+
+    def _build_brand(self, user, number, manager, now, rng):
+        """Build a BrandProfile with every text field populated"""
+        name = f'Benchmark Brand {number}'
+        slug = f'benchmark-brand-{number}'
+        lines = '\n'.join(f'{LOREM[:rng.randint(20, 60)]} #{i}' for i in range(10))
+        social = {
+            field: f'https://{field.replace("_", "")}.example.com/{slug}'
+            for field in (
+                'instagram', 'facebook', 'twitter', 'linkedin', 'tiktok', 'youtube',
+                'pinterest', 'snapchat', 'telegram', 'medium', 'quora', 'reddit',
+                'tumblr', 'threads', 'bluesky', 'whatsapp_business', 'website_blogs',
+            )
+        }
+        return BrandProfile(
+            user=user,
+            brand_name=name,
+            primary_contact_first_name='Bench',
+            primary_contact_last_name=f'Contact {number}',
+            primary_official_email=f'contact@{slug}.example.com',
+            primary_phone_number='+1-555-0100',
+            secondary_contact_first_name='Second',
+            secondary_contact_last_name=f'Contact {number}',
+            secondary_official_email=f'second@{slug}.example.com',
+            secondary_phone_number='+1-555-0101',
+            brand_vision=LOREM,
+            brand_mission=LOREM,
+            brand_core_values=lines,
+            brand_visual_verbal_dna_guidelines=f'https://{slug}.example.com/guidelines.pdf',
+            brand_website=f'https://{slug}.example.com',
+            brand_presence=LOREM,
+            website_traffic_kpis=f'{rng.randint(1, 100)}k visits/month',
+            instagram_reach_kpis=f'{rng.randint(1, 100)}k reach',
+            google_sepr_rank_kpis=f'Page {rng.randint(1, 5)}',
+            review_rating_kpis=f'{rng.randint(30, 50) / 10} stars',
+            social_media_posts_per_week_kpis=str(rng.randint(1, 20)),
+            videos_per_week_kpis=str(rng.randint(0, 5)),
+            shorts_per_week_kpis=str(rng.randint(0, 10)),
+            strengths=lines,
+            weaknesses=lines,
+            opportunities=lines,
+            threats=lines,
+            top_10_partners=lines,
+            top_10_competitors=lines,
+            additional_notes=LOREM,
+            public_uuid=uuid.UUID(int=rng.getrandbits(128), version=4),
+            is_public_enabled=True,
+            public_link_created_by=manager,
+            public_link_created_at=now,
+            **social,
+        )
@@ -3,6 +3,7 @@ from django.contrib.sites.models import Site
 import os
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
 
 
 class Command(BaseCommand):
@@ -19,8 +20,13 @@ class Command(BaseCommand):
         """
         self.stdout.write('🚀 Setting up production environment...')
         
-        self.stdout.write(f'Ensuring site domain is set to: {self.site_domain}')
         try:
+            # Runs on every container start; one query when there is nothing to fix
+            if self._already_configured():
+                self.stdout.write(f'✅ Site ID=1 already configured for {self.site_domain}, nothing to do')
+                return
+            
+            self.stdout.write(f'Ensuring site domain is set to: {self.site_domain}')
             with transaction.atomic():
                 # Step 1: Clean up the mess first
                 self._cleanup_sites()
@@ -38,6 +44,14 @@ class Command(BaseCommand):
             # Try non-atomic fallback
             self._fallback_setup()
     
+    def _already_configured(self):
+        """True when ID=1 is the production site and no example.com or duplicate site is left"""
+        sites = list(
+            Site.objects.filter(Q(id=1) | Q(domain__in=['example.com', self.site_domain]))
+            .values_list('id', 'domain', 'name')
+        )
+        return sites == [(1, self.site_domain, 'Quantum Digital')]
+    
     def _cleanup_sites(self):
         """Remove problematic sites"""
         # Remove all example.com sites
@@ -70,8 +84,9 @@ class Command(BaseCommand):
                 self.stdout.write('✅ Updated site ID=1 to production domain')
             else:
                 # ID=1 already correct
-                site_1.name = 'Quantum Digital'
-                site_1.save()
+                if site_1.name != 'Quantum Digital':
+                    site_1.name = 'Quantum Digital'
+                    site_1.save()
                 self.stdout.write('✅ Site ID=1 already configured correctly')
                 
         except Site.DoesNotExist:
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.backups.incremental import backup_chain
+from dashboard.backups.verify import verify_backup
+from dashboard.backups.writer import backup_location
+from quantum_digital import metrics
+from pathlib import Path
+import json
+import logging
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Restore a backup into a scratch SQLite database and check it against its manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'backup',
+            nargs='?',
+            help='Full backup file name to verify (default: the latest full backup)'
+        )
+        parser.add_argument(
+            '--with-incrementals',
+            action='store_true',
+            help='Also replay the incremental backups taken on top of it and compare row counts'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the report as JSON'
+        )
+
+    def handle(self, *args, **options):
+        location = backup_location()
+        manifest, incrementals = self._select(location, options['backup'])
+        if not options['with_incrementals']:
+            incrementals = []
+
+        started = time.perf_counter()
+        self.stdout.write(f'🔍 Verifying {manifest["file"]} ({manifest["rows"]} rows)...')
+        with tempfile.TemporaryDirectory(prefix='quantum_digital_verify_') as directory:
+            report = verify_backup(location / manifest['file'], manifest, directory, incrementals)
+        metrics.record_backup('verify_backup', time.perf_counter() - started, success=report['ok'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print_report(report, incrementals)
+
+        if not report['ok']:
+            logger.error(f'Backup verification failed: {manifest["file"]}')
+            raise CommandError(f'Backup {manifest["file"]} does not match its manifest')
+
+        logger.info(f'Backup verified: {manifest["file"]} restored in {report["restore_seconds"]}s')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Backup verified: {report["rows"]} rows restored in {report["restore_seconds"]}s'
+            )
+        )
+
+    def _select(self, location, backup):
+        full, incrementals = backup_chain(location, backup and Path(backup).name)
+        if full is None:
+            if backup:
+                raise CommandError(f'{Path(backup).name} is not a full backup in {location}')
+            raise CommandError(f'No full backup manifest found in {location}')
+        return full, incrementals
+
+    def _print_report(self, report, incrementals):
+        for name in report['broken_files']:
+            self.stdout.write(self.style.ERROR(f'  ❌ Checksum mismatch: {name}'))
+        for label, result in report['models'].items():
+            if result['ok']:
+                if result['rows']:
+                    self.stdout.write(f'  {label}: {result["rows"]} rows ✓')
+                continue
+            problem = 'content hash differs' if result['rows'] == result['expected_rows'] else (
+                f'{result["rows"]} rows, expected {result["expected_rows"]}'
+            )
+            self.stdout.write(self.style.ERROR(f'  ❌ {label}: {problem}'))
+        if incrementals:
+            self.stdout.write(f'  Replayed {len(incrementals)} incremental backup(s): {report["rows"]} rows')
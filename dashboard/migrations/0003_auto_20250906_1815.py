@@ -7,10 +7,11 @@ import django.db.models.deletion
 def migrate_user_to_brand(apps, schema_editor):
     ClientPlatformProgress = apps.get_model('dashboard', 'ClientPlatformProgress')
     BrandProfile = apps.get_model('profiles', 'BrandProfile')
+    db_alias = schema_editor.connection.alias
     
-    for progress in ClientPlatformProgress.objects.all():
+    for progress in ClientPlatformProgress.objects.using(db_alias).all():
         try:
-            brand = BrandProfile.objects.get(user=progress.user)
+            brand = BrandProfile.objects.using(db_alias).get(user=progress.user)
             progress.brand = brand
             progress.save()
         except BrandProfile.DoesNotExist:
@@ -19,8 +20,9 @@ def migrate_user_to_brand(apps, schema_editor):
 
 def reverse_migrate_brand_to_user(apps, schema_editor):
     ClientPlatformProgress = apps.get_model('dashboard', 'ClientPlatformProgress')
+    db_alias = schema_editor.connection.alias
     
-    for progress in ClientPlatformProgress.objects.all():
+    for progress in ClientPlatformProgress.objects.using(db_alias).all():
         if progress.brand:
             progress.user = progress.brand.user
             progress.save()
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_ensure_site_setup'),
+        ('profiles', '0002_brandprofile_is_public_enabled_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientplatformprogress',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['brand', 'platform'], name='cpp_brand_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientplatformprogress',
+            index=models.Index(condition=models.Q(('committed', 0)), fields=['brand'], name='cpp_brand_uncommitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contentlink',
+            index=models.Index(fields=['platform_progress', 'title'], name='contentlink_progress_title_idx'),
+        ),
+    ]
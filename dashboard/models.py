@@ -5,6 +5,7 @@ from django.contrib.auth.models import User
 class ClientPlatformProgress(models.Model):
     """Simple model to track content progress per client per platform"""
     
+    # Platforms added here are created for every brand on the next migrate
     PLATFORM_CHOICES = [
         ('website_blogs', 'Website Blogs'),
         ('website_downloadable', 'Website Downloadable'),
@@ -54,6 +55,20 @@ class ClientPlatformProgress(models.Model):
     
     class Meta:
         unique_together = ['brand', 'platform']
+        indexes = [
+            # Dashboards list a brand's visible platforms ordered by platform
+            models.Index(
+                fields=['brand', 'platform'],
+                condition=models.Q(is_visible=True),
+                name='cpp_brand_visible_idx',
+            ),
+            # bulk_platform_visibility hides a brand's uncommitted platforms
+            models.Index(
+                fields=['brand'],
+                condition=models.Q(committed=0),
+                name='cpp_brand_uncommitted_idx',
+            ),
+        ]
         verbose_name = 'Client Platform Progress'
         verbose_name_plural = 'Client Platform Progress'
     
@@ -80,10 +95,30 @@ class ContentLink(models.Model):
     title = models.CharField(max_length=200, help_text="Description of this link (e.g., 'Content Calendar', 'Draft Folder')")
     url = models.URLField(help_text="Google Doc, Drive folder, or any resource URL")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.platform_progress} - {self.title}"
     
     class Meta:
+        indexes = [
+            # 'Platform Profile' link lookups per platform row
+            models.Index(fields=['platform_progress', 'title'], name='contentlink_progress_title_idx'),
+        ]
         verbose_name = 'Content Link'
         verbose_name_plural = 'Content Links'
+
+
+class BackupTombstone(models.Model):
+    """Rows deleted since the last backup, replayed by incremental restores"""
+    
+    model = models.CharField(max_length=100, help_text="Model label, e.g. 'dashboard.contentlink'")
+    object_key = models.CharField(max_length=255, help_text="JSON-encoded primary key or natural key")
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    def __str__(self):
+        return f"{self.model} {self.object_key} (deleted {self.deleted_at:%Y-%m-%d %H:%M})"
+    
+    class Meta:
+        verbose_name = 'Backup Tombstone'
+        verbose_name_plural = 'Backup Tombstones'
@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.signals import post_delete
+from profiles.models import BrandProfile
+from .models import BackupTombstone, ClientPlatformProgress, ContentLink
+import json
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+# Deletes of these models are recorded so incremental backups can replay them
+TOMBSTONE_MODELS = (User, BrandProfile, ClientPlatformProgress, ContentLink)
+
+
+def object_key(instance):
+    """Stable identity used in tombstones: natural key when the model has one"""
+    if hasattr(instance, 'natural_key'):
+        return json.dumps(list(instance.natural_key()))
+    return json.dumps(instance.pk)
+
+
+def record_tombstone(sender, instance, using, **kwargs):
+    """Record deleted rows for incremental backups"""
+    BackupTombstone.objects.using(using).create(
+        model=sender._meta.label_lower,
+        object_key=object_key(instance),
+    )
+
+
+# Connected per model so other models keep Django's fast-delete path
+for model in TOMBSTONE_MODELS:
+    post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'tombstone_{model._meta.label_lower}')
+
+
+def create_new_platform_records(sender, using, verbosity=1, stdout=None, **kwargs):
+    """
+    After migrate, give every brand rows for platforms newly added to
+    PLATFORM_CHOICES. A platform no brand has a row for counts as new, so
+    rows removed for individual brands are not recreated. Connected for the
+    dashboard app only, so it runs once per migrate.
+    """
+    executor = MigrationExecutor(connections[using])
+    if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+        return  # Partial migrate: the models may be ahead of the schema
+
+    brands = BrandProfile.objects.using(using)
+    if not brands.exists():
+        return
+    present = set(ClientPlatformProgress.objects.using(using).values_list('platform', flat=True).distinct())
+    new_platforms = [code for code, _ in ClientPlatformProgress.PLATFORM_CHOICES if code not in present]
+    if not new_platforms:
+        return
+
+    created_count, brands_updated = BrandProfile.create_missing_platform_records(platforms=new_platforms, using=using)
+    logger.info(f'Created {created_count} records for new platforms {", ".join(new_platforms)}')
+    if verbosity >= 1:
+        (stdout or sys.stdout).write(
+            f'  Created {created_count} platform records for {", ".join(new_platforms)} across {brands_updated} brands\n'
+        )
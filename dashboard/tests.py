@@ -1,3 +1,717 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection, connections, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from io import StringIO
+import os
+from pathlib import Path
+from unittest import mock
+from profiles.models import BrandProfile
+from .management.commands import prepare_container
+from .management.commands.setup_production import Command as SetupProductionCommand
+from .backups.catalog import Catalog, retained
+from .backups.chunkstore import ChunkStore, ChunkedBackupWriter, broken_chunks, collect_garbage
+from .backups.importer import FixtureImporter
+from .backups.verify import SCRATCH_ALIAS, sqlite_database, verify_backup
+from .backups.incremental import IncrementalBackupWriter
+from .backups.parallel import ParallelBackupWriter, dependency_levels, restore_split
+from .backups.restore import iter_records, restore_file
+from .backups.verify import scratch_database
+from .backups.writer import (
+    COMPRESSION_EXTENSIONS, MANIFEST_SUFFIX, BackupWriter, available_compressions, backup_models, file_sha256,
+    read_manifest, serialize_queryset,
+)
+from .bulk import OPERATIONS, apply_operation
+from .models import BackupTombstone, ClientPlatformProgress, ContentLink
+import json
+import shutil
+import tempfile
 
-# Create your tests here.
+STATIC_STORAGES = {**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}
+
+
+def create_brand(username, using='default', platforms=('linkedin',)):
+    """A user with a brand profile, platform rows and one link per platform"""
+    user = User.objects.db_manager(using).create_user(username, f'{username}@example.com')
+    brand = BrandProfile.objects.using(using).create(
+        user=user, brand_name=f'Brand {username}',
+        primary_contact_first_name='Primary', primary_contact_last_name='Contact',
+        primary_official_email=f'contact@{username}.example.com', primary_phone_number='+1-555-0100',
+        brand_vision='Vision', brand_mission='Mission', brand_core_values='Values',
+    )
+    for platform in platforms:
+        progress = ClientPlatformProgress.objects.using(using).create(brand=brand, platform=platform, committed=5)
+        ContentLink.objects.using(using).create(
+            platform_progress=progress, title='Platform Profile', url=f'https://{platform}.example.com/{username}',
+        )
+    return brand
+
+
+class TemporaryDirectoryMixin:
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+
+class SourceDatabaseMixin(TemporaryDirectoryMixin):
+    """
+    A migrated SQLite file registered as 'backup_source' for each test, for
+    backup tests that restore into a second database (use with SimpleTestCase)
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Both databases are temporary files registered while a test runs
+        cls.databases = cls.databases | {'backup_source', SCRATCH_ALIAS}
+
+    def setUp(self):
+        super().setUp()
+        source = sqlite_database(self.directory / 'source.sqlite3', 'backup_source')
+        self.using = source.__enter__()
+        self.addCleanup(source.__exit__, None, None, None)
+        self.migrate_source()
+
+    def migrate_source(self):
+        call_command('migrate', database=self.using, verbosity=0)
+
+    def assertSameRows(self, using, other):
+        """Every backed up model has the same serialized rows in both databases"""
+        for model in backup_models(self.using):
+            digests = []
+            for alias in (using, other):
+                with open(os.devnull, 'wb') as output:
+                    digests.append(serialize_queryset(model._default_manager.using(alias).all(), output)[::2])
+            self.assertEqual(digests[0], digests[1], model._meta.label_lower)
+
+
+class HotPathIndexTests(TestCase):
+    """The planner picks the partial and composite indexes for the dashboard filters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_benchmark_data', brands=100, links=2, stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.brand = BrandProfile.objects.order_by('id').first()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f'{index_name} not used:\n{plan}')
+
+    def test_visible_platforms_use_partial_index(self):
+        queryset = ClientPlatformProgress.objects.filter(brand=self.brand, is_visible=True).order_by('platform')
+        self.assertUsesIndex(queryset, 'cpp_brand_visible_idx')
+
+    def test_uncommitted_platforms_use_partial_index(self):
+        queryset = ClientPlatformProgress.objects.filter(brand=self.brand, committed=0)
+        self.assertUsesIndex(queryset, 'cpp_brand_uncommitted_idx')
+
+    def test_platform_profile_link_uses_composite_index(self):
+        platform = self.brand.platform_progress.order_by('id').first()
+        queryset = ContentLink.objects.filter(platform_progress=platform, title='Platform Profile')
+        self.assertUsesIndex(queryset, 'contentlink_progress_title_idx')
+
+
+class BackupWriterTests(TemporaryDirectoryMixin, TestCase):
+    def test_write_then_read_each_compression(self):
+        create_brand('writer_one')
+        create_brand('writer_two', platforms=('linkedin', 'youtube'))
+        models = [User, BrandProfile, ClientPlatformProgress, ContentLink]
+        for compression in COMPRESSION_EXTENSIONS:
+            with self.subTest(compression=compression):
+                if compression not in available_compressions():
+                    self.skipTest(f'{compression} support is not installed')
+                manifest = BackupWriter(location=self.directory, compression=compression).write(models=models)
+                path = self.directory / manifest['file']
+                self.assertTrue(path.name.endswith(COMPRESSION_EXTENSIONS[compression]))
+                self.assertEqual(read_manifest(path), manifest)
+                self.assertEqual(file_sha256(path), manifest['sha256'])
+
+                counts = {}
+                for record in iter_records(path):
+                    counts[record['model']] = counts.get(record['model'], 0) + 1
+                self.assertEqual(counts, {
+                    'auth.user': 2, 'profiles.brandprofile': 2,
+                    'dashboard.clientplatformprogress': 3, 'dashboard.contentlink': 3,
+                })
+                self.assertEqual({label: stats['rows'] for label, stats in manifest['models'].items()}, counts)
+                self.assertEqual(manifest['rows'], 10)
+
+    def test_timestamps_keep_microseconds(self):
+        create_brand('writer_time')
+        written = timezone.now().replace(microsecond=123)
+        ContentLink.objects.update(updated_at=written)
+        manifest = BackupWriter(location=self.directory).write(models=[ContentLink])
+        records = list(iter_records(self.directory / manifest['file']))
+        self.assertEqual(records[0]['fields']['updated_at'], written.isoformat().replace('+00:00', 'Z'))
+        restored = next(serializers.deserialize('python', records)).object
+        self.assertEqual(restored.updated_at, written)
+
+
+class VerifyBackupTests(SourceDatabaseMixin, SimpleTestCase):
+    """Restore drills pass for a database that was migrated in stages, like production"""
+
+    def migrate_source(self):
+        # The baseline schema first, the rest later: content types and
+        # permissions of the newer models get higher pks than a fresh migrate gives
+        call_command('migrate', 'dashboard', '0007', database=self.using, verbosity=0)
+        call_command('migrate', 'profiles', '0002', database=self.using, verbosity=0)
+        call_command('migrate', database=self.using, verbosity=0)
+        create_brand('staged_brand', using=self.using)
+
+    def assertBackupVerifies(self, writer_class):
+        manifest = writer_class(location=self.directory, using=self.using).write()
+        scratch = self.directory / 'scratch'
+        scratch.mkdir()
+        report = verify_backup(self.directory / manifest['file'], manifest, scratch)
+        failed = {label: result for label, result in report['models'].items() if not result['ok']}
+        self.assertEqual(failed, {})
+        self.assertEqual(report['broken_files'], [])
+        self.assertTrue(report['ok'])
+
+    def test_jsonl_backup_of_staged_database_verifies(self):
+        self.assertBackupVerifies(BackupWriter)
+
+    def test_chunked_backup_of_staged_database_verifies(self):
+        self.assertBackupVerifies(ChunkedBackupWriter)
+
+
+class SeedBenchmarkDataTests(TestCase):
+    def seed(self, **options):
+        call_command('seed_benchmark_data', links=1, stdout=StringIO(), **options)
+
+    def snapshot(self):
+        return (
+            list(BrandProfile.objects.order_by('user__username').values_list('user__username', 'public_uuid')),
+            list(ContentLink.objects.order_by('platform_progress__brand__user__username', 'platform_progress__platform')
+                 .values_list('url', flat=True)),
+        )
+
+    def test_same_seed_gives_same_dataset(self):
+        self.seed(brands=3, seed=7)
+        first = self.snapshot()
+        self.seed(brands=3, seed=7, clear=True)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_numbering_continues_after_highest_suffix(self):
+        self.seed(brands=3)
+        User.objects.get(username='bench_brand_1').delete()
+        self.seed(brands=1)
+        self.assertEqual(
+            sorted(User.objects.filter(username__startswith='bench_brand_').values_list('username', flat=True)),
+            ['bench_brand_0', 'bench_brand_2', 'bench_brand_3'],
+        )
+
+
+class IncrementalBackupTests(SourceDatabaseMixin, SimpleTestCase):
+    def test_full_and_incremental_restore_into_fresh_database(self):
+        keep = create_brand('keep', using=self.using, platforms=('linkedin', 'youtube'))
+        gone = create_brand('gone', using=self.using)
+        full = BackupWriter(location=self.directory, using=self.using).write()
+
+        platform = keep.platform_progress.using(self.using).get(platform='linkedin')
+        platform.committed = 20
+        platform.save()
+        ContentLink.objects.using(self.using).filter(platform_progress__brand=keep, platform_progress__platform='youtube').delete()
+        gone.user.delete(using=self.using)
+        create_brand('new', using=self.using)
+        incremental = IncrementalBackupWriter(location=self.directory, using=self.using).write()
+        self.assertEqual(incremental['parent'], full['file'])
+
+        scratch_directory = self.directory / 'scratch'
+        scratch_directory.mkdir()
+        with scratch_database(scratch_directory) as scratch:
+            restore_file(self.directory / full['file'], using=scratch)
+            # A delete in the restored database that no backup has captured yet
+            local = BackupTombstone.objects.using(scratch).create(model='dashboard.contentlink', object_key='999999')
+            stats = restore_file(self.directory / incremental['file'], using=scratch)
+
+            self.assertGreater(stats['deleted'], 0)
+            self.assertSameRows(self.using, scratch)
+            self.assertEqual(list(BackupTombstone.objects.using(scratch).values_list('pk', flat=True)), [local.pk])
+
+
+    def test_verify_compares_row_counts_after_incrementals(self):
+        create_brand('counted', using=self.using, platforms=('linkedin', 'youtube'))
+        full = BackupWriter(location=self.directory, using=self.using).write()
+        create_brand('added', using=self.using)
+        writer = IncrementalBackupWriter(location=self.directory, using=self.using)
+        first = writer.write(path=writer.backup_path('20260101_000001'))
+        self.assertEqual(first['table_rows']['dashboard.contentlink'], 3)
+        # A delete that bypasses the tombstone signal never reaches an incremental
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('DELETE FROM dashboard_contentlink WHERE id = (SELECT MIN(id) FROM dashboard_contentlink)')
+        writer = IncrementalBackupWriter(location=self.directory, using=self.using)
+        second = writer.write(path=writer.backup_path('20260101_000002'))
+
+        for incrementals, failed in (([first], []), ([first, second], ['dashboard.contentlink'])):
+            scratch = self.directory / f'scratch_{len(incrementals)}'
+            scratch.mkdir()
+            report = verify_backup(self.directory / full['file'], full, scratch, incrementals)
+            self.assertEqual(report['models']['auth.user'], {'expected_rows': 2, 'rows': 2, 'ok': True})
+            self.assertEqual([label for label, result in report['models'].items() if not result['ok']], failed)
+            self.assertEqual(report['broken_files'], [])
+            self.assertEqual(report['ok'], not failed)
+
+
+class PublicLinkIncrementalTests(TemporaryDirectoryMixin, TestCase):
+    """Public link changes bump updated_at, so the next incremental carries them"""
+
+    def setUp(self):
+        super().setUp()
+        self.brand = create_brand('public_link')
+        self.brand.generate_public_uuid()
+        # Last changed well before the full backup's watermark overlap
+        BrandProfile.objects.filter(pk=self.brand.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        BackupWriter(location=self.directory).write(models=[BrandProfile])
+        self.client.force_login(User.objects.create_user('public_link_manager', is_staff=True))
+
+    def incremental_brand(self):
+        manifest = IncrementalBackupWriter(location=self.directory).write(models=[BrandProfile])
+        brands = [
+            record for record in iter_records(self.directory / manifest['file'])
+            if record['model'] == 'profiles.brandprofile' and record['pk'] == self.brand.pk
+        ]
+        self.assertEqual(len(brands), 1)
+        return brands[0]['fields']
+
+    def test_toggled_public_access_is_in_next_incremental(self):
+        response = self.client.post(reverse('manager:toggle_public_access', args=[self.brand.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.incremental_brand()['is_public_enabled'], response.json()['is_enabled'])
+
+    def test_regenerated_uuid_is_in_next_incremental(self):
+        self.client.post(reverse('manager:regenerate_public_uuid', args=[self.brand.pk]))
+        self.brand.refresh_from_db()
+        self.assertEqual(self.incremental_brand()['public_uuid'], str(self.brand.public_uuid))
+
+
+class SplitBackupTests(SourceDatabaseMixin, SimpleTestCase):
+    def test_dependency_levels_follow_foreign_keys(self):
+        levels = dependency_levels([ContentLink, ClientPlatformProgress, BrandProfile, User])
+        self.assertEqual(levels, [
+            ['auth.user'], ['profiles.brandprofile'], ['dashboard.clientplatformprogress'], ['dashboard.contentlink'],
+        ])
+
+    def test_pk_boundaries_start_every_chunk(self):
+        for number in range(5):
+            create_brand(f'bounds_{number}', using=self.using)
+        pks = list(User.objects.using(self.using).order_by('pk').values_list('pk', flat=True))
+        writer = ParallelBackupWriter(location=self.directory, using=self.using, workers=1, chunk_rows=2)
+        self.assertEqual(writer.pk_boundaries(User), [pks[2], pks[4]])
+
+    def test_split_backup_restores_into_fresh_database(self):
+        for number in range(5):
+            create_brand(f'split_{number}', using=self.using, platforms=('linkedin', 'youtube'))
+        manifest = ParallelBackupWriter(location=self.directory, using=self.using, workers=1, chunk_rows=3).write()
+        self.assertEqual(len(manifest['models']['dashboard.contentlink']['chunks']), 4)
+
+        scratch_directory = self.directory / 'scratch'
+        scratch_directory.mkdir()
+        with scratch_database(scratch_directory) as scratch:
+            results = restore_split(self.directory / manifest['file'], manifest, using=scratch)
+            self.assertEqual(results['dashboard.contentlink']['rows'], 10)
+            self.assertSameRows(self.using, scratch)
+
+
+class FixtureImporterTests(TemporaryDirectoryMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.brand = create_brand('importer')
+        self.platform = self.brand.platform_progress.get()
+        self.errors = []
+
+    def run_import(self, records, **options):
+        path = self.directory / 'fixture.json'
+        path.write_text(json.dumps(records))
+        importer = FixtureImporter(on_error=lambda obj, error: self.errors.append(obj), **options)
+        return importer.run(path)
+
+    def platform_record(self, pk, platform, **fields):
+        return {'model': 'dashboard.clientplatformprogress', 'pk': pk, 'fields': {
+            'brand': self.brand.pk, 'platform': platform, 'committed': 3, 'drafted': 0, 'published': 0,
+            'notes': '', 'is_visible': True, 'is_active': True,
+            'created_at': '2024-01-02T03:04:05.123456Z', 'updated_at': '2024-02-03T04:05:06.654321Z',
+            **fields,
+        }}
+
+    def test_fixture_timestamps_are_kept(self):
+        stats = self.run_import([
+            self.platform_record(self.platform.pk, 'linkedin', committed=9),
+            self.platform_record(self.platform.pk + 100, 'youtube'),
+        ])
+        self.assertEqual(stats['imported'], 2)
+        for platform in self.brand.platform_progress.all():
+            self.assertEqual(platform.created_at, datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc))
+            self.assertEqual(platform.updated_at, datetime(2024, 2, 3, 4, 5, 6, 654321, tzinfo=dt_timezone.utc))
+        linkedin = self.brand.platform_progress.get(platform='linkedin')
+        self.assertEqual(linkedin.committed, 9)
+        # The model's own auto_now is untouched by the import
+        linkedin.save()
+        self.assertGreater(linkedin.updated_at, timezone.now() - timedelta(minutes=1))
+
+    def test_unique_conflict_outside_pk_skips_only_that_row(self):
+        # A new pk for the brand's existing linkedin row breaks unique_together
+        stats = self.run_import([
+            self.platform_record(self.platform.pk + 100, 'linkedin'),
+            self.platform_record(self.platform.pk + 101, 'youtube'),
+        ])
+        self.assertEqual((stats['imported'], stats['failed']), (1, 1))
+        self.assertEqual([obj.pk for obj in self.errors], [self.platform.pk + 100])
+        self.assertEqual(
+            dict(self.brand.platform_progress.values_list('platform', 'pk')),
+            {'linkedin': self.platform.pk, 'youtube': self.platform.pk + 101},
+        )
+
+    def test_natural_key_objects_are_created_once(self):
+        record = {'model': 'auth.group', 'fields': {
+            'name': 'Importers', 'permissions': [['view_contentlink', 'dashboard', 'contentlink']],
+        }}
+        for _ in range(2):
+            self.assertEqual(self.run_import([record])['imported'], 1)
+        group = Group.objects.get(name='Importers')
+        self.assertEqual(list(group.permissions.values_list('codename', flat=True)), ['view_contentlink'])
+        self.assertEqual(self.errors, [])
+
+
+class CatalogTests(TemporaryDirectoryMixin, SimpleTestCase):
+    def test_retention_keeps_newest_of_each_day_week_and_month(self):
+        started = {
+            'tue_noon': '2026-03-31T12:00:00+00:00',
+            'tue_morning': '2026-03-31T06:00:00+00:00',
+            'mon': '2026-03-30T12:00:00+00:00',  # same ISO week as tue
+            'previous_sun': '2026-03-29T12:00:00+00:00',
+            'older_sun': '2026-03-22T12:00:00+00:00',
+            'february': '2026-02-15T12:00:00+00:00',
+            'january': '2026-0110T12:00:00+00:00'.replace('01' + '10', '01-10'),
+        }
+        entries = [{'file': name, 'started_at': moment} for name, moment in started.items()]
+        keep = retained(entries, {'daily': 2, 'weekly': 2, 'monthly': 2})
+        self.assertEqual(keep, {'tue_noon', 'mon', 'previous_sun', 'february'})
+        self.assertEqual(retained(entries, {'daily': 0, 'weekly': 0, 'monthly': 0}), {'tue_noon'})
+
+    def test_chain_loads_catalog_once(self):
+        catalog = Catalog(self.directory)
+        for name, kind, started in (
+            ('full', 'full', '2026-03-01T00:00:00+00:00'),
+            ('first', 'incremental', '2026-03-02T00:00:00+00:00'),
+            ('second', 'incremental', '2026-03-03T00:00:00+00:00'),
+        ):
+            manifest = {'file': name, 'kind': kind, 'started_at': started}
+            if kind == 'incremental':
+                manifest['base'] = 'full'
+            (self.directory / f'{name}{MANIFEST_SUFFIX}').write_text(json.dumps(manifest))
+            catalog.add(manifest, f'{name}{MANIFEST_SUFFIX}')
+
+        with mock.patch.object(Catalog, 'load', autospec=True, side_effect=Catalog.load) as load:
+            full, incrementals = catalog.chain()
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(full['file'], 'full')
+        self.assertEqual([manifest['file'] for manifest in incrementals], ['first', 'second'])
+
+
+class ChunkStoreTests(TemporaryDirectoryMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for number in range(3):
+            create_brand(f'chunked_{number}', platforms=('linkedin', 'youtube'))
+        self.models = [User, BrandProfile, ClientPlatformProgress, ContentLink]
+
+    def write(self, timestamp):
+        writer = ChunkedBackupWriter(location=self.directory)
+        return writer.write(models=self.models, path=writer.backup_path(timestamp))
+
+    def chunk_digests(self, manifest):
+        return {chunk['sha256'] for stats in manifest['models'].values() for chunk in stats['chunks']}
+
+    def test_unchanged_rows_reuse_chunks_across_snapshots(self):
+        first = self.write('20260101_000001')
+        self.assertEqual(first['new_chunks'], first['chunks'])
+        second = self.write('20260101_000002')
+        self.assertEqual(second['new_chunks'], 0)
+        self.assertEqual(self.chunk_digests(second), self.chunk_digests(first))
+
+        ContentLink.objects.filter(pk=ContentLink.objects.order_by('pk').first().pk).update(title='Edited')
+        third = self.write('20260101_000003')
+        self.assertEqual(third['new_chunks'], 1)
+        self.assertEqual(
+            third['models']['auth.user']['chunks'], first['models']['auth.user']['chunks'],
+        )
+
+    def test_garbage_collection_keeps_referenced_chunks(self):
+        first = self.write('20260101_000001')
+        ContentLink.objects.update(title='Edited')
+        second = self.write('20260101_000002')
+        store = ChunkStore(self.directory)
+        orphan, _ = store.put(b'{"orphan": true}\n')
+        in_flight = store.path(orphan).with_name('in_flight.jsonl.gz.123.tmp')
+        in_flight.write_bytes(b'')
+
+        self.assertEqual(collect_garbage(self.directory)[0], 0)  # within the grace period
+        Catalog(self.directory).prune({'daily': 1, 'weekly': 0, 'monthly': 0})
+        removed, _ = collect_garbage(self.directory, grace_seconds=0)
+
+        only_first = self.chunk_digests(first) - self.chunk_digests(second)
+        self.assertEqual(removed, len(only_first) + 1)
+        self.assertFalse(store.path(orphan).exists())
+        self.assertTrue(in_flight.exists())
+        self.assertEqual(broken_chunks(self.directory, second), [])
+        self.assertEqual({path.name.split('.', 1)[0] for path in store.files()}, self.chunk_digests(second))
+
+
+class NewPlatformBackfillTests(TestCase):
+    PLATFORM_CHOICES = ClientPlatformProgress.PLATFORM_CHOICES + [('mastodon', 'Mastodon')]
+
+    def backfill(self, brand_count):
+        for number in range(brand_count):
+            create_brand(f'backfill_{brand_count}_{number}')
+        BrandProfile.create_missing_platform_records()
+        output = StringIO()
+        with mock.patch.object(ClientPlatformProgress, 'PLATFORM_CHOICES', self.PLATFORM_CHOICES):
+            with CaptureQueriesContext(connection) as queries:
+                emit_post_migrate_signal(verbosity=1, interactive=False, db='default', stdout=output)
+        ClientPlatformProgress.objects.filter(platform='mastodon').delete()
+        return output.getvalue(), len(queries)
+
+    def test_new_platform_is_backfilled_once_in_fixed_queries(self):
+        output, queries = self.backfill(2)
+        self.assertEqual(output.count('platform records for mastodon'), 1)
+        self.assertIn('Created 2 platform records for mastodon across 2 brands', output)
+
+        output, more_brand_queries = self.backfill(6)
+        self.assertIn('Created 8 platform records for mastodon across 8 brands', output)
+        self.assertEqual(more_brand_queries, queries)
+
+
+# No collectstatic manifest in tests
+@override_settings(STORAGES=STATIC_STORAGES)
+class AdminChangelistTests(TestCase):
+    """Changelist queries don't grow with the number of rows shown"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('changelist_admin', 'admin@example.com'))
+        self.brands = []
+
+    def add_brands(self, count):
+        for _ in range(count):
+            self.brands.append(create_brand(f'changelist_{len(self.brands)}', platforms=('linkedin', 'youtube')))
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'class="autocomplete-filter"', count=1)
+        return len(queries)
+
+    def assertQueriesDoNotGrow(self, url):
+        self.add_brands(2)
+        few = self.changelist_queries(url)
+        self.add_brands(10)
+        self.assertEqual(self.changelist_queries(url), few)
+
+    def test_platform_progress_changelist(self):
+        self.assertQueriesDoNotGrow(reverse('admin:dashboard_clientplatformprogress_changelist'))
+
+    def test_platform_progress_changelist_filtered_by_brand(self):
+        self.add_brands(1)
+        url = reverse('admin:dashboard_clientplatformprogress_changelist') + f'?brand__id__exact={self.brands[0].pk}'
+        self.assertQueriesDoNotGrow(url)
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['cl'].result_list), 2)
+        self.assertContains(response, f'<option value="{self.brands[0].pk}" selected>')
+
+    def test_content_link_changelist(self):
+        self.assertQueriesDoNotGrow(reverse('admin:dashboard_contentlink_changelist'))
+
+    def test_link_counts_come_from_the_annotation(self):
+        self.add_brands(1)
+        response = self.client.get(reverse('admin:dashboard_clientplatformprogress_changelist') + '?o=7')
+        self.assertEqual([row.link_count for row in response.context['cl'].result_list], [1, 1])
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class BulkOperationTests(TestCase):
+    def setUp(self):
+        self.brand = create_brand('bulk', platforms=('linkedin', 'youtube', 'tiktok'))
+        self.rows = self.brand.platform_progress.all()
+        self.rows.update(drafted=2, published=1, updated_at=timezone.now() - timedelta(days=1))
+        self.rows.filter(platform='tiktok').update(is_visible=False, is_active=False)
+        self.client.force_login(User.objects.create_superuser('bulk_admin', 'bulk@example.com'))
+
+    def state(self, *fields):
+        return {row['platform']: tuple(row[field] for field in fields) for row in self.rows.values('platform', *fields)}
+
+    def test_each_operation_is_one_update(self):
+        expected = {
+            'set_committed': ('committed', 9, {'linkedin': (9,), 'youtube': (9,), 'tiktok': (9,)}),
+            'reset_progress': ('drafted', None, {'linkedin': (0,), 'youtube': (0,), 'tiktok': (0,)}),
+            'show': ('is_visible', None, {'linkedin': (True,), 'youtube': (True,), 'tiktok': (True,)}),
+            'hide': ('is_visible', None, {'linkedin': (False,), 'youtube': (False,), 'tiktok': (False,)}),
+            'toggle_visibility': ('is_visible', None, {'linkedin': (False,), 'youtube': (False,), 'tiktok': (True,)}),
+            'activate': ('is_active', None, {'linkedin': (True,), 'youtube': (True,), 'tiktok': (True,)}),
+            'deactivate': ('is_active', None, {'linkedin': (False,), 'youtube': (False,), 'tiktok': (False,)}),
+        }
+        self.assertEqual(set(expected), set(OPERATIONS))
+        before = timezone.now()
+        for name, (field, value, result) in expected.items():
+            with self.subTest(name):
+                with transaction.atomic():
+                    with self.assertNumQueries(1):
+                        self.assertEqual(apply_operation(self.rows, name, value), 3)
+                    self.assertEqual(self.state(field), result)
+                    self.assertTrue(all(row.updated_at >= before for row in self.rows))
+                    transaction.set_rollback(True)
+
+    def test_toggle_twice_restores_visibility(self):
+        original = self.state('is_visible')
+        apply_operation(self.rows, 'toggle_visibility')
+        apply_operation(self.rows, 'toggle_visibility')
+        self.assertEqual(self.state('is_visible'), original)
+
+    def test_dry_run_counts_without_updating(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(apply_operation(self.rows.filter(is_visible=True), 'hide', dry_run=True), 2)
+        self.assertEqual(self.state('is_visible')['linkedin'], (True,))
+
+    def test_set_committed_needs_a_value(self):
+        for value in (None, -1):
+            with self.assertRaisesMessage(ValueError, 'Set committed needs a value of 0 or more'):
+                apply_operation(self.rows, 'set_committed', value)
+
+    def run_action(self, action, rows, **data):
+        return self.client.post(reverse('admin:dashboard_clientplatformprogress_changelist'), {
+            'action': action, '_selected_action': [row.pk for row in rows], **data,
+        }, follow=True)
+
+    def test_admin_actions_update_selected_rows(self):
+        selected = self.rows.filter(platform__in=['linkedin', 'youtube'])
+        response = self.run_action('bulk_set_committed', selected, value=12)
+        self.assertContains(response, 'Set committed: updated 2 platform records')
+        self.assertEqual(self.state('committed'), {'linkedin': (12,), 'youtube': (12,), 'tiktok': (5,)})
+
+        response = self.run_action('bulk_set_committed', selected, value='')
+        self.assertContains(response, 'Set committed needs a value of 0 or more')
+        self.assertEqual(self.state('committed')['linkedin'], (12,))
+
+        self.run_action('bulk_deactivate', self.rows.filter(platform='linkedin'))
+        self.assertEqual(self.state('is_active'), {'linkedin': (False,), 'youtube': (True,), 'tiktok': (False,)})
+
+    def test_create_all_platforms_is_idempotent(self):
+        other = create_brand('bulk_other')
+        platform_count = len(ClientPlatformProgress.PLATFORM_CHOICES)
+        response = self.run_action('create_all_platforms', ClientPlatformProgress.objects.all())
+        self.assertContains(response, f'Created {2 * platform_count - 4} platform progress records for 2 brands')
+        response = self.run_action('create_all_platforms', ClientPlatformProgress.objects.all())
+        self.assertContains(response, 'Created 0 platform progress records for 0 brands')
+        self.assertEqual(other.platform_progress.count(), platform_count)
+        self.assertEqual(self.state('committed')['linkedin'], (5,))
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class PublicDashboardAsyncTests(TestCase):
+    """The public dashboard renders from the async ORM without lazy queries from the event loop"""
+
+    def setUp(self):
+        self.brand = create_brand('public_async', platforms=('linkedin', 'youtube'))
+        self.brand.generate_public_uuid()
+        self.url = reverse('dashboard:public_dashboard', args=[self.brand.public_uuid])
+
+    async def test_public_dashboard_renders(self):
+        await BrandProfile.objects.filter(pk=self.brand.pk).aupdate(is_public_enabled=True)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Brand public_async')
+        self.assertContains(response, 'https://youtube.example.com/public_async')
+
+    async def test_disabled_public_link_is_not_found(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class PrepareContainerTests(TemporaryDirectoryMixin, TestCase):
+    """Container start skips migrate and collectstatic when nothing changed"""
+
+    def setUp(self):
+        super().setUp()
+        self.static_root = self.directory / 'staticfiles'
+        static_root = override_settings(STATIC_ROOT=str(self.static_root))
+        static_root.enable()
+        self.addCleanup(static_root.disable)
+        for patcher in (
+            mock.patch.object(prepare_container, 'STATIC_STAMP', self.directory / 'staticfiles.stamp'),
+            mock.patch.object(prepare_container, 'call_command', wraps=call_command),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.call_command = prepare_container.call_command
+
+    def prepare(self, *args):
+        self.call_command.reset_mock()
+        output = StringIO()
+        call_command('prepare_container', *args, stdout=output)
+        return [call.args[0] for call in self.call_command.call_args_list], output.getvalue()
+
+    def test_unapplied_migrations(self):
+        self.assertEqual(prepare_container.unapplied_migrations(), [])
+        MigrationRecorder(connection).record_unapplied('dashboard', '0009_incremental_backups')
+        self.assertEqual([
+            (migration.app_label, migration.name, backwards)
+            for migration, backwards in prepare_container.unapplied_migrations()
+        ], [('dashboard', '0009_incremental_backups', False)])
+
+    def test_migrate_runs_only_with_unapplied_migrations(self):
+        commands, output = self.prepare()
+        self.assertEqual(commands, ['setup_production', 'collectstatic'])
+        self.assertIn('No unapplied migrations, skipping migrate', output)
+
+        MigrationRecorder(connection).record_unapplied('dashboard', '0009_incremental_backups')
+        with mock.patch.object(prepare_container.Command, 'step') as step:
+            _, output = self.prepare()
+        self.assertIn('Applying 1 migration(s)', output)
+        self.assertIn('🔧 migrate', [call.args[0] for call in step.call_args_list])
+
+    def test_static_stamp_skips_until_sources_change(self):
+        commands, _ = self.prepare('--static-only')
+        self.assertEqual(commands, ['collectstatic'])
+        self.assertEqual(prepare_container.STATIC_STAMP.read_text(), prepare_container.static_fingerprint())
+        self.assertTrue(any(self.static_root.iterdir()))
+
+        commands, output = self.prepare('--static-only')
+        self.assertEqual(commands, [])
+        self.assertIn('skipping collectstatic', output)
+
+        self.assertEqual(self.prepare('--static-only', '--force')[0], ['collectstatic'])
+
+        with mock.patch.object(prepare_container, 'static_fingerprint', return_value='changed'):
+            self.assertEqual(self.prepare('--static-only')[0], ['collectstatic'])
+        self.assertEqual(prepare_container.STATIC_STAMP.read_text(), 'changed')
+
+    def test_static_fingerprint_covers_the_storage_backend(self):
+        fingerprint = prepare_container.static_fingerprint()
+        manifest = {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'}
+        with override_settings(STORAGES={**STATIC_STORAGES, 'staticfiles': manifest}):
+            self.assertNotEqual(prepare_container.static_fingerprint(), fingerprint)
+
+    def test_emptied_static_root_is_collected_again(self):
+        self.prepare('--static-only')
+        for path in self.static_root.iterdir():
+            shutil.rmtree(path) if path.is_dir() else path.unlink()
+        self.assertEqual(self.prepare('--static-only')[0], ['collectstatic'])
+
+    def test_site_setup_failure_does_not_stop_the_container(self):
+        with mock.patch.object(SetupProductionCommand, 'handle', side_effect=RuntimeError('boom')):
+            commands, output = self.prepare()
+        self.assertIn('🌐 Production site failed, continuing: boom', output)
+        self.assertIn('Container ready', output)
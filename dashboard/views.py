@@ -1,4 +1,4 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import aget_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import Http404
 from profiles.models import BrandProfile
@@ -211,8 +211,11 @@ def get_platform_progress(user):
     except BrandProfile.DoesNotExist:
         all_platforms = ClientPlatformProgress.objects.none()
     
-    # Convert to list and extract platform names
-    all_platforms = list(all_platforms)
+    return summarize_platform_progress(list(all_platforms))
+
+
+def summarize_platform_progress(all_platforms):
+    """Totals and chart counts for a list of visible platform progress rows"""
     platform_names = [p.platform for p in all_platforms]
     
     # Calculate totals from all platforms
@@ -254,106 +257,114 @@ def parse_list_field(field_text):
     return [item.strip() for item in field_text.split('\n') if item.strip()]
 
 
-def public_dashboard_view(request, uuid):
-    """Public dashboard view - accessible without login via UUID"""
+async def public_dashboard_view(request, uuid):
+    """
+    Public dashboard view - accessible without login via UUID
+
+    Async so that under ASGI the response to a slow client on a shared link
+    is written from the event loop (the sync-only middlewares still run the
+    request itself in a thread). Everything the template reads is loaded up
+    front, including content links, because the template can't query the
+    database from the event loop.
+    """
+    profile = await aget_object_or_404(BrandProfile, public_uuid=uuid)
+    
+    # Check if public access is enabled
+    if not profile.is_public_enabled:
+        raise Http404("Public access to this dashboard is not enabled")
+    
+    platforms = [
+        platform async for platform in ClientPlatformProgress.objects.filter(brand=profile, is_visible=True)
+        .order_by('platform').prefetch_related('content_links')
+    ]
+    
+    # Use the same data processing as regular dashboard
     try:
-        profile = get_object_or_404(BrandProfile, public_uuid=uuid)
+        context = {
+            'profile': profile,
+            'brand_name': getattr(profile, 'brand_name', 'Unknown Brand'),
+            'is_public_view': True,  # Flag to indicate this is public view
+        }
         
-        # Check if public access is enabled
-        if not profile.is_public_enabled:
-            raise Http404("Public access to this dashboard is not enabled")
+        # Add each context item with error handling (same as regular dashboard)
+        try:
+            context['metrics'] = calculate_metrics(profile)
+        except Exception as e:
+            print(f"Error calculating metrics: {e}")
+            context['metrics'] = {'total_platforms': 0, 'active_platforms': 0}
         
-        # Use the same data processing as regular dashboard
         try:
-            context = {
-                'profile': profile,
-                'brand_name': getattr(profile, 'brand_name', 'Unknown Brand'),
-                'is_public_view': True,  # Flag to indicate this is public view
-            }
-            
-            # Add each context item with error handling (same as regular dashboard)
-            try:
-                context['metrics'] = calculate_metrics(profile)
-            except Exception as e:
-                print(f"Error calculating metrics: {e}")
-                context['metrics'] = {'total_platforms': 0, 'active_platforms': 0}
-            
-            try:
-                context['platforms'] = get_platform_data(profile)
-            except Exception as e:
-                print(f"Error getting platform data: {e}")
-                context['platforms'] = {}
-            
-            try:
-                context['social_platforms'] = get_social_platforms(profile)
-            except Exception as e:
-                print(f"Error getting social platforms: {e}")
-                context['social_platforms'] = []
-            
-            try:
-                context['kpis'] = get_kpis(profile)
-            except Exception as e:
-                print(f"Error getting KPIs: {e}")
-                context['kpis'] = {}
-            
-            try:
-                context['swot'] = get_swot_analysis(profile)
-            except Exception as e:
-                print(f"Error getting SWOT: {e}")
-                context['swot'] = {'strengths': [], 'weaknesses': [], 'opportunities': [], 'threats': []}
-            
-            try:
-                context['business_intel'] = get_business_intelligence(profile)
-            except Exception as e:
-                print(f"Error getting business intel: {e}")
-                context['business_intel'] = {'partners': [], 'competitors': [], 'notes': ''}
-            
-            try:
-                # For public dashboard, pass the user from the profile
-                context['platform_progress'] = get_platform_progress(profile.user)
-            except Exception as e:
-                print(f"Error getting platform progress: {e}")
-                context['platform_progress'] = {
-                    'platforms': [], 
-                    'platform_names': [],
-                    'total_committed': 0,
-                    'total_drafted': 0,
-                    'total_published': 0,
-                    'completion_rate': 0,
-                    'active_platforms_count': 0,
-                    'inactive_platforms_count': 0,
-                    'in_progress_count': 0,
-                }
-            
-            return render(request, 'dashboard/public_dashboard.html', context)
-            
+            context['platforms'] = get_platform_data(profile)
         except Exception as e:
-            print(f"Public dashboard view error: {e}")
-            import traceback
-            print(traceback.format_exc())
-            # Return a minimal context to prevent total failure
-            return render(request, 'dashboard/public_dashboard.html', {
-                'profile': profile,
-                'brand_name': getattr(profile, 'brand_name', 'Unknown Brand'),
-                'is_public_view': True,
-                'metrics': {'total_platforms': 0, 'active_platforms': 0},
-                'platforms': {},
-                'social_platforms': [],
-                'kpis': {},
-                'swot': {'strengths': [], 'weaknesses': [], 'opportunities': [], 'threats': []},
-                'business_intel': {'partners': [], 'competitors': [], 'notes': ''},
-                'platform_progress': {
-                    'platforms': [], 
-                    'platform_names': [],
-                    'total_committed': 0,
-                    'total_drafted': 0,
-                    'total_published': 0,
-                    'completion_rate': 0,
-                    'active_platforms_count': 0,
-                    'inactive_platforms_count': 0,
-                    'in_progress_count': 0,
-                },
-            })
-            
-    except BrandProfile.DoesNotExist:
-        raise Http404("Public dashboard not found")
+            print(f"Error getting platform data: {e}")
+            context['platforms'] = {}
+        
+        try:
+            context['social_platforms'] = get_social_platforms(profile)
+        except Exception as e:
+            print(f"Error getting social platforms: {e}")
+            context['social_platforms'] = []
+        
+        try:
+            context['kpis'] = get_kpis(profile)
+        except Exception as e:
+            print(f"Error getting KPIs: {e}")
+            context['kpis'] = {}
+        
+        try:
+            context['swot'] = get_swot_analysis(profile)
+        except Exception as e:
+            print(f"Error getting SWOT: {e}")
+            context['swot'] = {'strengths': [], 'weaknesses': [], 'opportunities': [], 'threats': []}
+        
+        try:
+            context['business_intel'] = get_business_intelligence(profile)
+        except Exception as e:
+            print(f"Error getting business intel: {e}")
+            context['business_intel'] = {'partners': [], 'competitors': [], 'notes': ''}
+        
+        try:
+            context['platform_progress'] = summarize_platform_progress(platforms)
+        except Exception as e:
+            print(f"Error getting platform progress: {e}")
+            context['platform_progress'] = {
+                'platforms': [], 
+                'platform_names': [],
+                'total_committed': 0,
+                'total_drafted': 0,
+                'total_published': 0,
+                'completion_rate': 0,
+                'active_platforms_count': 0,
+                'inactive_platforms_count': 0,
+                'in_progress_count': 0,
+            }
+        
+        return render(request, 'dashboard/public_dashboard.html', context)
+        
+    except Exception as e:
+        print(f"Public dashboard view error: {e}")
+        import traceback
+        print(traceback.format_exc())
+        # Return a minimal context to prevent total failure
+        return render(request, 'dashboard/public_dashboard.html', {
+            'profile': profile,
+            'brand_name': getattr(profile, 'brand_name', 'Unknown Brand'),
+            'is_public_view': True,
+            'metrics': {'total_platforms': 0, 'active_platforms': 0},
+            'platforms': {},
+            'social_platforms': [],
+            'kpis': {},
+            'swot': {'strengths': [], 'weaknesses': [], 'opportunities': [], 'threats': []},
+            'business_intel': {'partners': [], 'competitors': [], 'notes': ''},
+            'platform_progress': {
+                'platforms': [], 
+                'platform_names': [],
+                'total_committed': 0,
+                'total_drafted': 0,
+                'total_published': 0,
+                'completion_rate': 0,
+                'active_platforms_count': 0,
+                'inactive_platforms_count': 0,
+                'in_progress_count': 0,
+            },
+        })
@@ -51,17 +51,11 @@ else:
     print("⚠️  Using SQLite or DATABASE_URL not set")
 END
 
-# Apply database migrations
-echo "🔧 Applying database migrations..."
-python manage.py migrate --noinput
-
-# Create production site if needed
-echo "🌐 Setting up production site..."
-python manage.py setup_production || echo "⚠️  setup_production command not found or failed, continuing..."
-
-# Collect static files
-echo "📦 Collecting static files..."
-python manage.py collectstatic --noinput --clear
+# Apply migrations, set up the production site and collect static files,
+# each skipped when there is nothing to do (static files are collected at
+# image build time)
+echo "🔧 Preparing database and static files..."
+python manage.py prepare_container
 
 # Create superuser if needed (optional, for first deployment)
 # Uncomment and set environment variables if you want auto-superuser creation
@@ -77,20 +71,9 @@ echo "========================================="
 echo "🚀 Starting Gunicorn server..."
 echo "========================================="
 
-# Start Gunicorn with production settings
-exec gunicorn quantum_digital.wsgi:application \
-    --bind 0.0.0.0:8000 \
-    --workers 3 \
-    --threads 2 \
-    --worker-class gthread \
-    --worker-tmp-dir /dev/shm \
-    --max-requests 1000 \
-    --max-requests-jitter 50 \
-    --timeout 60 \
-    --graceful-timeout 30 \
-    --keep-alive 5 \
-    --access-logfile - \
-    --error-logfile - \
-    --log-level info \
-    --capture-output \
-    --enable-stdio-inheritance
+# Start Gunicorn; workers, threads and timeouts come from gunicorn.conf.py
+# (sized from the container's CPUs and memory, overridable via environment).
+# SERVER_MODE=asgi serves the ASGI application with uvicorn workers: async
+# views (public dashboards, manager JSON endpoints) then don't hold a thread
+# while slow clients download.
+exec gunicorn --config gunicorn.conf.py
@@ -0,0 +1,173 @@
+"""
+Gunicorn configuration for quantum_digital.
+
+Workers and threads are sized from the CPUs and memory available to the
+container, so the same image fits a small and a large Dokploy host. Every
+setting can be overridden from the environment; see "Gunicorn Sizing" in
+README.md for the profiles and their benchmark numbers.
+
+    GUNICORN_PROFILE           balanced (default), cpu or memory
+    SERVER_MODE                wsgi (gthread workers, default) or asgi (uvicorn workers)
+    WEB_CONCURRENCY            fixed number of workers (skips sizing)
+    GUNICORN_THREADS           threads per gthread worker
+    GUNICORN_MEMORY_MB         memory budget for all workers (default: 75% of the container limit)
+    GUNICORN_WORKER_MEMORY_MB  expected memory per worker (default: 150)
+    GUNICORN_MAX_REQUESTS      recycle a worker after this many requests (default: 1000, 0 disables)
+    GUNICORN_MAX_REQUESTS_JITTER, GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT,
+    GUNICORN_KEEPALIVE, GUNICORN_PRELOAD
+"""
+import math
+import os
+
+# Profiles: workers per CPU (plus one) and threads per worker.
+# balanced - the previous fixed setup scaled to the CPU count
+# cpu      - one thread per worker, for CPU-bound pages (ZIP exports, large dashboards)
+# memory   - half the processes and more threads, for hosts short on RAM
+PROFILES = {
+    'balanced': {'workers_per_cpu': 2, 'threads': 2},
+    'cpu': {'workers_per_cpu': 2, 'threads': 1},
+    'memory': {'workers_per_cpu': 1, 'threads': 4},
+}
+
+
+def env_int(name, default):
+    value = os.getenv(name, '')
+    return int(value) if value.strip() else default
+
+
+def cpu_count():
+    """CPUs this container may use: the cgroup quota if there is one, else the CPU affinity"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != 'max':
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def memory_limit_mb():
+    """Container memory limit (cgroup v2, then v1), else the host's physical memory"""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as limit_file:
+                limit = limit_file.read().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a huge number
+        if limit != 'max' and int(limit) < 1 << 60:
+            return int(limit) // (1024 * 1024)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+profile_name = os.getenv('GUNICORN_PROFILE', 'balanced')
+if profile_name not in PROFILES:
+    raise RuntimeError(f'Unknown GUNICORN_PROFILE "{profile_name}" (choose from {", ".join(PROFILES)})')
+profile = PROFILES[profile_name]
+server_mode = os.getenv('SERVER_MODE', 'wsgi')
+
+cpus = cpu_count()
+memory_mb = env_int('GUNICORN_MEMORY_MB', None)
+if memory_mb is None:
+    limit = memory_limit_mb()
+    memory_mb = limit * 3 // 4 if limit else None
+worker_memory_mb = env_int('GUNICORN_WORKER_MEMORY_MB', 150)
+
+workers = profile['workers_per_cpu'] * cpus + 1
+if memory_mb:
+    workers = min(workers, max(1, memory_mb // worker_memory_mb))
+workers = env_int('WEB_CONCURRENCY', workers)
+
+if server_mode == 'asgi':
+    wsgi_app = 'quantum_digital.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'quantum_digital.wsgi:application'
+    worker_class = 'gthread'
+    threads = env_int('GUNICORN_THREADS', profile['threads'])
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Recycling bounds slow memory growth; the jitter keeps workers from restarting together
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 50)
+timeout = env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# Load Django once in the master; workers share its memory copy-on-write and
+# start faster. Code changes need a full restart (not HUP) with preloading.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+capture_output = True
+enable_stdio_inheritance = True
+
+
+def when_ready(server):
+    """Warm per-process caches in the master so every forked worker starts with them"""
+    server.log.info(
+        'Profile %s (%s): %s CPUs, %s MB budget -> %s workers x %s threads',
+        profile_name, server_mode, cpus, memory_mb or 'unknown', workers,
+        globals().get('threads', 1),
+    )
+    if not preload_app:
+        return
+    from django.db import connections
+    from django.template.loader import get_template
+    from django.urls import get_resolver
+
+    # Compiles the URL patterns and the cached loader's templates once
+    get_resolver().url_patterns
+    for name in ('manager/dashboard.html', 'dashboard/dashboard.html', 'dashboard/public_dashboard.html'):
+        try:
+            get_template(name)
+        except Exception as e:
+            server.log.warning('Could not preload template %s: %s', name, e)
+    try:
+        from profiles.cloning import presets
+        presets()
+    except Exception as e:
+        # The database may not be migrated yet; the presets load on first use
+        server.log.warning('Could not preload brand presets: %s', e)
+    # Sockets must not be shared across the fork
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    # Drop any database connection inherited from the master
+    if preload_app:
+        from django.db import connections
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    """Open the persistent database connection of each gthread request thread"""
+    pool = getattr(worker, 'tpool', None)
+    if pool is None:
+        return
+    import threading
+    from django.db import connection
+
+    # Each task waits for the others, so every thread in the pool runs one
+    barrier = threading.Barrier(worker.cfg.threads)
+
+    def connect():
+        try:
+            barrier.wait(timeout=5)
+            connection.ensure_connection()
+        except Exception as e:
+            worker.log.warning('Database warm-up failed: %s', e)
+
+    for _ in range(worker.cfg.threads):
+        pool.submit(connect)
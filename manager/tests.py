@@ -1,3 +1,150 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Sum
+from django.http import JsonResponse
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+from io import StringIO
+from dashboard.models import ClientPlatformProgress
+from profiles.models import BrandProfile
+from quantum_digital.querycheck import NPlusOneDetected, detect_queries
 
-# Create your tests here.
+
+def naive_manager_dashboard(request):
+    """The manager dashboard's per-brand aggregates before they moved into one query"""
+    brands = []
+    for brand in BrandProfile.objects.select_related('user'):
+        progress = ClientPlatformProgress.objects.filter(brand=brand).aggregate(
+            total_committed=Sum('committed'),
+            total_published=Sum('published'),
+        )
+        brands.append({'id': brand.id, **progress})
+    return JsonResponse({'brands': brands})
+
+
+urlpatterns = [
+    path('naive-dashboard/', naive_manager_dashboard),
+    path('', include('quantum_digital.urls')),
+]
+
+
+# No collectstatic manifest in tests
+@override_settings(
+    ROOT_URLCONF='manager.tests',
+    STORAGES={**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}},
+)
+class NPlusOneTests(TestCase):
+    """Strict query checking fails views that query once per brand"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_benchmark_data', brands=20, links=1, stdout=StringIO())
+        cls.manager = User.objects.get(username='bench_manager')
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def test_per_brand_queries_fail_in_strict_mode(self):
+        with self.assertRaises(NPlusOneDetected):
+            with detect_queries(threshold=5, strict=True):
+                self.client.get('/naive-dashboard/')
+
+    def test_manager_dashboard_passes_in_strict_mode(self):
+        with detect_queries(threshold=5, strict=True):
+            response = self.client.get('/manager/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['brands']), 20)
+
+
+class BulkPlatformOperationsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_benchmark_data', brands=3, links=0, stdout=StringIO())
+        cls.manager = User.objects.get(username='bench_manager')
+        cls.brand_ids = [str(pk) for pk in BrandProfile.objects.order_by('pk').values_list('pk', flat=True)[:2]]
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def post(self, **data):
+        return self.client.post(reverse('manager:bulk_platform_operations'), {'brand_ids': self.brand_ids, **data})
+
+    def test_dry_run_counts_without_updating(self):
+        before = list(ClientPlatformProgress.objects.values_list('pk', 'committed'))
+        with self.assertNumQueries(3):  # session, user, COUNT
+            response = self.post(platforms=['linkedin', 'youtube'], operation='set_committed', value='7', dry_run='1')
+        self.assertEqual(response.json()['count'], 4)
+        self.assertEqual(response.json()['message'], 'Set committed would update 4 platform records (2 brands, 2 platforms)')
+        self.assertEqual(list(ClientPlatformProgress.objects.values_list('pk', 'committed')), before)
+
+    def test_operation_is_one_update(self):
+        with self.assertNumQueries(3):  # session, user, UPDATE
+            response = self.post(platforms=['linkedin', 'youtube'], operation='set_committed', value='7')
+        self.assertEqual(response.json()['count'], 4)
+        updated = ClientPlatformProgress.objects.filter(committed=7)
+        self.assertEqual(set(updated.values_list('platform', flat=True)), {'linkedin', 'youtube'})
+        self.assertEqual({str(pk) for pk in updated.values_list('brand_id', flat=True)}, set(self.brand_ids))
+
+    def test_all_platforms_must_be_chosen_explicitly(self):
+        response = self.post(platforms=['all'], operation='hide')
+        platform_count = len(ClientPlatformProgress.PLATFORM_CHOICES)
+        self.assertEqual(response.json()['count'], 2 * platform_count)
+        self.assertFalse(ClientPlatformProgress.objects.filter(brand_id__in=self.brand_ids, is_visible=True).exists())
+        self.assertTrue(ClientPlatformProgress.objects.exclude(brand_id__in=self.brand_ids).filter(is_visible=True).exists())
+
+    def test_invalid_input_is_rejected(self):
+        for data, error in (
+            ({'platforms': [], 'operation': 'hide'}, 'Select at least one platform'),
+            ({'platforms': ['myspace'], 'operation': 'hide'}, 'Unknown platform'),
+            ({'platforms': ['all', 'linkedin'], 'operation': 'hide'}, 'Unknown platform'),
+            ({'platforms': ['linkedin'], 'operation': 'drop_table'}, 'Invalid operation'),
+            ({'platforms': ['linkedin'], 'operation': 'set_committed', 'value': '-1'}, 'Value must be a whole number'),
+            ({'platforms': ['linkedin'], 'operation': 'set_committed'}, 'Set committed needs a value of 0 or more'),
+            ({'brand_ids': ['1; DROP'], 'platforms': ['linkedin'], 'operation': 'hide'}, 'Select at least one brand'),
+        ):
+            with self.subTest(data=data):
+                with self.assertNumQueries(2):  # session, user
+                    response = self.post(**data)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['error'], error)
+
+
+class AsyncEndpointTests(TestCase):
+    """The async AJAX endpoints load everything they serialize without lazy queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_benchmark_data', brands=3, links=1, stdout=StringIO())
+        cls.manager = User.objects.get(username='bench_manager')
+        cls.brand = BrandProfile.objects.order_by('pk').first()
+
+    async def test_get_brand_platforms(self):
+        await self.async_client.aforce_login(self.manager)
+        response = await self.async_client.get(reverse('manager:get_brand_platforms', args=[self.brand.pk]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['brand_name'], self.brand.brand_name)
+        expected = [
+            platform async for platform in ClientPlatformProgress.objects.filter(brand=self.brand)
+            .order_by('platform').values_list('platform', flat=True)
+        ]
+        self.assertEqual([platform['platform'] for platform in data['platforms']], expected)
+        self.assertTrue(all(len(platform['content_links']) == 1 for platform in data['platforms']))
+
+    async def test_manager_dashboard_data(self):
+        await self.async_client.aforce_login(self.manager)
+        response = await self.async_client.get(reverse('manager:dashboard_data'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['total_brands'], 3)
+        self.assertEqual(data['total_platforms'], await ClientPlatformProgress.objects.acount())
+        self.assertEqual({brand['id'] for brand in data['brands']}, {
+            pk async for pk in BrandProfile.objects.values_list('pk', flat=True)
+        })
+
+    async def test_staff_only(self):
+        response = await self.async_client.get(reverse('manager:dashboard_data'))
+        self.assertEqual(response.status_code, 302)
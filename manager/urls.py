@@ -5,6 +5,7 @@ app_name = 'manager'
 
 urlpatterns = [
     path('', views.manager_dashboard, name='dashboard'),
+    path('dashboard-data/', views.manager_dashboard_data, name='dashboard_data'),
     path('brand/<int:brand_id>/', views.brand_detail, name='brand_detail'),
     path('generate-folder-structure/', views.generate_folder_structure, name='generate_folder_structure'),
     path('brand/<int:brand_id>/generate-folder/', views.generate_folder_structure, name='generate_brand_folder'),
@@ -15,6 +16,7 @@ urlpatterns = [
     # Platform visibility management
     path('platform/<int:platform_id>/toggle-visibility/', views.toggle_platform_visibility, name='toggle_platform_visibility'),
     path('brand/<int:brand_id>/bulk-platform-visibility/', views.bulk_platform_visibility, name='bulk_platform_visibility'),
+    path('bulk-platform-operations/', views.bulk_platform_operations, name='bulk_platform_operations'),
     # Platform active status management
     path('platform/<int:platform_id>/toggle-active/', views.toggle_platform_active, name='toggle_platform_active'),
     # Platform update page
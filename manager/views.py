@@ -1,17 +1,22 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db.models import Q, Count, Sum
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
+from profiles.cloning import clone_brand, create_brands, presets
 from profiles.models import BrandProfile
+from dashboard.bulk import OPERATIONS, apply_operation
 from dashboard.models import ClientPlatformProgress, ContentLink
 from django.utils import timezone
 from django.urls import reverse
 import zipfile
 import io
 import os
+import time
 from django.http import HttpResponse
 from django.contrib import messages
+from quantum_digital import metrics
 
 
 def is_staff_user(user):
@@ -19,14 +24,13 @@ def is_staff_user(user):
     return user.is_authenticated and (user.is_staff or user.is_superuser)
 
 
-@user_passes_test(is_staff_user)
-def manager_dashboard(request):
-    """Main manager dashboard - shows all brands in card layout"""
-    search_query = request.GET.get('search', '')
-    sort_by = request.GET.get('sort', 'newest')
-    
-    # Get all brand profiles
-    brands = BrandProfile.objects.select_related('user').all()
+def dashboard_brands(search_query='', sort_by='newest'):
+    """Brands for the manager dashboard with their platform totals, in one query"""
+    brands = BrandProfile.objects.select_related('user').annotate(
+        platform_count=Count('platform_progress'),
+        total_committed=Coalesce(Sum('platform_progress__committed'), 0),
+        total_published=Coalesce(Sum('platform_progress__published'), 0),
+    )
     
     # Search functionality
     if search_query:
@@ -43,20 +47,24 @@ def manager_dashboard(request):
         brands = brands.order_by('created_at')
     elif sort_by == 'name':
         brands = brands.order_by('brand_name')
+    return brands
+
+
+def completion_rate(brand):
+    if brand.total_committed > 0:
+        return round((brand.total_published / brand.total_committed) * 100, 1)
+    return 0
+
+
+@user_passes_test(is_staff_user)
+def manager_dashboard(request):
+    """Main manager dashboard - shows all brands in card layout"""
+    search_query = request.GET.get('search', '')
+    sort_by = request.GET.get('sort', 'newest')
     
-    # Add platform progress counts to each brand
+    brands = list(dashboard_brands(search_query, sort_by))
     for brand in brands:
-        brand.platform_count = ClientPlatformProgress.objects.filter(brand=brand).count()
-        progress_data = ClientPlatformProgress.objects.filter(brand=brand).aggregate(
-            total_committed=Sum('committed'),
-            total_published=Sum('published')
-        )
-        brand.total_committed = progress_data.get('total_committed', 0) or 0
-        brand.total_published = progress_data.get('total_published', 0) or 0
-        if brand.total_committed > 0:
-            brand.completion_rate = round((brand.total_published / brand.total_committed) * 100, 1)
-        else:
-            brand.completion_rate = 0
+        brand.completion_rate = completion_rate(brand)
     
     # Calculate summary statistics 
     total_platforms = sum(brand.platform_count for brand in brands)
@@ -67,15 +75,46 @@ def manager_dashboard(request):
         'brands': brands,
         'search_query': search_query,
         'sort_by': sort_by,
-        'total_brands': brands.count(),
+        'total_brands': len(brands),
         'total_platforms': total_platforms,
         'total_committed_all': total_committed_all, 
         'total_published_all': total_published_all,
+        'brand_presets': list(presets()),
+        'platform_choices': ClientPlatformProgress.PLATFORM_CHOICES,
+        'bulk_operations': OPERATIONS,
     }
     
     return render(request, 'manager/dashboard.html', context)
 
 
+@user_passes_test(is_staff_user)
+async def manager_dashboard_data(request):
+    """AJAX endpoint with the manager dashboard's brand cards and totals"""
+    brands = [
+        {
+            'id': brand.id,
+            'brand_name': brand.brand_name,
+            'username': brand.user.username,
+            'email': brand.user.email,
+            'platform_count': brand.platform_count,
+            'total_committed': brand.total_committed,
+            'total_published': brand.total_published,
+            'completion_rate': completion_rate(brand),
+            'is_public_enabled': brand.is_public_enabled,
+            'created_at': brand.created_at.isoformat(),
+        }
+        async for brand in dashboard_brands(request.GET.get('search', ''), request.GET.get('sort', 'newest'))
+    ]
+    return JsonResponse({
+        'success': True,
+        'brands': brands,
+        'total_brands': len(brands),
+        'total_platforms': sum(brand['platform_count'] for brand in brands),
+        'total_committed_all': sum(brand['total_committed'] for brand in brands),
+        'total_published_all': sum(brand['total_published'] for brand in brands),
+    })
+
+
 @user_passes_test(is_staff_user)
 def brand_detail(request, brand_id):
     """Brand detail page with tabs for management"""
@@ -106,6 +145,7 @@ def generate_folder_structure(request, brand_id=None):
         return JsonResponse({'error': 'No brands selected'}, status=400)
     
     # Create ZIP file in memory
+    started = time.perf_counter()
     zip_buffer = io.BytesIO()
     
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
@@ -208,9 +248,12 @@ Created by Quantum Digital Manager Dashboard
             zip_file.writestr(f"{brand_folder}README.md", readme_content)
     
     zip_buffer.seek(0)
+    zip_data = zip_buffer.getvalue()
+    metrics.observe('zip_export_bytes', len(zip_data))
+    metrics.observe('zip_export_duration_seconds', time.perf_counter() - started)
     
     # Return ZIP file as download
-    response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
+    response = HttpResponse(zip_data, content_type='application/zip')
     if len(brands) == 1:
         filename = f"{brands[0].brand_name.replace(' ', '_')}_folder_structure.zip"
     else:
@@ -235,7 +278,7 @@ def generate_public_link(request, brand_id):
         brand.public_link_created_by = request.user
         if not brand.public_link_created_at:
             brand.public_link_created_at = timezone.now()
-        brand.save(update_fields=['is_public_enabled', 'public_link_created_by', 'public_link_created_at'])
+        brand.save(update_fields=['is_public_enabled', 'public_link_created_by', 'public_link_created_at', 'updated_at'])
         
         # Build full URL for the public dashboard
         public_url = request.build_absolute_uri(
@@ -269,7 +312,7 @@ def toggle_public_access(request, brand_id):
                 brand.public_link_created_at = timezone.now()
             brand.public_link_created_by = request.user
         
-        brand.save(update_fields=['is_public_enabled', 'public_link_created_by', 'public_link_created_at'])
+        brand.save(update_fields=['is_public_enabled', 'public_link_created_by', 'public_link_created_at', 'updated_at'])
         
         return JsonResponse({
             'success': True,
@@ -291,7 +334,7 @@ def regenerate_public_uuid(request, brand_id):
         brand.public_uuid = uuid.uuid4()
         brand.public_link_created_by = request.user
         brand.public_link_created_at = timezone.now()
-        brand.save(update_fields=['public_uuid', 'public_link_created_by', 'public_link_created_at'])
+        brand.save(update_fields=['public_uuid', 'public_link_created_by', 'public_link_created_at', 'updated_at'])
         
         # Build new public URL
         public_url = request.build_absolute_uri(
@@ -341,12 +384,13 @@ def bulk_platform_visibility(request, brand_id):
         brand = get_object_or_404(BrandProfile, id=brand_id)
         
         action = request.POST.get('action')
+        platforms = ClientPlatformProgress.objects.filter(brand=brand)
         
         if action == 'show_all':
-            ClientPlatformProgress.objects.filter(brand=brand).update(is_visible=True)
+            apply_operation(platforms, 'show')
             message = "All platforms are now visible"
         elif action == 'hide_inactive':
-            ClientPlatformProgress.objects.filter(brand=brand, committed=0).update(is_visible=False)
+            apply_operation(platforms.filter(committed=0), 'hide')
             message = "Inactive platforms are now hidden"
         else:
             return JsonResponse({'error': 'Invalid action'}, status=400)
@@ -360,6 +404,52 @@ def bulk_platform_visibility(request, brand_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@user_passes_test(is_staff_user)
+@require_POST
+def bulk_platform_operations(request):
+    """Apply one bulk operation to the selected platforms of many brands (dry_run=1 only counts)"""
+    brand_ids = request.POST.getlist('brand_ids')
+    platforms = request.POST.getlist('platforms')
+    operation = request.POST.get('operation', '')
+    value = request.POST.get('value', '').strip()
+    dry_run = request.POST.get('dry_run') == '1'
+    
+    if not brand_ids or not all(brand_id.isdigit() for brand_id in brand_ids):
+        return JsonResponse({'error': 'Select at least one brand'}, status=400)
+    # Every platform is an explicit choice, so a missing selection can't update them all
+    if not platforms:
+        return JsonResponse({'error': 'Select at least one platform'}, status=400)
+    all_platforms = platforms == ['all']
+    platform_codes = {code for code, _ in ClientPlatformProgress.PLATFORM_CHOICES}
+    if not all_platforms and not set(platforms) <= platform_codes:
+        return JsonResponse({'error': 'Unknown platform'}, status=400)
+    if operation not in OPERATIONS:
+        return JsonResponse({'error': 'Invalid operation'}, status=400)
+    if value and not value.isdigit():
+        return JsonResponse({'error': 'Value must be a whole number'}, status=400)
+    
+    # One UPDATE ... WHERE brand_id IN (...) AND platform IN (...)
+    queryset = ClientPlatformProgress.objects.filter(brand_id__in=brand_ids)
+    if not all_platforms:
+        queryset = queryset.filter(platform__in=platforms)
+    try:
+        count = apply_operation(queryset, operation, int(value) if value else None, dry_run=dry_run)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    label = OPERATIONS[operation].label
+    scope = f'{len(brand_ids)} brands, {"all" if all_platforms else len(platforms)} platforms'
+    return JsonResponse({
+        'success': True,
+        'dry_run': dry_run,
+        'count': count,
+        'message': (
+            f'{label} would update {count} platform records ({scope})' if dry_run
+            else f'{label}: updated {count} platform records ({scope})'
+        ),
+    })
+
+
 @user_passes_test(is_staff_user)
 @require_POST
 def toggle_platform_active(request, platform_id):
@@ -395,14 +485,14 @@ def platform_update(request):
 
 
 @user_passes_test(is_staff_user)
-def get_brand_platforms(request, brand_id):
+async def get_brand_platforms(request, brand_id):
     """AJAX endpoint to get platforms for a specific brand"""
     try:
-        brand = get_object_or_404(BrandProfile, id=brand_id)
-        platforms = ClientPlatformProgress.objects.filter(brand=brand).order_by('platform')
+        brand = await aget_object_or_404(BrandProfile, id=brand_id)
+        platforms = ClientPlatformProgress.objects.filter(brand=brand).order_by('platform').prefetch_related('content_links')
         
         platforms_data = []
-        for platform in platforms:
+        async for platform in platforms:
             platforms_data.append({
                 'id': platform.id,
                 'platform': platform.platform,
@@ -572,7 +662,7 @@ def brand_quick_update(request, brand_id):
 @user_passes_test(is_staff_user)
 @require_POST
 def quick_brand_create(request):
-    """Quick brand creation using Red Dot Events as template"""
+    """Quick brand creation from a brand template preset or template brand (default: Red Dot Events)"""
     try:
         brand_name = request.POST.get('brand_name', '').strip()
         
@@ -583,8 +673,15 @@ def quick_brand_create(request):
         if BrandProfile.objects.filter(brand_name__iexact=brand_name).exists():
             return JsonResponse({'error': f'Brand "{brand_name}" already exists'}, status=400)
         
-        # Create brand from Red Dot Events template
-        new_brand = BrandProfile.create_from_red_dot_template(brand_name, request.user)
+        preset_name = request.POST.get('preset', '').strip()
+        template_id = request.POST.get('template_id', '').strip()
+        if template_id and not template_id.isdigit():
+            return JsonResponse({'error': 'Invalid template'}, status=400)
+        
+        if preset_name:
+            new_brand, = create_brands([brand_name], request.user, preset_name)
+        else:
+            new_brand = clone_brand(brand_name, request.user, template_id=int(template_id) if template_id else None)
         
         return JsonResponse({
             'success': True,
@@ -1,12 +1,15 @@
-from django.contrib import admin
-from .models import BrandProfile
+from django.contrib import admin, messages
+from django.db import IntegrityError, transaction
+from .models import BrandProfile, BrandTemplate
 
 
 @admin.register(BrandProfile)
 class BrandProfileAdmin(admin.ModelAdmin):
-    list_display = ('brand_name', 'user', 'primary_contact_first_name', 'primary_contact_last_name', 'created_at')
-    list_filter = ('created_at', 'updated_at')
+    list_display = ('brand_name', 'user', 'primary_contact_first_name', 'primary_contact_last_name', 'is_template', 'created_at')
+    list_filter = ('is_template', 'created_at', 'updated_at')
+    actions = ['save_as_brand_template']
     search_fields = ('brand_name', 'user__username', 'primary_contact_first_name', 'primary_contact_last_name')
+    ordering = ('brand_name',)
     readonly_fields = ('created_at', 'updated_at')
     
     fieldsets = (
@@ -43,11 +46,37 @@ class BrandProfileAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('System Information', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('is_template', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
+    def get_queryset(self, request):
+        # __str__ includes the username (changelist rows and brand autocomplete results)
+        return super().get_queryset(request).select_related('user')
+    
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
         # You can add logic here to trigger dashboard updates when admin saves changes
+    
+    @admin.action(description='Save platform setup as brand template')
+    def save_as_brand_template(self, request, queryset):
+        for brand in queryset:
+            try:
+                with transaction.atomic():
+                    BrandTemplate.from_brand(brand, name=brand.brand_name).save()
+            except IntegrityError:
+                self.message_user(request, f'A brand template named "{brand.brand_name}" already exists', messages.WARNING)
+            else:
+                self.message_user(request, f'Saved brand template "{brand.brand_name}"')
+
+
+@admin.register(BrandTemplate)
+class BrandTemplateAdmin(admin.ModelAdmin):
+    list_display = ('name', 'description', 'platform_count', 'updated_at')
+    search_fields = ('name', 'description')
+    readonly_fields = ('created_at', 'updated_at')
+    
+    @admin.display(description='Platforms')
+    def platform_count(self, obj):
+        return len(obj.platforms)
@@ -0,0 +1,287 @@
+"""
+Brand cloning
+
+Creates brands from a template brand or a BrandTemplate preset.
+
+clone_brand copies a template brand (a BrandProfile flagged `is_template`):
+profile fields, platform commitments and content links are copied in one
+transaction with a fixed number of queries. The template is read once and
+cached under a key that includes its version: the latest updated_at and the
+row counts of the template, its platform rows and links, checked with one
+query per clone. Any save or delete in any worker therefore gives a new key;
+bulk updates that leave updated_at alone are picked up when the cached copy
+expires after CACHE_TIMEOUT seconds.
+
+create_brands creates any number of bare brands and applies a BrandTemplate
+preset to all of them with one insert for the platform rows and one for the
+content links. Presets are small, so each worker keeps all of them in memory
+and reloads them every PRESET_CACHE_SECONDS or when one is saved.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from .models import BrandProfile, BrandTemplate
+import hashlib
+import re
+import time
+
+CACHE_TIMEOUT = 300
+PRESET_CACHE_SECONDS = 60
+
+# Per-brand fields that are never copied from the template
+NOT_COPIED = {
+    'id', 'user', 'brand_name', 'additional_notes', 'is_template',
+    'public_uuid', 'is_public_enabled', 'public_link_created_by', 'public_link_created_at',
+    'created_at', 'updated_at',
+}
+
+# The template's own account on the platform, not a default for new brands
+PROFILE_LINK_TITLE = 'Platform Profile'
+
+
+def username_base(brand_name):
+    base = re.sub(r'[^a-z0-9]+', '_', brand_name.lower()).strip('_')
+    return (base or 'brand')[:140]
+
+
+def free_username(base, taken):
+    """First of base, base_1, base_2, ... not in `taken`"""
+    username = base
+    counter = 1
+    while username in taken:
+        username = f'{base}_{counter}'
+        counter += 1
+    return username
+
+
+def taken_usernames(*bases):
+    """Existing usernames base and base_N for each username_base(), in one query"""
+    bases = sorted(set(bases))
+    if not bases:
+        return set()
+    # Prefix lookups can use the username index; the exact shape is checked here
+    lookup = Q()
+    for base in bases:
+        lookup |= Q(username__startswith=base)
+    pattern = re.compile(rf'({"|".join(map(re.escape, bases))})(_[0-9]+)?')
+    return {
+        username for username in User.objects.filter(lookup).values_list('username', flat=True)
+        if pattern.fullmatch(username)
+    }
+
+
+def _latest(queryset, brand_field):
+    """Subquery values (latest updated_at, row count) of a template's related rows"""
+    rows = queryset.filter(**{brand_field: OuterRef('pk')}).order_by().values(brand_field)
+    return (
+        Subquery(rows.annotate(latest=Max('updated_at')).values('latest')),
+        Subquery(rows.annotate(count=Count('pk')).values('count')),
+    )
+
+
+def template_version(template_id=None):
+    """
+    (template id, version) of the template brand cloning would use, in one
+    query. Without template_id the flagged template with the lowest id is used.
+    """
+    from dashboard.models import ClientPlatformProgress, ContentLink
+
+    templates = BrandProfile.objects.filter(is_template=True)
+    if template_id:
+        templates = templates.filter(pk=template_id)
+    platforms_updated, platform_count = _latest(ClientPlatformProgress.objects.all(), 'brand')
+    links_updated, link_count = _latest(
+        ContentLink.objects.exclude(title=PROFILE_LINK_TITLE), 'platform_progress__brand',
+    )
+    row = templates.annotate(
+        platforms_updated=platforms_updated, platform_count=platform_count,
+        links_updated=links_updated, link_count=link_count,
+    ).order_by('pk').values_list(
+        'pk', 'updated_at', 'platforms_updated', 'platform_count', 'links_updated', 'link_count',
+    ).first()
+    if row is None:
+        raise ValueError('Template brand not found' if template_id else 'No brand is flagged as a template')
+    return row[0], hashlib.md5(repr(row[1:]).encode(), usedforsecurity=False).hexdigest()
+
+
+def template_snapshot(template_id=None):
+    """Everything cloning copies from a template brand, as plain data"""
+    from dashboard.models import ClientPlatformProgress, ContentLink
+
+    template_id, version = template_version(template_id)
+    key = f'brand_template:{template_id}:{version}'
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    template = BrandProfile.objects.get(pk=template_id)
+    platforms = list(
+        ClientPlatformProgress.objects.filter(brand=template)
+        .values('platform', 'committed', 'is_visible', 'is_active')
+    )
+    links = list(
+        ContentLink.objects.filter(platform_progress__brand=template)
+        .exclude(title=PROFILE_LINK_TITLE)
+        .values_list('platform_progress__platform', 'title', 'url')
+    )
+    snapshot = {
+        'id': template.pk,
+        'brand_name': template.brand_name,
+        'fields': {
+            field.attname: getattr(template, field.attname)
+            for field in BrandProfile._meta.concrete_fields
+            if field.name not in NOT_COPIED
+        },
+        'platforms': platforms,
+        'links': links,
+    }
+    cache.set(key, snapshot, CACHE_TIMEOUT)
+    return snapshot
+
+
+def clone_brand(brand_name, created_by_user, template_id=None):
+    """Create a brand, its user, platform rows and content links from a template brand"""
+    from dashboard.models import ClientPlatformProgress, ContentLink
+
+    template = template_snapshot(template_id)
+    fields = template['fields']
+    base = username_base(brand_name)
+    username = free_username(base, taken_usernames(base))
+
+    with transaction.atomic():
+        user = User(
+            username=username,
+            email=f"{username}@example.com",  # Dummy email, can be updated later
+            first_name=fields['primary_contact_first_name'],
+            last_name=fields['primary_contact_last_name'],
+        )
+        user.set_unusable_password()
+        user.save()
+
+        brand = BrandProfile.objects.create(
+            user=user,
+            brand_name=brand_name,
+            additional_notes=f"Created from {template['brand_name']} template by {created_by_user.username}",
+            **fields,
+        )
+
+        # Committed values are copied; drafted and published start fresh
+        platform_rows = ClientPlatformProgress.objects.bulk_create([
+            ClientPlatformProgress(
+                brand=brand,
+                notes=f"Committed values copied from {template['brand_name']} template",
+                **platform,
+            )
+            for platform in template['platforms']
+        ])
+        if template['links']:
+            if any(row.pk is None for row in platform_rows):
+                # bulk_create only returns primary keys on some databases
+                platform_rows = ClientPlatformProgress.objects.filter(brand=brand).only('pk', 'platform')
+            progress_ids = {row.platform: row.pk for row in platform_rows}
+            ContentLink.objects.bulk_create([
+                ContentLink(platform_progress_id=progress_ids[platform], title=title, url=url)
+                for platform, title, url in template['links']
+                if platform in progress_ids
+            ])
+
+    return brand
+
+
+_presets = {'loaded_at': None, 'by_name': {}}
+
+
+def presets():
+    """All BrandTemplate presets by name, cached in this worker"""
+    loaded_at = _presets['loaded_at']
+    if loaded_at is None or time.monotonic() - loaded_at > PRESET_CACHE_SECONDS:
+        _presets['by_name'] = {
+            template.name: {'platforms': template.platforms, 'links': template.links}
+            for template in BrandTemplate.objects.all()
+        }
+        _presets['loaded_at'] = time.monotonic()
+    return _presets['by_name']
+
+
+def forget_presets():
+    _presets['loaded_at'] = None
+
+
+def preset(name):
+    try:
+        return presets()[name]
+    except KeyError:
+        raise ValueError(f'Brand template "{name}" not found')
+
+
+def apply_preset(brands, preset):
+    """Create the preset's platform rows and links for brands without any platform rows"""
+    from dashboard.models import ClientPlatformProgress, ContentLink
+
+    names = dict(ClientPlatformProgress.PLATFORM_CHOICES)
+    platform_rows = ClientPlatformProgress.objects.bulk_create([
+        ClientPlatformProgress(
+            brand=brand,
+            platform=platform,
+            committed=committed,
+            is_visible=is_visible,
+            is_active=is_active,
+            notes=f"Auto-created for {names[platform]}",
+        )
+        for brand in brands
+        for platform, (committed, is_visible, is_active) in preset['platforms'].items()
+    ])
+    if preset['links'] and platform_rows:
+        if any(row.pk is None for row in platform_rows):
+            # bulk_create only returns primary keys on some databases
+            platform_rows = ClientPlatformProgress.objects.filter(brand__in=brands).only('pk', 'brand_id', 'platform')
+        progress_ids = {(row.brand_id, row.platform): row.pk for row in platform_rows}
+        ContentLink.objects.bulk_create([
+            ContentLink(platform_progress_id=progress_ids[brand.pk, platform], title=title, url=url)
+            for brand in brands
+            for platform, title, url in preset['links']
+        ])
+    return len(platform_rows)
+
+
+def create_brands(brand_names, created_by_user, preset_name):
+    """Create brands and their users from names and apply a BrandTemplate preset to all of them"""
+    template = preset(preset_name)
+    notes = f"Created from {preset_name} template"
+    if created_by_user is not None:
+        notes += f" by {created_by_user.username}"
+    bases = [username_base(name) for name in brand_names]
+    taken = taken_usernames(*bases)
+
+    users = []
+    for base in bases:
+        username = free_username(base, taken)
+        taken.add(username)
+        user = User(username=username, email=f"{username}@example.com")  # Dummy email, can be updated later
+        user.set_unusable_password()
+        users.append(user)
+
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        if any(user.pk is None for user in users):
+            ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'pk'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        brands = BrandProfile.objects.bulk_create([
+            BrandProfile(
+                user=user,
+                brand_name=name,
+                primary_official_email=user.email,
+                additional_notes=notes,
+            )
+            for user, name in zip(users, brand_names)
+        ])
+        if any(brand.pk is None for brand in brands):
+            ids = dict(BrandProfile.objects.filter(user__in=users).values_list('user_id', 'pk'))
+            for brand in brands:
+                brand.pk = ids[brand.user_id]
+
+        apply_preset(brands, template)
+    return brands
@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from profiles.cloning import create_brands, presets
+from profiles.models import BrandProfile
+import time
+
+
+class Command(BaseCommand):
+    help = 'Create brands from a list of names and apply a brand template preset to all of them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'brand_names',
+            nargs='*',
+            help='Names of the brands to create'
+        )
+        parser.add_argument(
+            '--file',
+            help='Text file with one brand name per line'
+        )
+        parser.add_argument(
+            '--preset',
+            help='Brand template preset to apply'
+        )
+        parser.add_argument(
+            '--created-by',
+            default=None,
+            help='Username recorded as creator in the brand notes'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Brands created per transaction (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        available = presets()
+        if not options['preset']:
+            names = ', '.join(available) or 'none; add one in the admin'
+            raise CommandError(f'--preset is required. Available presets: {names}')
+        if options['preset'] not in available:
+            raise CommandError(f'Brand template "{options["preset"]}" not found')
+
+        brand_names = list(options['brand_names'])
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as names_file:
+                brand_names += [line.strip() for line in names_file if line.strip()]
+        brand_names = list(dict.fromkeys(brand_names))
+        if not brand_names:
+            raise CommandError('No brand names given')
+
+        existing = set(
+            BrandProfile.objects.filter(brand_name__in=brand_names).values_list('brand_name', flat=True)
+        )
+        for name in sorted(existing):
+            self.stdout.write(self.style.WARNING(f'⚠️ Brand "{name}" already exists, skipped'))
+        brand_names = [name for name in brand_names if name not in existing]
+
+        created_by = None
+        if options['created_by']:
+            created_by = User.objects.filter(username=options['created_by']).first()
+            if created_by is None:
+                raise CommandError(f'User "{options["created_by"]}" not found')
+
+        started = time.perf_counter()
+        created = 0
+        batch_size = options['batch_size']
+        for start in range(0, len(brand_names), batch_size):
+            batch = brand_names[start:start + batch_size]
+            create_brands(batch, created_by, options['preset'])
+            created += len(batch)
+            self.stdout.write(f'  Created {created}/{len(brand_names)} brands')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Created {created} brands from "{options["preset"]}" in {elapsed:.2f}s '
+            f'({created / elapsed if elapsed else 0:.0f} brands/s)'
+        ))
@@ -13,6 +13,18 @@ class Command(BaseCommand):
             type=int,
             help='Create platform records for specific brand ID only',
         )
+        parser.add_argument(
+            '--platform',
+            action='append',
+            choices=[code for code, _ in ClientPlatformProgress.PLATFORM_CHOICES],
+            help='Only create records for this platform (repeatable; default: all platforms)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Records inserted per statement (default: 1000)',
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -21,57 +33,27 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         # Get brands to process
+        brand_ids = None
         if options['brand_id']:
             try:
-                brands = [BrandProfile.objects.get(id=options['brand_id'])]
-                self.stdout.write(f"Processing single brand: {brands[0].brand_name}")
+                brand = BrandProfile.objects.get(id=options['brand_id'])
+                self.stdout.write(f"Processing single brand: {brand.brand_name}")
+                brand_ids = [brand.pk]
             except BrandProfile.DoesNotExist:
                 self.stdout.write(
                     self.style.ERROR(f'Brand with ID {options["brand_id"]} does not exist')
                 )
                 return
         else:
-            brands = BrandProfile.objects.all()
-            self.stdout.write(f"Processing all {brands.count()} brands")
-
-        total_created = 0
-        brands_updated = 0
+            self.stdout.write(f"Processing all {BrandProfile.objects.count()} brands")
 
         with transaction.atomic():
-            for brand in brands:
-                # Check how many platform records this brand already has
-                existing_count = ClientPlatformProgress.objects.filter(brand=brand).count()
-                total_platforms = len(ClientPlatformProgress.PLATFORM_CHOICES)
-                
-                if existing_count < total_platforms:
-                    missing_count = total_platforms - existing_count
-                    
-                    if options['dry_run']:
-                        self.stdout.write(
-                            f"[DRY RUN] Would create {missing_count} platform records for {brand.brand_name}"
-                        )
-                        total_created += missing_count
-                        brands_updated += 1
-                    else:
-                        # Create missing platform records
-                        created_count = brand.create_default_platform_records()
-                        
-                        if created_count > 0:
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f"Created {created_count} platform records for {brand.brand_name}"
-                                )
-                            )
-                            total_created += created_count
-                            brands_updated += 1
-                        else:
-                            self.stdout.write(
-                                f"No new records needed for {brand.brand_name} (already has {existing_count} platforms)"
-                            )
-                else:
-                    self.stdout.write(
-                        f"✓ {brand.brand_name} already has all {total_platforms} platform records"
-                    )
+            total_created, brands_updated = BrandProfile.create_missing_platform_records(
+                brand_ids=brand_ids,
+                platforms=options['platform'],
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
 
         # Summary
         if options['dry_run']:
@@ -87,6 +69,6 @@ class Command(BaseCommand):
                     f"\nCompleted! Created {total_created} platform records across {brands_updated} brands"
                 )
             )
-            
+
             if brands_updated == 0:
-                self.stdout.write("All brands already have complete platform records.")
\ No newline at end of file
+                self.stdout.write("All brands already have complete platform records.")
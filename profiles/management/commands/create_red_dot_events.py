@@ -54,6 +54,7 @@ class Command(BaseCommand):
                         'brand_mission': 'To deliver exceptional event experiences that exceed expectations through strategic digital presence',
                         'brand_core_values': 'Creativity, Excellence, Innovation, Customer Focus, Digital Excellence',
                         'is_public_enabled': True,
+                        'is_template': True,
                         'public_uuid': uuid.UUID('12345678-1234-5678-9abc-123456789abc')
                     }
                 )
@@ -0,0 +1,250 @@
+import csv
+import re
+import time
+from urllib.parse import quote
+from allauth.account.models import EmailAddress
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from profiles.cloning import free_username, taken_usernames, username_base
+from profiles.models import BrandProfile
+from dashboard.models import ClientPlatformProgress
+
+# Onboarding form columns -> BrandProfile fields. The form repeats the contact
+# headers for the second contact, so repeated headers map in order.
+FORM_COLUMNS = {
+    'Brand Name': ['brand_name'],
+    '(1) Person to connect with - First Name': ['primary_contact_first_name'],
+    '(1) Person to connect with - Last Name': ['primary_contact_last_name'],
+    '(2) Person to connect with - First Name': ['secondary_contact_first_name'],
+    '(2) Person to connect with - Last Name': ['secondary_contact_last_name'],
+    'Official Email': ['primary_official_email', 'secondary_official_email'],
+    'Phone Number': ['primary_phone_number', 'secondary_phone_number'],
+    'Brand Vision': ['brand_vision'],
+    'Brand Mission': ['brand_mission'],
+    'Brand Core Values': ['brand_core_values'],
+    'Brand Visual/Verbal DNA Guidelines': ['brand_visual_verbal_dna_guidelines'],
+    'Brand Website': ['brand_website'],
+    'Brand Presence': ['brand_presence'],
+    'Digital Footprint KPIs >> Website Traffic >> Current KPIs': ['website_traffic_kpis'],
+    'Digital Footprint KPIs >> Instagram Reach >> Current KPIs': ['instagram_reach_kpis'],
+    'Digital Footprint KPIs >> Google SEPR Rank >> Current KPIs': ['google_sepr_rank_kpis'],
+    'Digital Footprint KPIs >> Review Rating >> Current KPIs': ['review_rating_kpis'],
+    'Digital Footprint KPIs >> Number of Social media posts per Week >> Current KPIs': ['social_media_posts_per_week_kpis'],
+    'Digital Footprint KPIs >> Number of Videos Per week >> Current KPIs': ['videos_per_week_kpis'],
+    'Digital Footprint KPIs >> Number of Shorts Posted per Week >> Current KPIs': ['shorts_per_week_kpis'],
+    'Strengths': ['strengths'],
+    'Weaknesses': ['weaknesses'],
+    'Opportunities': ['opportunities'],
+    'Threats': ['threats'],
+    'Instagram': ['instagram'],
+    'Facebook': ['facebook'],
+    'Twitter/X': ['twitter'],
+    'LinkedIn': ['linkedin'],
+    'TikTok': ['tiktok'],
+    'YouTube': ['youtube'],
+    'Pinterest': ['pinterest'],
+    'Snapchat': ['snapchat'],
+    'Telegram': ['telegram'],
+    'Medium': ['medium'],
+    'Quora': ['quora'],
+    'Reddit': ['reddit'],
+    'Tumblr': ['tumblr'],
+    'Threads': ['threads'],
+    'Blue Sky': ['bluesky'],
+    'WhatsApp Business': ['whatsapp_business'],
+    'Website Blogs': ['website_blogs'],
+    "Brand's Top 10 Partners": ['top_10_partners'],
+    "Brand's Top 10 Competitors": ['top_10_competitors'],
+    'Anything worth to mention': ['additional_notes'],
+}
+
+
+def iter_responses(path):
+    """Form responses as BrandProfile field dicts"""
+    with open(path, newline='', encoding='utf-8-sig') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, [])
+        seen = {}
+        fields = []
+        for column in header:
+            column = column.strip()
+            targets = FORM_COLUMNS.get(column, [])
+            occurrence = seen.get(column, 0)
+            seen[column] = occurrence + 1
+            fields.append(targets[occurrence] if occurrence < len(targets) else None)
+        if 'brand_name' not in fields:
+            raise CommandError(f'{path}: no "Brand Name" column; is this an onboarding form export?')
+
+        for row in reader:
+            yield {field: value for field, value in zip(fields, row) if field}
+
+
+def clean_value(field, value):
+    """Form text -> a value the field can store"""
+    value = (value or '').strip()
+    if isinstance(field, models.URLField) and value:
+        # Answers hold several URLs per line or bare domains; keep the first as a URL
+        value = quote(value.splitlines()[0].strip(), safe=":/?#[]@!$&'()*+,;=%~")
+        if not re.match(r'https?://', value):
+            value = f'https://{value}'
+    if not value:
+        return None if field.null else ''
+    if field.max_length:
+        value = value[:field.max_length]
+    return value
+
+
+class Command(BaseCommand):
+    help = 'Create users, brand profiles and default platform rows from the onboarding form CSV export'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_file',
+            nargs='?',
+            default='ref/Onboarding Form - Digital Branding - Form responses.csv',
+            help='Onboarding form export (default: ref/Onboarding Form - Digital Branding - Form responses.csv)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Brands created per transaction (default: 200)'
+        )
+        parser.add_argument(
+            '--no-platforms',
+            action='store_true',
+            help='Do not create the default platform rows'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Import inside transactions that are rolled back'
+        )
+
+    def handle(self, *args, **options):
+        self.fields = {
+            field.name: field for field in BrandProfile._meta.get_fields()
+            if field.concrete and field.name in {f for targets in FORM_COLUMNS.values() for f in targets}
+        }
+        self.with_platforms = not options['no_platforms']
+        self.dry_run = options['dry_run']
+        self.stats = {'rows': 0, 'brands': 0, 'users': 0, 'platforms': 0, 'skipped': 0}
+
+        started = time.perf_counter()
+        batch = {}
+        try:
+            for response in iter_responses(options['csv_file']):
+                self.stats['rows'] += 1
+                email = (response.get('primary_official_email') or '').strip().lower()
+                if not response.get('brand_name', '').strip() or not email:
+                    self.stdout.write(self.style.WARNING(f'⚠️ Row {self.stats["rows"]}: missing brand name or email, skipped'))
+                    self.stats['skipped'] += 1
+                    continue
+                # Resubmissions replace earlier answers from the same contact
+                batch[email] = response
+                if len(batch) >= options['batch_size']:
+                    self.import_batch(batch)
+                    batch = {}
+            if batch:
+                self.import_batch(batch)
+        except FileNotFoundError:
+            raise CommandError(f'CSV file not found: {options["csv_file"]}')
+
+        elapsed = time.perf_counter() - started
+        stats = self.stats
+        prefix = '🔍 Dry run:' if self.dry_run else '✅'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix} {stats["brands"]} brands ({stats["users"]} new users, {stats["platforms"]} platform rows) '
+            f'from {stats["rows"]} responses in {elapsed:.2f}s '
+            f'({stats["brands"] / elapsed if elapsed else 0:.0f} brands/s); {stats["skipped"]} skipped'
+        ))
+
+    def import_batch(self, batch):
+        batch_started = time.perf_counter()
+        with transaction.atomic():
+            users = self.users_for(batch)
+
+            brands = []
+            for email, response in batch.items():
+                user = users.get(email)
+                if user is None:
+                    continue
+                values = {name: clean_value(field, response.get(name)) for name, field in self.fields.items()}
+                values['primary_official_email'] = email
+                brands.append(BrandProfile(user=user, **values))
+            BrandProfile.objects.bulk_create(brands)
+
+            platforms = 0
+            if self.with_platforms and brands:
+                # bulk_create only returns primary keys on some databases
+                if any(brand.pk is None for brand in brands):
+                    ids = dict(
+                        BrandProfile.objects.filter(user__in=[brand.user for brand in brands])
+                        .values_list('user_id', 'pk')
+                    )
+                    for brand in brands:
+                        brand.pk = ids[brand.user_id]
+                # Every new brand's platform rows go in one insert
+                rows = [row for brand in brands for row in brand.default_platform_records()]
+                ClientPlatformProgress.objects.bulk_create(rows)
+                platforms = len(rows)
+
+            if self.dry_run:
+                transaction.set_rollback(True)
+
+        self.stats['brands'] += len(brands)
+        self.stats['platforms'] += platforms
+        elapsed = time.perf_counter() - batch_started
+        self.stdout.write(
+            f'  Batch: {len(brands)} brands, {platforms} platform rows in {elapsed:.2f}s '
+            f'({len(brands) / elapsed if elapsed else 0:.0f} brands/s)'
+        )
+
+    def users_for(self, batch):
+        """email -> User for each response that still needs a brand, creating missing users"""
+        existing = {}
+        for user in (
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=batch.keys())
+            .select_related('brandprofile')
+        ):
+            if hasattr(user, 'brandprofile'):
+                self.stdout.write(f'  Skipping {batch[user.email_lower]["brand_name"]}: {user.email} already has a brand')
+                self.stats['skipped'] += 1
+                existing[user.email_lower] = None
+            else:
+                # Registered but never finished onboarding
+                existing[user.email_lower] = user
+
+        new_emails = [email for email in batch if email not in existing]
+        taken = taken_usernames(*(username_base(batch[email]['brand_name']) for email in new_emails))
+        new_users = []
+        for email in new_emails:
+            response = batch[email]
+            username = free_username(username_base(response['brand_name']), taken)
+            taken.add(username)
+            user = User(
+                username=username,
+                email=email,
+                first_name=clean_value(User._meta.get_field('first_name'), response.get('primary_contact_first_name')),
+                last_name=clean_value(User._meta.get_field('last_name'), response.get('primary_contact_last_name')),
+            )
+            # Clients sign in with Google or set a password through reset
+            user.set_unusable_password()
+            new_users.append(user)
+
+        User.objects.bulk_create(new_users)
+        if any(user.pk is None for user in new_users):
+            ids = dict(User.objects.filter(username__in=[user.username for user in new_users]).values_list('username', 'pk'))
+            for user in new_users:
+                user.pk = ids[user.username]
+        EmailAddress.objects.bulk_create(
+            [EmailAddress(user=user, email=user.email, primary=True, verified=False) for user in new_users]
+        )
+
+        self.stats['users'] += len(new_users)
+        users = {email: user for email, user in existing.items() if user is not None}
+        users.update((user.email, user) for user in new_users)
+        return users
@@ -0,0 +1,303 @@
+import csv
+import json
+import re
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from profiles.models import BrandProfile
+from dashboard.models import ClientPlatformProgress, ContentLink
+
+# Spellings used in the client sheets that don't match a platform code or
+# display name; extend with settings.PLATFORM_CSV_ALIASES or --aliases
+PLATFORM_ALIASES = {
+    'PinInterest': 'pinterest',
+    'X (Twitter)': 'twitter',
+    'X': 'twitter',
+    'Twitter': 'twitter',
+    'Google My Business': 'google_business',
+    'Email': 'email_marketing',
+    'Website': None,  # The site itself, not a content platform
+}
+
+PROGRESS_FIELDS = ['committed', 'drafted', 'published', 'notes', 'is_visible', 'is_active', 'updated_at']
+
+# Titles given to links from the 'Content Created' and 'Platform Links' columns
+CONTENT_LINK_TITLE = 'View Content Plan'
+PROFILE_LINK_TITLE = 'Platform Profile'
+
+
+def normalize(name):
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def platform_aliases(path=None):
+    """Normalized platform name -> platform code (None to skip the row)"""
+    aliases = {}
+    for code, label in ClientPlatformProgress.PLATFORM_CHOICES:
+        aliases[normalize(code)] = code
+        aliases[normalize(label)] = code
+
+    extra = dict(PLATFORM_ALIASES)
+    extra.update(getattr(settings, 'PLATFORM_CSV_ALIASES', {}))
+    if path:
+        with open(path, encoding='utf-8') as alias_file:
+            extra.update(json.load(alias_file))
+
+    codes = {code for code, _ in ClientPlatformProgress.PLATFORM_CHOICES}
+    for name, code in extra.items():
+        if code is not None and code not in codes:
+            raise CommandError(f'Alias "{name}" maps to unknown platform "{code}"')
+        aliases[normalize(name)] = code
+    return aliases
+
+
+def count(value):
+    value = (value or '').strip()
+    return int(value) if value.isdigit() else 0
+
+
+def iter_sheet(path):
+    """Data rows of a platform sheet as dicts, skipping the title rows above the header"""
+    with open(path, newline='', encoding='utf-8-sig') as csv_file:
+        reader = csv.reader(csv_file)
+        for header in reader:
+            if 'Platform' in (cell.strip() for cell in header):
+                break
+        else:
+            raise CommandError(f'{path}: no header row with a "Platform" column')
+
+        header = [cell.strip() for cell in header]
+        for row in reader:
+            yield dict(zip(header, (cell.strip() for cell in row)))
+
+
+def progress_values(platform, row):
+    """ClientPlatformProgress fields for one sheet row"""
+    past_status = row.get('Past Status', '')
+    committed = count(row.get('Commited', row.get('Committed')))
+
+    is_active = past_status == 'Active'
+    # Website blogs are delivered as soon as anything is committed
+    if platform == 'website_blogs' and committed > 0:
+        is_active = True
+
+    notes = f"Status: {past_status}"
+    if row.get('Platform Links'):
+        notes += f"\nPlatform URL: {row['Platform Links']}"
+
+    return {
+        'committed': committed,
+        'drafted': count(row.get('Drafted')),
+        'published': count(row.get('Published')),
+        'notes': notes,
+        # Not Available platforms stay hidden; otherwise show what is active
+        'is_visible': is_active and past_status != 'Not Available',
+        'is_active': is_active and past_status != 'Not Available',
+    }
+
+
+def row_links(row):
+    """(title, url) content links a sheet row carries"""
+    links = []
+    for column, title in (('Content Created', CONTENT_LINK_TITLE), ('Platform Links', PROFILE_LINK_TITLE)):
+        url = row.get(column, '')
+        # Sheets use the word "Link" as a placeholder before the document exists
+        if url.startswith(('http://', 'https://')):
+            links.append((title, url))
+    return links
+
+
+class Command(BaseCommand):
+    help = 'Import platform progress and content links for one or more brands from platform CSV sheets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_files',
+            nargs='+',
+            help='Platform sheets in the format of "ref/Digital Marketing TTG - Platforms.csv"'
+        )
+        parser.add_argument(
+            '--brand',
+            action='append',
+            default=[],
+            help='Brand id, username or brand name. Give one per file, or one for all files; '
+                 'not needed when the sheet has a "Brand" column'
+        )
+        parser.add_argument(
+            '--aliases',
+            help='JSON file of extra {"sheet platform name": "platform_code"} aliases'
+        )
+        parser.add_argument(
+            '--no-links',
+            action='store_true',
+            help='Only import platform progress, not content links'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows upserted per statement (default: 500)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Import inside a transaction that is rolled back'
+        )
+
+    def handle(self, *args, **options):
+        files = options['csv_files']
+        brands = options['brand']
+        if len(brands) > 1 and len(brands) != len(files):
+            raise CommandError('Give one --brand per CSV file, or a single --brand for all files')
+
+        self.aliases = platform_aliases(options['aliases'])
+        self.batch_size = options['batch_size']
+        self.with_links = not options['no_links']
+        self.brand_cache = {}
+        self.stats = {'rows': 0, 'created': 0, 'updated': 0, 'links_created': 0, 'links_updated': 0}
+        self.unknown = set()
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            for index, path in enumerate(files):
+                brand_ref = brands[index] if len(brands) > 1 else (brands[0] if brands else None)
+                default_brand = self.resolve_brand(brand_ref, required=True) if brand_ref else None
+                self.stdout.write(f'📄 Importing {path}' + (f' into {default_brand.brand_name}' if default_brand else ''))
+                try:
+                    self.import_sheet(path, default_brand)
+                except FileNotFoundError:
+                    raise CommandError(f'CSV file not found: {path}')
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        elapsed = time.perf_counter() - started
+        stats = self.stats
+        if self.unknown:
+            self.stdout.write(self.style.WARNING(f'⚠️ Skipped unknown platforms: {", ".join(sorted(self.unknown))}'))
+        prefix = '🔍 Dry run:' if options['dry_run'] else '✅'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix} {stats["rows"]} rows in {elapsed:.2f}s '
+            f'({stats["rows"] / elapsed if elapsed else 0:.0f} rows/s): '
+            f'{stats["created"]} platforms created, {stats["updated"]} updated, '
+            f'{stats["links_created"]} links created, {stats["links_updated"]} updated'
+        ))
+
+    def resolve_brand(self, ref, required=False):
+        """BrandProfile for an id, username or brand name (cached per run)"""
+        if ref not in self.brand_cache:
+            lookup = Q(user__username=ref) | Q(brand_name__iexact=ref)
+            if ref.isdigit():
+                lookup |= Q(pk=int(ref))
+            matches = list(BrandProfile.objects.filter(lookup)[:2])
+            if len(matches) > 1:
+                raise CommandError(f'Brand "{ref}" is ambiguous; use the brand id')
+            self.brand_cache[ref] = matches[0] if matches else None
+
+        brand = self.brand_cache[ref]
+        if brand is None and required:
+            raise CommandError(f'Brand "{ref}" not found')
+        return brand
+
+    def import_sheet(self, path, default_brand):
+        # Later rows for the same brand and platform win
+        batch = {}
+        for row in iter_sheet(path):
+            name = row.get('Platform', '')
+            if not name:
+                continue  # Blank and totals rows
+
+            key = normalize(name)
+            if key not in self.aliases:
+                self.unknown.add(name)
+                continue
+            platform = self.aliases[key]
+            if platform is None:
+                continue
+
+            brand = default_brand
+            if row.get('Brand'):
+                brand = self.resolve_brand(row['Brand'])
+            if brand is None:
+                if not row.get('Brand'):
+                    raise CommandError(f'{path}: no --brand given and the sheet has no "Brand" column')
+                self.stdout.write(self.style.WARNING(f'⚠️ Unknown brand "{row["Brand"]}", skipping {name}'))
+                continue
+
+            batch[brand.pk, platform] = row
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = {}
+        if batch:
+            self.flush(batch)
+
+    def flush(self, batch):
+        """Upsert one batch of (brand id, platform) -> row with a few statements"""
+        brand_ids = {brand_id for brand_id, _ in batch}
+        platforms = {platform for _, platform in batch}
+        existing = set(
+            ClientPlatformProgress.objects.filter(brand_id__in=brand_ids, platform__in=platforms)
+            .values_list('brand_id', 'platform')
+        )
+
+        now = timezone.now()
+        ClientPlatformProgress.objects.bulk_create(
+            [
+                ClientPlatformProgress(
+                    brand_id=brand_id, platform=platform, updated_at=now,
+                    **progress_values(platform, row),
+                )
+                for (brand_id, platform), row in batch.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['brand', 'platform'],
+            update_fields=PROGRESS_FIELDS,
+        )
+        updated = len(existing & batch.keys())
+        self.stats['rows'] += len(batch)
+        self.stats['updated'] += updated
+        self.stats['created'] += len(batch) - updated
+
+        if self.with_links:
+            self.upsert_links(batch, brand_ids, platforms, now)
+
+    def upsert_links(self, batch, brand_ids, platforms, now):
+        progress_ids = {
+            (brand_id, platform): pk
+            for pk, brand_id, platform in ClientPlatformProgress.objects.filter(
+                brand_id__in=brand_ids, platform__in=platforms
+            ).values_list('pk', 'brand_id', 'platform')
+        }
+        wanted = {
+            (progress_ids[key], title): url
+            for key, row in batch.items()
+            for title, url in row_links(row)
+        }
+        if not wanted:
+            return
+
+        existing = {
+            (link.platform_progress_id, link.title): link
+            for link in ContentLink.objects.filter(
+                platform_progress_id__in={progress_id for progress_id, _ in wanted},
+                title__in={title for _, title in wanted},
+            ).only('pk', 'platform_progress_id', 'title', 'url')
+        }
+
+        to_create = []
+        to_update = []
+        for (progress_id, title), url in wanted.items():
+            link = existing.get((progress_id, title))
+            if link is None:
+                to_create.append(ContentLink(platform_progress_id=progress_id, title=title, url=url))
+            elif link.url != url:
+                link.url = url
+                link.updated_at = now
+                to_update.append(link)
+
+        ContentLink.objects.bulk_create(to_create)
+        ContentLink.objects.bulk_update(to_update, ['url', 'updated_at'])
+        self.stats['links_created'] += len(to_create)
+        self.stats['links_updated'] += len(to_update)
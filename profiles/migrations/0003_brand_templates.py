@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def flag_red_dot_events(apps, schema_editor):
+    """Red Dot Events was the hardcoded template before brands could be flagged"""
+    BrandProfile = apps.get_model('profiles', 'BrandProfile')
+    db_alias = schema_editor.connection.alias
+    template = (
+        BrandProfile.objects.using(db_alias)
+        .filter(brand_name__iexact='Red Dot Events')
+        .order_by('id')
+        .first()
+    )
+    if template:
+        template.is_template = True
+        template.save(update_fields=['is_template'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_brandprofile_is_public_enabled_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brandprofile',
+            name='is_template',
+            field=models.BooleanField(default=False, help_text='Offer this brand as a template for new brands'),
+        ),
+        migrations.AddIndex(
+            model_name='brandprofile',
+            index=models.Index(condition=models.Q(('is_template', True)), fields=['id'], name='brand_template_idx'),
+        ),
+        migrations.RunPython(flag_red_dot_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_brand_templates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BrandTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('platforms', models.JSONField(default=dict, help_text='{"platform_code": [committed, is_visible, is_active], ...}')),
+                ('links', models.JSONField(blank=True, default=list, help_text='[["platform_code", "title", "url"], ...]')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Brand Template',
+                'verbose_name_plural': 'Brand Templates',
+                'ordering': ['name'],
+            },
+        ),
+    ]
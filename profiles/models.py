@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from itertools import groupby
+from operator import itemgetter
 import uuid
 
 
@@ -74,6 +76,9 @@ class BrandProfile(models.Model):
     public_link_created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_public_links', help_text="Manager who enabled public access")
     public_link_created_at = models.DateTimeField(null=True, blank=True, help_text="When public access was first enabled")
     
+    # Brand Templates
+    is_template = models.BooleanField(default=False, help_text="Offer this brand as a template for new brands")
+    
     # System Fields
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -85,159 +90,152 @@ class BrandProfile(models.Model):
         """Generate a unique UUID for public dashboard access"""
         if not self.public_uuid:
             self.public_uuid = uuid.uuid4()
-            self.save(update_fields=['public_uuid'])
+            self.save(update_fields=['public_uuid', 'updated_at'])
         return self.public_uuid
     
-    def create_default_platform_records(self):
-        """Create ClientPlatformProgress records for all available platforms"""
+    @staticmethod
+    def _default_platform_record(platform_code, platform_name, **brand):
         from dashboard.models import ClientPlatformProgress
         
-        # Get all platform choices
-        platforms_to_create = []
-        existing_platforms = set(
-            ClientPlatformProgress.objects.filter(brand=self).values_list('platform', flat=True)
+        return ClientPlatformProgress(
+            platform=platform_code,
+            committed=0,
+            drafted=0,
+            published=0,
+            notes=f"Auto-created for {platform_name}",
+            is_visible=True,
+            is_active=True,
+            **brand
         )
-        
-        # Create records for platforms that don't exist yet
-        for platform_code, platform_name in ClientPlatformProgress.PLATFORM_CHOICES:
-            if platform_code not in existing_platforms:
-                platforms_to_create.append(
-                    ClientPlatformProgress(
-                        brand=self,
-                        platform=platform_code,
-                        committed=0,
-                        drafted=0,
-                        published=0,
-                        notes=f"Auto-created for {platform_name}",
-                        is_visible=True,
-                        is_active=True
-                    )
-                )
-        
-        # Bulk create all missing platform records
-        if platforms_to_create:
-            ClientPlatformProgress.objects.bulk_create(platforms_to_create)
-            return len(platforms_to_create)
-        return 0
-
-    @classmethod
-    def create_from_red_dot_template(cls, brand_name, created_by_user):
-        """Create a new brand using Red Dot Events as template"""
-        from django.contrib.auth.models import User
+    
+    def default_platform_records(self, existing_platforms=()):
+        """Unsaved ClientPlatformProgress rows for every platform not in existing_platforms"""
         from dashboard.models import ClientPlatformProgress
         
-        try:
-            # Get Red Dot Events brand as template
-            template_brand = cls.objects.get(brand_name__icontains='red dot events')
-        except cls.DoesNotExist:
-            raise ValueError("Red Dot Events template brand not found")
-        
-        # Create username from brand name
-        username = brand_name.lower().replace(' ', '_').replace('-', '_')
-        # Ensure username is unique
-        counter = 1
-        original_username = username
-        while User.objects.filter(username=username).exists():
-            username = f"{original_username}_{counter}"
-            counter += 1
-        
-        # Create user account for the brand
-        user = User.objects.create_user(
-            username=username,
-            email=f"{username}@example.com",  # Dummy email, can be updated later
-            first_name=template_brand.primary_contact_first_name,
-            last_name=template_brand.primary_contact_last_name,
-        )
+        return [
+            self._default_platform_record(platform_code, platform_name, brand=self)
+            for platform_code, platform_name in ClientPlatformProgress.PLATFORM_CHOICES
+            if platform_code not in existing_platforms
+        ]
+    
+    def create_default_platform_records(self):
+        """Create ClientPlatformProgress records for all available platforms"""
+        created_count, _ = BrandProfile.create_missing_platform_records(brand_ids=[self.pk])
+        return created_count
+    
+    @classmethod
+    def create_missing_platform_records(cls, brand_ids=None, platforms=None, batch_size=1000,
+                                        dry_run=False, using='default'):
+        """
+        Create the default platform rows brands are missing, set-based.
         
-        # Create new brand profile by copying from template
-        new_brand = cls.objects.create(
-            user=user,
-            brand_name=brand_name,
-            
-            # Copy contact information from template
-            primary_contact_first_name=template_brand.primary_contact_first_name,
-            primary_contact_last_name=template_brand.primary_contact_last_name,
-            primary_official_email=template_brand.primary_official_email,
-            primary_phone_number=template_brand.primary_phone_number,
-            
-            # Copy secondary contact if exists
-            secondary_contact_first_name=template_brand.secondary_contact_first_name,
-            secondary_contact_last_name=template_brand.secondary_contact_last_name,
-            secondary_official_email=template_brand.secondary_official_email,
-            secondary_phone_number=template_brand.secondary_phone_number,
-            
-            # Copy brand strategy
-            brand_vision=template_brand.brand_vision,
-            brand_mission=template_brand.brand_mission,
-            brand_core_values=template_brand.brand_core_values,
-            brand_visual_verbal_dna_guidelines=template_brand.brand_visual_verbal_dna_guidelines,
-            brand_website=template_brand.brand_website,
-            brand_presence=template_brand.brand_presence,
-            
-            # Copy KPIs
-            website_traffic_kpis=template_brand.website_traffic_kpis,
-            instagram_reach_kpis=template_brand.instagram_reach_kpis,
-            google_sepr_rank_kpis=template_brand.google_sepr_rank_kpis,
-            review_rating_kpis=template_brand.review_rating_kpis,
-            social_media_posts_per_week_kpis=template_brand.social_media_posts_per_week_kpis,
-            videos_per_week_kpis=template_brand.videos_per_week_kpis,
-            shorts_per_week_kpis=template_brand.shorts_per_week_kpis,
-            
-            # Copy SWOT analysis
-            strengths=template_brand.strengths,
-            weaknesses=template_brand.weaknesses,
-            opportunities=template_brand.opportunities,
-            threats=template_brand.threats,
-            
-            # Copy social media platforms (will be updated with brand-specific URLs later)
-            instagram=template_brand.instagram,
-            facebook=template_brand.facebook,
-            twitter=template_brand.twitter,
-            linkedin=template_brand.linkedin,
-            tiktok=template_brand.tiktok,
-            youtube=template_brand.youtube,
-            pinterest=template_brand.pinterest,
-            snapchat=template_brand.snapchat,
-            telegram=template_brand.telegram,
-            medium=template_brand.medium,
-            quora=template_brand.quora,
-            reddit=template_brand.reddit,
-            tumblr=template_brand.tumblr,
-            threads=template_brand.threads,
-            bluesky=template_brand.bluesky,
-            whatsapp_business=template_brand.whatsapp_business,
-            website_blogs=template_brand.website_blogs,
-            
-            # Copy business intelligence
-            top_10_partners=template_brand.top_10_partners,
-            top_10_competitors=template_brand.top_10_competitors,
-            additional_notes=f"Created from Red Dot Events template by {created_by_user.username}",
-        )
+        One query streams every brand with the platforms it already has (a left
+        join, so brands without any rows are included) and the missing rows are
+        inserted in chunks of batch_size. Conflicting inserts are ignored, so it
+        is safe to run while brands are being onboarded.
+        Returns (records created, brands updated).
+        """
+        from dashboard.models import ClientPlatformProgress
         
-        # Copy platform progress records with same committed values
-        template_platforms = ClientPlatformProgress.objects.filter(brand=template_brand)
-        platforms_to_create = []
+        names = dict(ClientPlatformProgress.PLATFORM_CHOICES)
+        platforms = list(platforms) if platforms is not None else list(names)
         
-        for template_platform in template_platforms:
-            platforms_to_create.append(
-                ClientPlatformProgress(
-                    brand=new_brand,
-                    platform=template_platform.platform,
-                    committed=template_platform.committed,  # Copy exact committed values
-                    drafted=0,  # Start fresh
-                    published=0,  # Start fresh
-                    notes=f"Committed values copied from Red Dot Events template",
-                    is_visible=template_platform.is_visible,
-                    is_active=template_platform.is_active
-                )
-            )
+        brands = cls.objects.using(using)
+        if brand_ids is not None:
+            brands = brands.filter(pk__in=brand_ids)
+        pairs = brands.values_list('pk', 'platform_progress__platform').order_by('pk').iterator(chunk_size=5000)
         
-        # Bulk create all platform records
-        if platforms_to_create:
-            ClientPlatformProgress.objects.bulk_create(platforms_to_create)
+        missing = []
+        created_count = brands_updated = 0
+        for brand_id, rows in groupby(pairs, key=itemgetter(0)):
+            existing = {platform for _, platform in rows}
+            brand_missing = [
+                cls._default_platform_record(platform, names[platform], brand_id=brand_id)
+                for platform in platforms if platform not in existing
+            ]
+            if not brand_missing:
+                continue
+            created_count += len(brand_missing)
+            brands_updated += 1
+            missing.extend(brand_missing)
+            if len(missing) >= batch_size:
+                if not dry_run:
+                    ClientPlatformProgress.objects.using(using).bulk_create(missing, ignore_conflicts=True)
+                missing = []
+        if missing and not dry_run:
+            ClientPlatformProgress.objects.using(using).bulk_create(missing, ignore_conflicts=True)
+        return created_count, brands_updated
+
+    @classmethod
+    def create_from_red_dot_template(cls, brand_name, created_by_user):
+        """Create a new brand from the flagged template brand (Red Dot Events)"""
+        from .cloning import clone_brand
         
-        return new_brand
+        return clone_brand(brand_name, created_by_user)
 
     class Meta:
+        indexes = [
+            # Template lookups when cloning brands
+            models.Index(fields=['id'], condition=models.Q(is_template=True), name='brand_template_idx'),
+        ]
         verbose_name = "Brand Profile"
         verbose_name_plural = "Brand Profiles"
+
+
+class BrandTemplate(models.Model):
+    """Named preset of platform commitments and default content links for new brands"""
+    
+    name = models.CharField(max_length=100, unique=True)
+    description = models.CharField(max_length=255, blank=True)
+    
+    # Compact JSON: {"linkedin": [committed, is_visible, is_active], ...}
+    platforms = models.JSONField(default=dict, help_text='{"platform_code": [committed, is_visible, is_active], ...}')
+    # [["linkedin", "Content Calendar", "https://..."], ...]
+    links = models.JSONField(default=list, blank=True, help_text='[["platform_code", "title", "url"], ...]')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return self.name
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from dashboard.models import ClientPlatformProgress
+        
+        codes = {code for code, _ in ClientPlatformProgress.PLATFORM_CHOICES}
+        if not isinstance(self.platforms, dict):
+            raise ValidationError({'platforms': 'Expected an object of platform code to [committed, is_visible, is_active]'})
+        for code, preset in self.platforms.items():
+            if code not in codes:
+                raise ValidationError({'platforms': f'Unknown platform "{code}"'})
+            if (not isinstance(preset, list) or len(preset) != 3 or not isinstance(preset[0], int)
+                    or not all(isinstance(flag, bool) for flag in preset[1:])):
+                raise ValidationError({'platforms': f'"{code}" must be [committed, is_visible, is_active]'})
+        if not isinstance(self.links, list):
+            raise ValidationError({'links': 'Expected a list of [platform code, title, url]'})
+        for link in self.links:
+            if not isinstance(link, list) or len(link) != 3 or link[0] not in self.platforms:
+                raise ValidationError({'links': f'{link!r} must be [platform code in the preset, title, url]'})
+    
+    @classmethod
+    def from_brand(cls, brand, name, description=''):
+        """Unsaved preset with the platform commitments and content links of an existing brand"""
+        from dashboard.models import ClientPlatformProgress, ContentLink
+        
+        platforms = {
+            platform: [committed, is_visible, is_active]
+            for platform, committed, is_visible, is_active in ClientPlatformProgress.objects.filter(brand=brand)
+            .order_by('platform').values_list('platform', 'committed', 'is_visible', 'is_active')
+        }
+        links = [
+            list(link) for link in ContentLink.objects.filter(platform_progress__brand=brand)
+            .exclude(title='Platform Profile').order_by('pk')
+            .values_list('platform_progress__platform', 'title', 'url')
+        ]
+        return cls(name=name, description=description, platforms=platforms, links=links)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Brand Template"
+        verbose_name_plural = "Brand Templates"
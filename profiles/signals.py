@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from .cloning import forget_presets
+from .models import BrandTemplate
+
+
+def preset_changed(sender, instance, **kwargs):
+    forget_presets()
+
+
+# Cached presets go stale when a template changes
+for signal in (post_save, post_delete):
+    signal.connect(preset_changed, sender=BrandTemplate, dispatch_uid=f'template_preset_{signal is post_save}')
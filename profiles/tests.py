@@ -1,3 +1,267 @@
+from allauth.account.models import EmailAddress
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from io import StringIO
+from pathlib import Path
+from dashboard.models import ClientPlatformProgress, ContentLink
+from .cloning import clone_brand, create_brands, forget_presets, preset, presets, taken_usernames, username_base
+from .models import BrandProfile, BrandTemplate
+import csv
+import tempfile
 
-# Create your tests here.
+PLATFORM_SHEET = '''\
+,1st month Deliverables,,,,,,
+S.No.,Platform,Past Status,Commited,Drafted,Published,Content Created,Platform Links
+,Website,Already in Place,--,--,--,,
+1,Linkedin,Active,30,5,2,https://docs.example.com/linkedin-plan,https://linkedin.example.com/csv_brand
+2,YouTube,Not Active,15,1,,Link,
+3,PinInterest,Not Available,10,,,,
+4,Myspace,Active,5,,,,
+'''
+
+
+def create_brand(username, **fields):
+    user = User.objects.create_user(username, f'{username}@example.com')
+    return BrandProfile.objects.create(
+        user=user, brand_name=f'Brand {username}',
+        primary_contact_first_name='Primary', primary_contact_last_name='Contact',
+        primary_official_email=f'contact@{username}.example.com', primary_phone_number='+1-555-0100',
+        brand_vision='Vision', brand_mission='Mission', brand_core_values='Values',
+        **fields,
+    )
+
+
+class TemporaryDirectoryMixin:
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+
+class ImportPlatformCsvTests(TemporaryDirectoryMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.brand = create_brand('csv_brand')
+        ClientPlatformProgress.objects.create(brand=self.brand, platform='linkedin', committed=1, drafted=1)
+        self.sheet = self.directory / 'platforms.csv'
+        self.sheet.write_text(PLATFORM_SHEET)
+
+    def run_import(self, *args):
+        output = StringIO()
+        call_command('import_platform_csv', str(self.sheet), '--brand', 'csv_brand', *args, stdout=output)
+        return output.getvalue()
+
+    def platforms(self):
+        return {
+            platform.platform: (platform.committed, platform.drafted, platform.published, platform.is_visible)
+            for platform in self.brand.platform_progress.all()
+        }
+
+    def test_inserts_and_updates_platforms_and_links(self):
+        output = self.run_import()
+        self.assertIn('3 rows', output)
+        self.assertIn('2 platforms created, 1 updated, 2 links created', output)
+        self.assertIn('Skipped unknown platforms: Myspace', output)
+        self.assertEqual(self.platforms(), {
+            'linkedin': (30, 5, 2, True),
+            'youtube': (15, 1, 0, False),
+            'pinterest': (10, 0, 0, False),
+        })
+        self.assertEqual(
+            dict(ContentLink.objects.filter(platform_progress__brand=self.brand).values_list('title', 'url')),
+            {'View Content Plan': 'https://docs.example.com/linkedin-plan',
+             'Platform Profile': 'https://linkedin.example.com/csv_brand'},
+        )
+
+        # A second run updates in place
+        self.sheet.write_text(PLATFORM_SHEET.replace('30,5,2', '40,6,3'))
+        output = self.run_import()
+        self.assertIn('0 platforms created, 3 updated, 0 links created, 0 updated', output)
+        self.assertEqual(self.platforms()['linkedin'], (40, 6, 3, True))
+        self.assertEqual(ContentLink.objects.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        output = self.run_import('--dry-run')
+        self.assertIn('Dry run: 3 rows', output)
+        self.assertEqual(self.platforms(), {'linkedin': (1, 1, 0, True)})
+        self.assertFalse(ContentLink.objects.exists())
+
+    def test_sheet_without_platform_column_is_rejected(self):
+        self.sheet.write_text('S.No.,Channel,Commited\n1,Linkedin,30\n')
+        with self.assertRaisesMessage(CommandError, 'no header row with a "Platform" column'):
+            self.run_import()
+
+
+class ImportBrandsTests(TemporaryDirectoryMixin, TestCase):
+    HEADER = [
+        'Brand Name', '(1) Person to connect with - First Name', '(1) Person to connect with - Last Name',
+        'Official Email', 'Phone Number', 'Brand Vision', 'Brand Mission', 'Brand Core Values', 'Brand Website',
+    ]
+
+    def write_form(self, *brand_names, email=None):
+        path = self.directory / 'responses.csv'
+        with open(path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(self.HEADER)
+            for name in brand_names:
+                writer.writerow([
+                    name, 'First', 'Last', email or f'{username_base(name)}@example.com', '555-0100',
+                    'Vision', 'Mission', 'Values', f'{username_base(name)}.example.com',
+                ])
+        return path
+
+    def run_import(self, path):
+        output = StringIO()
+        call_command('import_brands', str(path), stdout=output)
+        return output.getvalue()
+
+    def test_queries_per_batch_do_not_grow_with_brands(self):
+        queries = []
+        for names in (['Alpha Co'], ['Beta Co', 'Gamma Co', 'Delta Co']):
+            with CaptureQueriesContext(connection) as context:
+                self.run_import(self.write_form(*names))
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+        brand = BrandProfile.objects.get(brand_name='Gamma Co')
+        self.assertEqual(brand.user.username, 'gamma_co')
+        self.assertEqual(brand.brand_website, 'https://gamma_co.example.com')
+        self.assertFalse(brand.user.has_usable_password())
+        self.assertTrue(EmailAddress.objects.filter(user=brand.user, email='gamma_co@example.com', primary=True).exists())
+        self.assertEqual(brand.platform_progress.count(), len(ClientPlatformProgress.PLATFORM_CHOICES))
+
+    def test_existing_email_is_reused(self):
+        registered = User.objects.create_user('registered', 'Owner@Example.com')
+        create_brand('onboarded')
+        output = self.run_import(self.write_form('Registered Co', email='owner@example.com'))
+        self.run_import(self.write_form('Onboarded Again', email='onboarded@example.com'))
+
+        self.assertIn('1 brands (0 new users', output)
+        self.assertEqual(BrandProfile.objects.get(brand_name='Registered Co').user, registered)
+        self.assertFalse(BrandProfile.objects.filter(brand_name='Onboarded Again').exists())
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_rerun_creates_no_duplicates(self):
+        path = self.write_form('Alpha Co', 'Beta Co')
+        self.run_import(path)
+        output = self.run_import(path)
+        self.assertIn('0 brands (0 new users, 0 platform rows) from 2 responses', output)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(BrandProfile.objects.count(), 2)
+        self.assertEqual(ClientPlatformProgress.objects.count(), 2 * len(ClientPlatformProgress.PLATFORM_CHOICES))
+
+
+class CloningTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        forget_presets()
+        self.manager = User.objects.create_user('cloning_manager', is_staff=True)
+        self.template = create_brand('template_brand', is_template=True)
+        for platform, committed in (('linkedin', 10), ('youtube', 5)):
+            progress = ClientPlatformProgress.objects.create(brand=self.template, platform=platform, committed=committed)
+            ContentLink.objects.create(platform_progress=progress, title='Content Calendar', url=f'https://{platform}.example.com/plan')
+            ContentLink.objects.create(platform_progress=progress, title='Platform Profile', url=f'https://{platform}.example.com/template')
+
+    def committed(self, brand):
+        return dict(brand.platform_progress.values_list('platform', 'committed'))
+
+    def test_clone_brand_queries(self):
+        # Template version, snapshot (brand, platforms, links), usernames,
+        # savepoint, user, brand, platform rows, links, release
+        with self.assertNumQueries(11):
+            clone_brand('First Clone', self.manager)
+        # Cached snapshot: the version check only
+        with self.assertNumQueries(8):
+            brand = clone_brand('Second Clone', self.manager)
+        self.assertEqual(self.committed(brand), {'linkedin': 10, 'youtube': 5})
+        self.assertEqual(
+            sorted(ContentLink.objects.filter(platform_progress__brand=brand).values_list('title', flat=True)),
+            ['Content Calendar', 'Content Calendar'],
+        )
+
+    def test_create_brands_queries_do_not_grow_with_brands(self):
+        BrandTemplate.objects.create(
+            name='Starter', platforms={'linkedin': [12, True, True], 'tiktok': [0, False, True]},
+            links=[['linkedin', 'Content Calendar', 'https://example.com/calendar']],
+        )
+        presets()
+        queries = []
+        for names in (['Bulk One'], ['Bulk Two', 'Bulk Three', 'Bulk Four']):
+            with CaptureQueriesContext(connection) as context:
+                create_brands(names, self.manager, 'Starter')
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+    def test_template_changes_in_another_worker_are_picked_up(self):
+        clone_brand('Before Change', self.manager)
+        # Changes that reach this worker's cache through no signal
+        ClientPlatformProgress.objects.filter(brand=self.template, platform='linkedin').update(
+            committed=20, updated_at=timezone.now(),
+        )
+        ContentLink.objects.filter(platform_progress__brand=self.template, platform_progress__platform='youtube').delete()
+
+        brand = clone_brand('After Change', self.manager)
+        self.assertEqual(self.committed(brand), {'linkedin': 20, 'youtube': 5})
+        self.assertEqual(ContentLink.objects.filter(platform_progress__brand=brand).count(), 1)
+
+    def test_taken_usernames_matches_whole_names(self):
+        for username in ('acme', 'acme_2', 'acme_corp', 'acme_corp_1', 'xacme', 'acme_2x'):
+            User.objects.create_user(username)
+        self.assertEqual(taken_usernames('acme'), {'acme', 'acme_2'})
+        self.assertEqual(taken_usernames('acme', 'acme_corp'), {'acme', 'acme_2', 'acme_corp', 'acme_corp_1'})
+
+
+class BrandTemplateTests(TestCase):
+    def setUp(self):
+        forget_presets()
+
+    def test_clean_rejects_bad_platforms_and_links(self):
+        for platforms, links, message in (
+            ({'myspace': [5, True, True]}, [], 'Unknown platform "myspace"'),
+            ({'linkedin': [5, True]}, [], '"linkedin" must be [committed, is_visible, is_active]'),
+            ({'linkedin': ['5', True, True]}, [], '"linkedin" must be [committed, is_visible, is_active]'),
+            (['linkedin'], [], 'Expected an object'),
+            ({'linkedin': [5, True, True]}, [['youtube', 'Plan', 'https://example.com']], 'must be [platform code in the preset'),
+        ):
+            with self.subTest(platforms=platforms, links=links):
+                with self.assertRaisesMessage(ValidationError, message):
+                    BrandTemplate(name='Bad', platforms=platforms, links=links).full_clean()
+        BrandTemplate(
+            name='Good', platforms={'linkedin': [5, True, True]}, links=[['linkedin', 'Plan', 'https://example.com']],
+        ).full_clean()
+
+    def test_presets_are_cached_until_a_template_is_saved(self):
+        template = BrandTemplate.objects.create(name='Starter', platforms={'linkedin': [5, True, True]})
+        self.assertEqual(presets(), {'Starter': {'platforms': {'linkedin': [5, True, True]}, 'links': []}})
+        with self.assertNumQueries(0):
+            presets()
+        template.platforms = {'linkedin': [8, True, False]}
+        template.save()
+        self.assertEqual(presets()['Starter']['platforms'], {'linkedin': [8, True, False]})
+        with self.assertRaisesMessage(ValueError, 'Brand template "Missing" not found'):
+            preset('Missing')
+
+    def test_apply_preset_sets_commitments_of_new_brands(self):
+        BrandTemplate.objects.create(
+            name='Video', platforms={'youtube': [12, True, True], 'tiktok': [0, False, False]},
+            links=[['youtube', 'Content Calendar', 'https://example.com/calendar']],
+        )
+        manager = User.objects.create_user('preset_manager', is_staff=True)
+        brands = create_brands(['Video One', 'Video Two'], manager, 'Video')
+        for brand in brands:
+            self.assertEqual(
+                {row.platform: (row.committed, row.is_visible, row.is_active) for row in brand.platform_progress.all()},
+                {'youtube': (12, True, True), 'tiktok': (0, False, False)},
+            )
+            self.assertEqual(
+                list(ContentLink.objects.filter(platform_progress__brand=brand).values_list('platform_progress__platform', 'url')),
+                [('youtube', 'https://example.com/calendar')],
+            )
+            self.assertEqual(brand.additional_notes, 'Created from Video template by preset_manager')
@@ -9,8 +9,28 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quantum_digital.settings')
 
-application = get_asgi_application()
+# As get_asgi_application(); views needs the app registry
+django.setup(set_prefix=False)
+
+from . import views  # noqa: E402
+
+
+class ProbeASGIHandler(ASGIHandler):
+    """
+    Answers /healthz from the event loop. The sync-only WhiteNoise and
+    allauth middlewares make Django run the whole chain, HealthCheckMiddleware
+    included, in a thread, so a liveness probe would otherwise wait for one.
+    """
+
+    async def run_get_response(self, request):
+        if request.path_info.rstrip('/') == '/healthz':
+            return views.healthz(request)
+        return await super().run_get_response(request)
+
+
+application = ProbeASGIHandler()
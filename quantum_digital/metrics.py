@@ -0,0 +1,287 @@
+"""
+In-process Prometheus-style metrics shared across gunicorn workers
+
+Each process keeps its samples in memory and periodically writes a snapshot
+to METRICS_DIR/<pid>-<token>.json. The /metrics view merges every snapshot,
+so counters and histograms add up across workers and management commands
+(backups) without an external service. Snapshots of exited processes are
+folded into a single archive file so the directory does not grow forever.
+"""
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+import atexit
+import fcntl
+import glob
+import json
+import math
+import os
+import threading
+import time
+import uuid
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+BACKUP_BUCKETS = (1, 5, 15, 30, 60, 300, 900, 1800, 3600)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'http_request_duration_seconds': (
+        'histogram', 'Request latency by URL name', LATENCY_BUCKETS),
+    'db_queries_total': (
+        'counter', 'SQL queries executed while serving requests, by URL name', None),
+    'cache_requests_total': (
+        'counter', 'Cache lookups by result (hit or miss)', None),
+    'zip_export_bytes': (
+        'histogram', 'Size of generated folder-structure ZIP exports', SIZE_BUCKETS),
+    'zip_export_duration_seconds': (
+        'histogram', 'Time spent generating folder-structure ZIP exports', LATENCY_BUCKETS),
+    'backup_duration_seconds': (
+        'histogram', 'Backup command duration by command and outcome', BACKUP_BUCKETS),
+    'backup_last_success_timestamp_seconds': (
+        'gauge', 'Unix time of the last successful backup by command', None),
+}
+
+ARCHIVE_NAME = 'archive.json'
+
+
+class MetricsRegistry:
+    """Samples recorded by this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.token = uuid.uuid4().hex[:8]
+        self.samples = {}
+        self.last_flush = 0.0
+        self.dirty = False
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.samples[key] = self.samples.get(key, 0) + value
+            self.dirty = True
+
+    def set(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.samples[key] = value
+            self.dirty = True
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name][2]
+        key = self._key(name, labels)
+        with self._lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    sample['buckets'][index] += 1
+            sample['sum'] += value
+            sample['count'] += 1
+            self.dirty = True
+
+    def _key(self, name, labels):
+        if name not in METRICS:
+            raise KeyError(f'Unknown metric {name}')
+        return json.dumps([name, sorted((k, str(v)) for k, v in labels.items())])
+
+    def snapshot_path(self):
+        return os.path.join(metrics_dir(), f'{os.getpid()}-{self.token}.json')
+
+    def flush(self, force=False):
+        """Write this process's samples to its snapshot file"""
+        now = time.monotonic()
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        if not self.dirty or (not force and now - self.last_flush < interval):
+            return
+        with self._lock:
+            data = json.dumps(self.samples)
+            self.dirty = False
+            self.last_flush = now
+        _atomic_write(self.snapshot_path(), data)
+
+
+_registry = MetricsRegistry()
+# Workers forked from a preloaded master must not share the master's file
+os.register_at_fork(after_in_child=_registry._reset)
+
+
+def metrics_dir():
+    path = getattr(settings, 'METRICS_DIR', None) or '/tmp/quantum_digital_metrics'
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def enabled():
+    return getattr(settings, 'METRICS_ENABLED', False)
+
+
+def inc(name, value=1, **labels):
+    """Increment a counter"""
+    if enabled():
+        _registry.inc(name, value, **labels)
+
+
+def set_gauge(name, value, **labels):
+    """Set a gauge; the exposed value is the maximum across processes"""
+    if enabled():
+        _registry.set(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    """Record one histogram observation"""
+    if enabled():
+        _registry.observe(name, value, **labels)
+
+
+def record_backup(command, duration, success):
+    """Record a backup command run"""
+    observe('backup_duration_seconds', duration, command=command,
+            outcome='success' if success else 'failure')
+    if success:
+        set_gauge('backup_last_success_timestamp_seconds', time.time(), command=command)
+
+
+def flush(force=False):
+    if enabled():
+        _registry.flush(force=force)
+
+
+@atexit.register
+def _flush_at_exit():
+    # Management commands (backups) exit right after recording
+    try:
+        flush(force=True)
+    except Exception:
+        pass
+
+
+def _atomic_write(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(total, samples):
+    for key, value in samples.items():
+        name = json.loads(key)[0]
+        kind = METRICS.get(name, (None,))[0]
+        current = total.get(key)
+        if current is None:
+            total[key] = {**value, 'buckets': list(value['buckets'])} if kind == 'histogram' else value
+        elif kind == 'histogram':
+            current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+            current['sum'] += value['sum']
+            current['count'] += value['count']
+        elif kind == 'gauge':
+            total[key] = max(current, value)
+        else:
+            total[key] = current + value
+
+
+def collect():
+    """Merge every process's snapshot, folding exited processes into the archive"""
+    flush(force=True)
+    directory = metrics_dir()
+    with open(os.path.join(directory, '.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        archive_path = os.path.join(directory, ARCHIVE_NAME)
+        archive = _load(archive_path)
+        live = {}
+        archived = []
+
+        for path in glob.glob(os.path.join(directory, '*-*.json')):
+            samples = _load(path)
+            pid = int(os.path.basename(path).split('-', 1)[0])
+            if _pid_alive(pid):
+                _merge(live, samples)
+            else:
+                _merge(archive, samples)
+                archived.append(path)
+
+        if archived:
+            _atomic_write(archive_path, json.dumps(archive))
+            for path in archived:
+                os.remove(path)
+
+    _merge(live, archive)
+    return live
+
+
+def _load(path):
+    try:
+        with open(path) as snapshot:
+            return json.load(snapshot)
+    except (OSError, ValueError):
+        return {}
+
+
+def render(samples=None):
+    """Prometheus text exposition (version 0.0.4) of the merged samples"""
+    if samples is None:
+        samples = collect()
+
+    by_name = {}
+    for key, value in samples.items():
+        name, labels = json.loads(key)
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(by_name.get(name, []), key=lambda item: item[0]):
+            if kind == 'histogram':
+                for bound, count in zip(buckets, value['buckets']):
+                    lines.append(f'{name}_bucket{_labels(labels, le=_number(bound))} {count}')
+                lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {value["count"]}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(value["sum"])}')
+                lines.append(f'{name}_count{_labels(labels)} {value["count"]}')
+            else:
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + sorted(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    if isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
+        return str(value)
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsLocMemCache(LocMemCache):
+    """LocMemCache that counts hits and misses in cache_requests_total"""
+
+    _MISSING = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._MISSING, version)
+        inc('cache_requests_total', result='miss' if value is self._MISSING else 'hit')
+        return default if value is self._MISSING else value
@@ -1,15 +1,102 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
 from django.shortcuts import redirect
+from django.template.base import Template
 from django.urls import reverse
 from profiles.models import BrandProfile
+from . import metrics, views
+from .querycheck import QueryShapeCollector
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import random
+import time
+
+profiling_logger = logging.getLogger('quantum_digital.profiling')
+
+
+class HealthCheckMiddleware:
+    """
+    Answers /healthz and /readyz before any other middleware runs: no
+    session, authentication, onboarding redirect or Host validation, so
+    container probes stay cheap and work with any Host header.
+
+    Under ASGI the sync-only middlewares further down put this one in sync
+    mode too, so asgi.py answers /healthz before the chain; the async path
+    applies once the whole chain is async-capable.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.probes = {'/healthz': views.healthz, '/readyz': views.readyz}
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        probe = self.probes.get(request.path_info.rstrip('/'))
+        if probe:
+            return probe(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        path = request.path_info.rstrip('/')
+        if path == '/healthz':
+            # No I/O, so it answers from the event loop even when the thread pool is busy
+            return views.healthz(request)
+        if path == '/readyz':
+            return await sync_to_async(views.readyz)(request)
+        return await self.get_response(request)
 
 
 class OnboardingMiddleware:
+    """
+    Sends users without a brand profile to onboarding. Supports both sync and
+    async handlers, so it adds no thread switch of its own under ASGI; the
+    sync-only WhiteNoise and allauth middlewares above still put each request
+    in a thread.
+    """
+
+    async_capable = True
+    sync_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if self.needs_profile(request, request.user):
+            # Check if regular user has completed onboarding
+            try:
+                BrandProfile.objects.get(user=request.user)
+            except BrandProfile.DoesNotExist:
+                return redirect('profiles:onboarding')
+        
+        response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        user = await request.auser()
+        if self.needs_profile(request, user) and not await BrandProfile.objects.filter(user=user).aexists():
+            return redirect('profiles:onboarding')
+        return await self.get_response(request)
+
+    @staticmethod
+    def needs_profile(request, user):
         # Check if user is authenticated and not accessing auth, admin, or manager pages
-        if (request.user.is_authenticated and 
+        if (user.is_authenticated and 
             not request.path.startswith('/accounts/') and 
             not request.path.startswith('/admin/') and
             not request.path.startswith('/manager/') and
@@ -17,15 +104,187 @@ class OnboardingMiddleware:
             request.path != '/'):
             
             # Skip onboarding check for admin/staff users
-            if request.user.is_staff or request.user.is_superuser:
-                # Admin users can access manager dashboard without onboarding
-                pass
-            else:
-                # Check if regular user has completed onboarding
+            # Admin users can access manager dashboard without onboarding
+            return not (user.is_staff or user.is_superuser)
+        return False
+
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in per-request profiling (REQUEST_PROFILING=True).
+
+    Records SQL count and time, template render time and total view time,
+    emits them as a Server-Timing header plus a structured log line, and
+    dumps a cProfile of sampled requests slower than the configured threshold.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING', False):
+            raise MiddlewareNotUsed('Request profiling is disabled')
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'REQUEST_PROFILING_SLOW_MS', 500)
+        self.sample_rate = getattr(settings, 'REQUEST_PROFILING_SAMPLE_RATE', 0.0)
+        self.dump_dir = getattr(settings, 'REQUEST_PROFILING_DUMP_DIR', None)
+        _install_template_timer()
+
+    def __call__(self, request):
+        stats = _RequestStats()
+        token = _current_stats.set(stats)
+
+        profiler = None
+        if self.dump_dir and self.sample_rate and random.random() < self.sample_rate:
+            profiler = cProfile.Profile()
+
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(stats.record_query):
+                if profiler:
+                    profiler.enable()
                 try:
-                    BrandProfile.objects.get(user=request.user)
-                except BrandProfile.DoesNotExist:
-                    return redirect('profiles:onboarding')
-        
-        response = self.get_response(request)
-        return response
\ No newline at end of file
+                    response = self.get_response(request)
+                finally:
+                    if profiler:
+                        profiler.disable()
+        finally:
+            _current_stats.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={stats.sql_ms:.1f};desc="{stats.sql_count} queries"',
+            f'tpl;dur={stats.template_ms:.1f}',
+            f'view;dur={total_ms:.1f}',
+        ])
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'sql_count': stats.sql_count,
+            'sql_ms': round(stats.sql_ms, 1),
+            'template_ms': round(stats.template_ms, 1),
+        }
+        if profiler and total_ms >= self.slow_ms:
+            record['profile'] = self._dump_profile(profiler, request)
+        profiling_logger.info(json.dumps(record))
+
+        return response
+
+    def _dump_profile(self, profiler, request):
+        """Write the cProfile stats of a slow request to the dump directory"""
+        os.makedirs(self.dump_dir, exist_ok=True)
+        slug = request.path.strip('/').replace('/', '_') or 'root'
+        filename = os.path.join(
+            self.dump_dir, f'{time.strftime("%Y%m%d_%H%M%S")}_{request.method}_{slug[:80]}.prof'
+        )
+        profiler.dump_stats(filename)
+        return filename
+
+
+class _RequestStats:
+    """Timings collected while a single request is processed"""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - started) * 1000
+            self.sql_count += 1
+
+
+_current_stats = contextvars.ContextVar('request_profiling_stats', default=None)
+
+
+def _install_template_timer():
+    """Wrap Template._render once so top-level render time is accumulated per request"""
+    if getattr(Template._render, 'request_profiling', False):
+        return
+    original_render = Template._render
+
+    def timed_render(self, context):
+        stats = _current_stats.get()
+        # Included and extended templates render inside their parent; only
+        # the outermost render is timed so time is not counted twice
+        if stats is None or stats.template_depth:
+            return original_render(self, context)
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            stats.template_ms += (time.perf_counter() - started) * 1000
+            stats.template_depth -= 1
+
+    timed_render.request_profiling = True
+    Template._render = timed_render
+
+
+class QueryCheckMiddleware:
+    """
+    Development/staging N+1 and slow-query detector (QUERY_CHECK=warn|strict).
+
+    Groups each request's SQL by normalized shape and logs shapes repeated
+    more than QUERY_CHECK_THRESHOLD times with the code that issued them.
+    In strict mode the request raises NPlusOneDetected instead, so test
+    client requests fail on regressions.
+    """
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, 'QUERY_CHECK', 'off')
+        if self.mode not in ('warn', 'strict'):
+            raise MiddlewareNotUsed('Query checking is disabled')
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'QUERY_CHECK_THRESHOLD', 5)
+        self.slow_ms = getattr(settings, 'QUERY_CHECK_SLOW_MS', None)
+
+    def __call__(self, request):
+        collector = QueryShapeCollector(slow_ms=self.slow_ms)
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+        collector.report(
+            self.threshold,
+            label=f'{request.method} {request.path}',
+            strict=self.mode == 'strict',
+        )
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Records request latency and SQL query counts per URL name for /metrics
+    (METRICS_ENABLED=True).
+    """
+
+    def __init__(self, get_response):
+        if not metrics.enabled():
+            raise MiddlewareNotUsed('Metrics are disabled')
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_count = [0]
+
+        def count_query(execute, sql, params, many, context):
+            query_count[0] += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        metrics.observe(
+            'http_request_duration_seconds', duration,
+            view=view, method=request.method, status=response.status_code,
+        )
+        metrics.inc('db_queries_total', query_count[0], view=view)
+        metrics.flush()
+        return response
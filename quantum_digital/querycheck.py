@@ -0,0 +1,140 @@
+"""
+Slow-query and N+1 detection
+
+Groups the SQL executed in a block (or a request, via QueryCheckMiddleware)
+by normalized statement shape and reports shapes repeated more than a
+threshold together with the project code that issued them.
+
+    with detect_queries(threshold=5, strict=True):
+        client.get('/manager/')
+"""
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connection
+import logging
+import os
+import re
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SAVEPOINT_RE = re.compile(r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b', re.IGNORECASE)
+
+# Instrumentation frames that wrap queries and are never their origin
+_INSTRUMENTATION_FRAMES = {
+    (os.path.join('quantum_digital', 'middleware.py'), 'record_query'),
+    (os.path.join('quantum_digital', 'middleware.py'), 'timed_render'),
+}
+
+
+class NPlusOneDetected(Exception):
+    """Raised in strict mode when a statement shape repeats above the threshold"""
+
+
+def normalize_sql(sql):
+    """Reduce a statement to its shape: literals and IN-lists collapsed"""
+    shape = _IN_LIST_RE.sub('IN (...)', sql)
+    shape = _STRING_RE.sub('?', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    return _WHITESPACE_RE.sub(' ', shape).strip()
+
+
+def _origin_frame():
+    """Innermost stack frame that belongs to project code"""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if not filename.startswith(base_dir) or 'site-packages' in filename:
+            continue
+        relative = os.path.relpath(filename, base_dir)
+        if filename == __file__ or (relative, frame.name) in _INSTRUMENTATION_FRAMES:
+            continue
+        return f'{relative}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+class QueryShapeCollector:
+    """execute_wrapper that groups queries by shape and tracks slow statements"""
+
+    def __init__(self, slow_ms=None):
+        self.slow_ms = slow_ms
+        self.shapes = {}
+        self.slow_queries = []
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if not _SAVEPOINT_RE.match(sql):
+                self._record(sql, duration_ms)
+
+    def _record(self, sql, duration_ms):
+        self.total += 1
+        shape = normalize_sql(sql)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            entry = self.shapes[shape] = {'count': 0, 'total_ms': 0.0, 'origin': _origin_frame()}
+        entry['count'] += 1
+        entry['total_ms'] += duration_ms
+
+        if self.slow_ms is not None and duration_ms >= self.slow_ms:
+            self.slow_queries.append({
+                'sql': sql,
+                'duration_ms': round(duration_ms, 1),
+                'origin': _origin_frame(),
+            })
+
+    def repeated(self, threshold):
+        """Shapes executed more than `threshold` times, most frequent first"""
+        found = [
+            {'sql': shape, 'count': entry['count'],
+             'total_ms': round(entry['total_ms'], 1), 'origin': entry['origin']}
+            for shape, entry in self.shapes.items()
+            if entry['count'] > threshold
+        ]
+        return sorted(found, key=lambda item: item['count'], reverse=True)
+
+    def report(self, threshold, label='', strict=False):
+        """Log repeated shapes and slow queries; raise in strict mode"""
+        repeated = self.repeated(threshold)
+        prefix = f'{label}: ' if label else ''
+
+        for item in repeated:
+            logger.warning(
+                '%sN+1 suspected - %d x %s (%.1f ms) from %s',
+                prefix, item['count'], item['sql'], item['total_ms'], item['origin'],
+            )
+        for item in self.slow_queries:
+            logger.warning(
+                '%sSlow query %.1f ms from %s: %s',
+                prefix, item['duration_ms'], item['origin'], item['sql'],
+            )
+
+        if strict and repeated:
+            details = '\n'.join(
+                f'  {item["count"]} x {item["sql"]}\n    from {item["origin"]}' for item in repeated
+            )
+            raise NPlusOneDetected(
+                f'{prefix}{len(repeated)} statement shape(s) repeated more than {threshold} times:\n{details}'
+            )
+        return repeated
+
+
+@contextmanager
+def detect_queries(threshold=None, strict=True, slow_ms=None, label=''):
+    """Collect query shapes for the enclosed block and report on exit"""
+    if threshold is None:
+        threshold = getattr(settings, 'QUERY_CHECK_THRESHOLD', 5)
+    collector = QueryShapeCollector(slow_ms=slow_ms)
+    with connection.execute_wrapper(collector):
+        yield collector
+    collector.report(threshold, label=label, strict=strict)
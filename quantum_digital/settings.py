@@ -81,6 +81,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'quantum_digital.middleware.HealthCheckMiddleware',  # /healthz and /readyz skip everything below
+    'quantum_digital.middleware.RequestProfilingMiddleware',  # No-op unless REQUEST_PROFILING=True
+    'quantum_digital.middleware.QueryCheckMiddleware',  # No-op unless QUERY_CHECK=warn|strict
+    'quantum_digital.middleware.MetricsMiddleware',  # No-op unless METRICS_ENABLED=True
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -95,6 +99,33 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'quantum_digital.urls'
 
+# Request profiling (Server-Timing header + structured log line per request)
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', 'False').lower() == 'true'
+# Requests slower than this keep their cProfile dump
+REQUEST_PROFILING_SLOW_MS = int(os.getenv('REQUEST_PROFILING_SLOW_MS', '500'))
+# Fraction of requests run under cProfile (0 disables profiling dumps)
+REQUEST_PROFILING_SAMPLE_RATE = float(os.getenv('REQUEST_PROFILING_SAMPLE_RATE', '0'))
+REQUEST_PROFILING_DUMP_DIR = os.getenv('REQUEST_PROFILING_DUMP_DIR', '/tmp/quantum_digital_profiles')
+
+# N+1 / slow-query detection for development and staging:
+# 'off', 'warn' (log repeated statement shapes) or 'strict' (raise NPlusOneDetected)
+QUERY_CHECK = os.getenv('QUERY_CHECK', 'off').lower()
+# Allowed executions of one statement shape per request
+QUERY_CHECK_THRESHOLD = int(os.getenv('QUERY_CHECK_THRESHOLD', '5'))
+QUERY_CHECK_SLOW_MS = float(os.getenv('QUERY_CHECK_SLOW_MS', '100'))
+
+# Prometheus-style /metrics endpoint. Each process writes its samples to
+# METRICS_DIR and the endpoint merges them, so all gunicorn workers are counted.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False').lower() == 'true'
+METRICS_DIR = os.getenv('METRICS_DIR', '/tmp/quantum_digital_metrics')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+# When set, /metrics requires "Authorization: Bearer <token>"; otherwise only
+# direct (non-proxied) requests from private addresses are served
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# /readyz reuses its database, cache and migration checks for this long
+READINESS_CACHE_SECONDS = float(os.getenv('READINESS_CACHE_SECONDS', '5'))
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -171,14 +202,26 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # WhiteNoise configuration for production static file serving
-# Using CompressedStaticFilesStorage instead of CompressedManifestStaticFilesStorage
-# to avoid errors with missing files in templates
+# Manifest storage fingerprints files so WhiteNoise serves them with
+# far-future cache headers; missing files referenced by templates or CSS are
+# logged instead of failing (python manage.py check_static_references)
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
+        "BACKEND": "quantum_digital.storage.TolerantManifestStaticFilesStorage",
+    },
+}
+# Fingerprinted names (Django's 12 hex digit hash) are served with a one-year+
+# immutable Cache-Control. A pattern rather than WhiteNoise's manifest lookup,
+# which would log every non-fingerprinted name that merely looks hashed.
+WHITENOISE_IMMUTABLE_FILE_TEST = r'^.+\.[0-9a-f]{12}\..+$'
+
+# Cache (counts hits/misses for /metrics)
+CACHES = {
+    'default': {
+        'BACKEND': 'quantum_digital.metrics.MetricsLocMemCache',
     },
 }
 
@@ -304,6 +347,21 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'quantum_digital.querycheck': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'quantum_digital.storage': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'quantum_digital.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -319,10 +377,22 @@ DBBACKUP_STORAGE_OPTIONS = {'location': BASE_DIR / 'backups'}
 import os
 os.makedirs(BASE_DIR / 'backups', exist_ok=True)
 
+# django-dbbackup 5 reads its storage from STORAGES['dbbackup']
+STORAGES['dbbackup'] = {
+    'BACKEND': DBBACKUP_STORAGE,
+    'OPTIONS': DBBACKUP_STORAGE_OPTIONS,
+}
+
 # Backup settings
 DBBACKUP_CLEANUP_KEEP = 30  # Keep 30 days of backups
 DBBACKUP_CLEANUP_KEEP_MEDIA = 30  # Keep 30 days of media backups
 
+# Retention for catalogued backups (daily_backup/production_backup --cleanup):
+# the newest backup of each of the last N days, weeks and months is kept
+BACKUP_KEEP_DAILY = int(os.getenv('BACKUP_KEEP_DAILY', '7'))
+BACKUP_KEEP_WEEKLY = int(os.getenv('BACKUP_KEEP_WEEKLY', '4'))
+BACKUP_KEEP_MONTHLY = int(os.getenv('BACKUP_KEEP_MONTHLY', '6'))
+
 # Production backup settings (when DATABASE_URL is set)
 if os.getenv('DATABASE_URL'):
     # In production, also backup to cloud storage if configured
@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from asgiref.testing import ApplicationCommunicator
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from unittest import mock
+from . import metrics, middleware, views
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+
+# No collectstatic manifest in tests
+STATIC_STORAGES = {**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}
+
+
+def sample(output, line_prefix):
+    """Value of the exposition line starting with `line_prefix`"""
+    match = re.search(rf'^{re.escape(line_prefix)} (\S+)$', output, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class MetricsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(METRICS_ENABLED=True, METRICS_DIR=self.directory, METRICS_TOKEN='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        metrics._registry._reset()
+        self.addCleanup(metrics._registry._reset)
+        cache.clear()
+
+    def scrape(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_requests_are_recorded(self):
+        manager = User.objects.create_user('metrics_manager', is_staff=True)
+        self.client.force_login(manager)
+        self.client.get('/manager/')
+        self.client.get('/manager/')
+        cache.get('metrics-test')
+        cache.set('metrics-test', 1)
+        cache.get('metrics-test')
+
+        output = self.scrape()
+        labels = 'method="GET",status="200",view="manager:dashboard"'
+        self.assertEqual(sample(output, f'http_request_duration_seconds_count{{{labels}}}'), 2)
+        self.assertEqual(sample(output, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'), 2)
+        self.assertGreater(sample(output, 'db_queries_total{view="manager:dashboard"}'), 0)
+        self.assertGreaterEqual(sample(output, 'cache_requests_total{result="hit"}'), 1)
+        self.assertGreaterEqual(sample(output, 'cache_requests_total{result="miss"}'), 1)
+
+    def test_worker_snapshots_are_merged(self):
+        key = json.dumps(['db_queries_total', [['view', 'manager:dashboard']]])
+        histogram = json.dumps(['zip_export_bytes', []])
+        buckets = [1, 1, 1, 1, 1]
+        # A worker that has exited and one that is still running
+        exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+        exited_snapshot = f'{exited.stdout.strip()}-dead.json'
+        snapshots = {
+            exited_snapshot: {key: 3, histogram: {'buckets': buckets, 'sum': 5000.0, 'count': 1}},
+            f'{os.getpid()}-live.json': {key: 4, histogram: {'buckets': buckets, 'sum': 7000.0, 'count': 1}},
+        }
+        for name, samples in snapshots.items():
+            with open(os.path.join(self.directory, name), 'w') as snapshot:
+                json.dump(samples, snapshot)
+
+        for _ in range(2):
+            # The exited worker is folded into the archive and still counted
+            output = metrics.render()
+            self.assertEqual(sample(output, 'db_queries_total{view="manager:dashboard"}'), 7)
+            self.assertEqual(sample(output, 'zip_export_bytes_bucket{le="10000"}'), 2)
+            self.assertEqual(sample(output, 'zip_export_bytes_sum'), 12000)
+            self.assertEqual(sample(output, 'zip_export_bytes_count'), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, exited_snapshot)))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, metrics.ARCHIVE_NAME)))
+
+
+class HealthCheckTests(TestCase):
+    def setUp(self):
+        views._readiness.update(checked_at=None, checks=None)
+        self.addCleanup(views._readiness.update, checked_at=None, checks=None)
+
+    def test_healthz_skips_host_validation_and_database(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/healthz', HTTP_HOST='bogus.invalid')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+    async def test_async_middleware_only_offloads_readyz(self):
+        async def get_response(request):
+            raise AssertionError('probes must not reach the rest of the chain')
+
+        probe = middleware.HealthCheckMiddleware(get_response)
+        factory = RequestFactory(headers={'host': 'bogus.invalid'})
+        with mock.patch.object(middleware, 'sync_to_async', wraps=middleware.sync_to_async) as offload:
+            # A database query from the event loop would raise SynchronousOnlyOperation
+            response = await probe(factory.get('/healthz'))
+            self.assertEqual(response.status_code, 200)
+            offload.assert_not_called()
+
+            response = await probe(factory.get('/readyz'))
+            self.assertEqual(response.status_code, 200)
+            offload.assert_called_once_with(views.readyz)
+
+    def test_readyz_reports_failed_checks(self):
+        with mock.patch.dict(views.READINESS_CHECKS, cache=mock.Mock(side_effect=ConnectionError('down'))):
+            response = self.client.get('/readyz', HTTP_HOST='bogus.invalid')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {
+            'status': 'unavailable', 'checks': {'database': True, 'cache': False, 'migrations': True},
+        })
+
+    @override_settings(READINESS_CACHE_SECONDS=60)
+    def test_readyz_reuses_recent_checks(self):
+        check = mock.Mock(return_value=True)
+        with mock.patch.dict(views.READINESS_CHECKS, {'database': check}, clear=True):
+            self.assertEqual(self.client.get('/readyz').status_code, 200)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get('/readyz').status_code, 200)
+            check.assert_called_once_with()
+
+            views._readiness['checked_at'] -= 61
+            self.client.get('/readyz')
+        self.assertEqual(check.call_count, 2)
+
+
+class ASGIHealthzTests(SimpleTestCase):
+    """SimpleTestCase fails any database query"""
+
+    async def test_healthz_answers_from_the_event_loop(self):
+        from .asgi import application
+
+        threads = []
+        healthz = views.healthz
+
+        def record_thread(request):
+            threads.append(threading.get_ident())
+            return healthz(request)
+
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'method': 'GET', 'path': '/healthz', 'query_string': b'',
+            'headers': [(b'host', b'bogus.invalid')],
+        })
+        with mock.patch.object(views, 'healthz', side_effect=record_thread):
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output()
+            body = await communicator.receive_output()
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(json.loads(body['body']), {'status': 'ok'})
+        self.assertEqual(threads, [threading.get_ident()])
@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.shortcuts import redirect
+from . import views
 
 def home_redirect(request):
     if request.user.is_authenticated:
@@ -35,4 +36,6 @@ urlpatterns = [
     path('profiles/', include('profiles.urls')),
     path('dashboard/', include('dashboard.urls')),
     path('manager/', include('manager.urls')),
+    # Internal Prometheus scrape endpoint
+    path('metrics', views.metrics_view, name='metrics'),
 ]
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
+from . import metrics
+import ipaddress
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+def _metrics_access_allowed(request):
+    """Token auth when METRICS_TOKEN is set, otherwise direct private-network scrapes only"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        return constant_time_compare(header, f'Bearer {token}')
+
+    # Requests routed through Traefik carry X-Forwarded-For; in-network
+    # scrapers talk to the container directly
+    if 'HTTP_X_FORWARDED_FOR' in request.META:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return address.is_private or address.is_loopback
+
+
+def metrics_view(request):
+    """Prometheus text exposition of metrics merged across all worker processes"""
+    if not metrics.enabled():
+        raise Http404('Metrics are disabled')
+    if not _metrics_access_allowed(request):
+        return HttpResponseForbidden('Forbidden')
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def healthz(request):
+    """Liveness: the process answers requests. Never touches the database."""
+    response = JsonResponse({'status': 'ok'})
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def readyz(request):
+    """
+    Readiness: database, cache and migrations are usable. The result is
+    reused for READINESS_CACHE_SECONDS so frequent probes cost nothing.
+    """
+    checked_at, checks = _readiness['checked_at'], _readiness['checks']
+    if checked_at is None or time.monotonic() - checked_at > settings.READINESS_CACHE_SECONDS:
+        checks = {name: _run_check(name, check) for name, check in READINESS_CHECKS.items()}
+        _readiness.update(checked_at=time.monotonic(), checks=checks)
+
+    ready = all(checks.values())
+    response = JsonResponse(
+        {'status': 'ok' if ready else 'unavailable', 'checks': checks},
+        status=200 if ready else 503,
+    )
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def _run_check(name, check):
+    try:
+        return bool(check())
+    except Exception as e:
+        # Details go to the log only; /readyz is reachable from outside
+        logger.warning(f'Readiness check {name} failed: {e}')
+        return False
+
+
+def _check_database():
+    # Reuses this thread's persistent connection (CONN_MAX_AGE) when it has one
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        return cursor.fetchone() == (1,)
+
+
+def _check_cache():
+    token = uuid.uuid4().hex
+    cache.set('readyz', token, 30)
+    return cache.get('readyz') == token
+
+
+def _check_migrations():
+    # Migration files don't change while the process runs; read them once
+    if _readiness['migrations'] is None:
+        _readiness['migrations'] = set(MigrationLoader(None, ignore_no_migrations=True).graph.nodes)
+    applied = MigrationRecorder(connections[DEFAULT_DB_ALIAS]).applied_migrations()
+    return _readiness['migrations'] <= set(applied)
+
+
+READINESS_CHECKS = {
+    'database': _check_database,
+    'cache': _check_cache,
+    'migrations': _check_migrations,
+}
+
+_readiness = {'checked_at': None, 'checks': None, 'migrations': None}